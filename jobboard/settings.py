@@ -96,6 +96,20 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/ref/settings/#caches
+# Cached job pages, facets and map clusters are invalidated by bumping a
+# version key in this cache, so every worker process must share it: use a
+# shared backend (Redis, Memcached, database) when running more than one.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'jobboard',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -170,11 +184,37 @@ else:
     # Console backend is safe for local development and tests
     EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
 
+# Outgoing email is queued in the outbox and sent by `manage.py send_outbox`.
+# Failed sends are retried after OUTBOX_RETRY_BASE_SECONDS, doubling each time
+# up to OUTBOX_RETRY_MAX_SECONDS, and dead-lettered after OUTBOX_MAX_ATTEMPTS.
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '5'))
+OUTBOX_RETRY_BASE_SECONDS = int(os.environ.get('OUTBOX_RETRY_BASE_SECONDS', '60'))
+OUTBOX_RETRY_MAX_SECONDS = int(os.environ.get('OUTBOX_RETRY_MAX_SECONDS', '3600'))
+
+# A notification event of the same type and thread (one conversation, one
+# job's applications) as an unread notification updated within this many
+# seconds is folded into that row instead of inserting a new one.
+NOTIFICATION_COALESCE_SECONDS = int(os.environ.get('NOTIFICATION_COALESCE_SECONDS', '600'))
+
+# Live notifications (`notifications.live`) are streamed over Server-Sent
+# Events when served by an ASGI server. PUBSUB_BACKEND delivers events within
+# one process by default; multi-worker deployments need a shared backend.
+PUBSUB_BACKEND = os.environ.get('PUBSUB_BACKEND', '')
+SSE_HEARTBEAT_SECONDS = int(os.environ.get('SSE_HEARTBEAT_SECONDS', '20'))
+SSE_MAX_CONNECTIONS = int(os.environ.get('SSE_MAX_CONNECTIONS', '5000'))
+SSE_MAX_CONNECTIONS_PER_USER = int(os.environ.get('SSE_MAX_CONNECTIONS_PER_USER', '5'))
+
 # Twilio configuration (optional)
 TWILIO_ACCOUNT_SID = os.environ.get('TWILIO_ACCOUNT_SID', '')
 TWILIO_AUTH_TOKEN = os.environ.get('TWILIO_AUTH_TOKEN', '')
 TWILIO_FROM_NUMBER = os.environ.get('TWILIO_FROM_NUMBER', '')
 
+# SMS is queued and sent by `manage.py send_sms_queue`. SMS_BACKEND defaults to
+# Twilio when it is configured and to printing on the console otherwise.
+SMS_BACKEND = os.environ.get('SMS_BACKEND', '')
+SMS_MAX_CONCURRENCY = int(os.environ.get('SMS_MAX_CONCURRENCY', '4'))
+SMS_MAX_ATTEMPTS = int(os.environ.get('SMS_MAX_ATTEMPTS', '5'))
+
 # Verification rate-limits (env configurable)
 VERIFICATION_RESEND_INTERVAL_SECONDS = int(os.environ.get('VERIFICATION_RESEND_INTERVAL_SECONDS', '60'))
 VERIFICATION_MAX_PER_HOUR = int(os.environ.get('VERIFICATION_MAX_PER_HOUR', '5'))
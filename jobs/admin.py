@@ -1,5 +1,7 @@
 from django.contrib import admin
 from .models import JobPost, Application
+from .caching import bump_catalog_version
+from .stats import recompute_platform_stats
 
 
 @admin.register(JobPost)
@@ -33,11 +35,17 @@ class JobPostAdmin(admin.ModelAdmin):
 
     def approve_jobs(self, request, queryset):
         queryset.update(is_approved=True)
+        # Bulk updates bypass the signals that maintain the landing page totals
+        # and invalidate cached catalog data
+        recompute_platform_stats()
+        bump_catalog_version()
 
     approve_jobs.short_description = "Approve selected job posts"
 
     def unapprove_jobs(self, request, queryset):
         queryset.update(is_approved=False)
+        recompute_platform_stats()
+        bump_catalog_version()
 
     unapprove_jobs.short_description = "Unapprove selected job posts"
 
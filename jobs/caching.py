@@ -0,0 +1,133 @@
+"""
+Cache versioning for data derived from the job catalog.
+
+Anything cached from JobPost rows (map clusters, facet counts, rendered
+pages) includes ``catalog_version()`` in its key. Saving, approving or
+deleting a job bumps the version, so every such entry is invalidated at
+once without having to track individual keys; stale entries simply age
+out of the cache.
+"""
+import hashlib
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = 'jobs:catalog-version'
+
+
+def _initial_version():
+    # Millisecond clock rather than 1, so a version lost to eviction or a
+    # cache restart never comes back with a number already used by
+    # entries that are still cached.
+    return int(time.time() * 1000)
+
+
+def catalog_version():
+    """Current job catalog version."""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, _initial_version(), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    """Invalidate everything cached under the current catalog version."""
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        version = _initial_version()
+        cache.set(CATALOG_VERSION_KEY, version, None)
+        return version
+
+
+def versioned_key(prefix, *parts):
+    """Cache key for ``prefix`` and ``parts`` under the current version."""
+    return ':'.join(['jobs', prefix, str(catalog_version()), *map(str, parts)])
+
+
+# Anonymous full-page cache ----------------------------------------------
+#
+# Logged-out visitors all see the same job list and detail pages, so the
+# rendered response is cached per URL and normalized query string under the
+# catalog version. Anything personal (queued flash messages, a CSRF token,
+# cookies being set) makes the request bypass the cache.
+
+PAGE_CACHE_TIMEOUT = 60 * 5
+PAGE_HITS_KEY = 'jobs:page-cache:hits'
+PAGE_MISSES_KEY = 'jobs:page-cache:misses'
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            pass
+
+
+def page_cache_stats():
+    """Hit/miss counters of the anonymous page cache since the last reset."""
+    counts = cache.get_many([PAGE_HITS_KEY, PAGE_MISSES_KEY])
+    hits = counts.get(PAGE_HITS_KEY, 0)
+    misses = counts.get(PAGE_MISSES_KEY, 0)
+    total = hits + misses
+    return {'hits': hits, 'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else None}
+
+
+def reset_page_cache_stats():
+    cache.delete_many([PAGE_HITS_KEY, PAGE_MISSES_KEY])
+
+
+def page_cache_key(request):
+    """Key for ``request``: path plus sorted, non-empty query parameters."""
+    params = sorted((name, value) for name, values in request.GET.lists()
+                    for value in values if value != '')
+    raw = request.path + '?' + urlencode(params)
+    return versioned_key('page', hashlib.sha1(raw.encode()).hexdigest())
+
+
+def _has_pending_messages(request):
+    storage = getattr(request, '_messages', None)
+    return storage is not None and len(storage) > 0
+
+
+def _cacheable(request):
+    user = getattr(request, 'user', None)
+    return (request.method == 'GET'
+            and not (user is not None and user.is_authenticated)
+            and not _has_pending_messages(request))
+
+
+def cache_anonymous_page(view_func):
+    """Serve ``view_func`` from the page cache for anonymous GET requests."""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not _cacheable(request):
+            return view_func(request, *args, **kwargs)
+
+        key = page_cache_key(request)
+        response = cache.get(key)
+        if response is not None:
+            _count(PAGE_HITS_KEY)
+            response['X-Page-Cache'] = 'hit'
+            return response
+
+        _count(PAGE_MISSES_KEY)
+        response = view_func(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response.render()
+        if (response.status_code == 200 and not response.streaming
+                and not response.cookies
+                and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+                and not getattr(getattr(request, '_messages', None), 'used', False)):
+            cache.set(key, response, PAGE_CACHE_TIMEOUT)
+        response['X-Page-Cache'] = 'miss'
+        return response
+    return wrapper
@@ -0,0 +1,125 @@
+"""
+Server-side clustering of job markers for the map.
+
+The geohash stored on every JobPost is already a multi-resolution grid:
+its first ``p`` characters name the cell containing the job at precision
+``p``. Clustering a viewport is therefore one GROUP BY on a geohash
+prefix, restricted to the geohash ranges of the tiles in view.
+
+A tile is a geohash cell one character shorter than the cluster cells,
+so each tile holds at most 32 clusters and every cluster belongs to
+exactly one tile. Results are cached per (tile, precision, filters) under
+the catalog version, so panning re-uses tiles already computed and any
+job edit invalidates them all.
+"""
+import math
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, Min
+from django.db.models.functions import Substr
+
+from .caching import versioned_key
+from .geo import cell_size, encode_geohash, prefix_filter
+
+# Geohash precision of a cluster cell at each map zoom level (0-20). Each
+# step roughly tracks the halving of the tile size per zoom level, giving a
+# few dozen clusters per screen.
+ZOOM_PRECISION = (1, 1, 1, 2, 2, 3, 3, 3, 4, 4, 5, 5, 5, 6, 6, 7, 7, 7, 8, 8, 9)
+MAX_ZOOM = len(ZOOM_PRECISION) - 1
+
+# A viewport needing more tiles than this is clustered one level coarser.
+MAX_TILES = 64
+
+CACHE_TIMEOUT = 60 * 10
+
+
+def precision_for_zoom(zoom):
+    return ZOOM_PRECISION[min(max(int(zoom), 0), MAX_ZOOM)]
+
+
+def _lon_ranges(west, east):
+    if west <= east:
+        return [(west, east)]
+    # Viewport crosses the antimeridian.
+    return [(west, 180.0), (-180.0, east)]
+
+
+def _estimated_tiles(south, west, north, east, precision):
+    if precision == 0:
+        return 1
+    height, width = cell_size(precision)
+    span = sum(hi - lo for lo, hi in _lon_ranges(west, east))
+    return (math.ceil((north - south) / height) + 1) * (math.ceil(span / width) + 1)
+
+
+def tiles_for_bbox(south, west, north, east, precision):
+    """Geohash cells of ``precision`` characters covering the box."""
+    if precision == 0:
+        return ['']
+    height, width = cell_size(precision)
+    south, north = max(south, -90.0), min(north, 90.0)
+    tiles = []
+    lat = (math.floor((south + 90.0) / height) + 0.5) * height - 90.0
+    while lat < north + height / 2 and lat < 90.0:
+        for lo, hi in _lon_ranges(west, east):
+            lon = (math.floor((lo + 180.0) / width) + 0.5) * width - 180.0
+            while lon < hi + width / 2 and lon < 180.0:
+                tile = encode_geohash(lat, lon, precision)
+                if tile not in tiles:
+                    tiles.append(tile)
+                lon += width
+        lat += height
+    return tiles
+
+
+def _compute(queryset, tiles, precision):
+    """Clusters for every tile in ``tiles``, as ``{tile: [cluster, ...]}``."""
+    tile_length = precision - 1
+    result = {tile: [] for tile in tiles}
+    queryset = queryset.exclude(geohash='')
+    if tile_length:
+        queryset = queryset.filter(prefix_filter(tiles))
+    rows = (queryset.annotate(cell=Substr('geohash', 1, precision))
+            .values('cell')
+            .annotate(count=Count('id'), lat=Avg('latitude'), lon=Avg('longitude'),
+                      first_id=Min('id'))
+            .order_by('cell'))
+    for row in rows:
+        cluster = {
+            'geohash': row['cell'],
+            'count': row['count'],
+            'lat': round(float(row['lat']), 6),
+            'lon': round(float(row['lon']), 6),
+        }
+        if row['count'] == 1:
+            cluster['job_id'] = row['first_id']
+        result.setdefault(row['cell'][:tile_length], []).append(cluster)
+    return result
+
+
+def clusters_for_bbox(queryset, south, west, north, east, zoom, filter_key=''):
+    """Cluster the jobs in ``queryset`` lying in the tiles covering the box.
+
+    ``filter_key`` must identify whatever filters were applied to
+    ``queryset``; it is part of the cache key. Returns ``(precision,
+    clusters)``.
+    """
+    precision = precision_for_zoom(zoom)
+    while precision > 1 and _estimated_tiles(south, west, north, east, precision - 1) > MAX_TILES:
+        precision -= 1
+    tiles = tiles_for_bbox(south, west, north, east, precision - 1)
+
+    prefix = versioned_key('clusters', precision, filter_key)
+    keys = {tile: f'{prefix}:{tile or "*"}' for tile in tiles}
+    cached = cache.get_many(keys.values())
+    missing = [tile for tile in tiles if keys[tile] not in cached]
+    found = {tile: cached[keys[tile]] for tile in tiles if keys[tile] in cached}
+    if missing:
+        computed = _compute(queryset, missing, precision)
+        cache.set_many({keys[tile]: computed[tile] for tile in missing}, CACHE_TIMEOUT)
+        found.update(computed)
+
+    clusters = []
+    for tile in tiles:
+        clusters.extend(found[tile])
+    return precision, clusters
@@ -1,4 +1,12 @@
-from .models import Application
+from notifications import counters
+
+
+def _is_company(user):
+    return getattr(user, 'is_company', False)
+
+
+def _is_applicant(user):
+    return not getattr(user, 'is_company', False)
 
 
 def notification_counts(request):
@@ -7,25 +15,14 @@ def notification_counts(request):
     Adds two keys to the template context:
     - company_unread_count
     - applicant_unread_count
-    """
-    company_unread = 0
-    applicant_unread = 0
-
-    user = getattr(request, 'user', None)
-    if user and user.is_authenticated:
-        try:
-            if getattr(user, 'is_company', False):
-                company_unread = Application.objects.filter(
-                    job__company=user, company_unread=True).count()
-            else:
-                applicant_unread = Application.objects.filter(
-                    applicant=user, applicant_unread=True).count()
-        except Exception:
-            # Avoid crashing templates if DB not ready
-            company_unread = 0
-            applicant_unread = 0
 
+    Both values are lazy and share the per-request memo in
+    ``notifications.counters``, so pages that never show the badges run no
+    queries for them.
+    """
     return {
-        'company_unread_count': company_unread,
-        'applicant_unread_count': applicant_unread,
+        'company_unread_count': counters.lazy_count(
+            request, counters.COMPANY_APPLICATIONS, _is_company),
+        'applicant_unread_count': counters.lazy_count(
+            request, counters.APPLICANT_UPDATES, _is_applicant),
     }
@@ -0,0 +1,100 @@
+"""
+Facet counts for the job list filters.
+
+All facets are computed together with one GROUP BY over the filtered
+queryset: each result row is a (category, job_type, currency, location)
+combination with its count, and the per-facet totals are summed from those
+rows in Python. The result is cached under the normalized filter state and
+the catalog version, so any job save, approval or deletion invalidates it.
+
+A facet that is itself being filtered on is counted disjunctively: over the
+jobs matching every other filter, so the options it did not pick keep their
+counts and the user can switch between them. That costs one more GROUP BY
+per active facet.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import Lower, Trim
+
+from .caching import versioned_key
+from .models import JobPost
+
+CACHE_TIMEOUT = 60 * 10
+
+# How many of the most common locations to offer as a filter.
+MAX_LOCATIONS = 10
+
+
+def location_bucket(expression='location'):
+    """Case- and whitespace-insensitive grouping of free-text locations."""
+    return Lower(Trim(expression))
+
+
+def filter_state_key(filters):
+    """Stable cache key fragment for a dict of active filters."""
+    normalized = {k: str(v) for k, v in filters.items() if v not in (None, '')}
+    payload = json.dumps(normalized, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+# Facet name -> the column it groups by.
+FACET_COLUMNS = {
+    'category': 'category',
+    'job_type': 'job_type',
+    'currency': 'currency',
+    'location': 'location_bucket',
+}
+
+
+def _count(queryset, facets, totals):
+    columns = [FACET_COLUMNS[facet] for facet in facets]
+    rows = (queryset.order_by()
+            .annotate(location_bucket=location_bucket())
+            .values(*columns)
+            .annotate(n=Count('id')))
+    for row in rows:
+        for facet, column in zip(facets, columns):
+            value = row[column]
+            if value:
+                totals[facet][value] = totals[facet].get(value, 0) + row['n']
+
+
+def _compute(queryset, excluding):
+    totals = {facet: {} for facet in FACET_COLUMNS}
+    unfiltered = [facet for facet in FACET_COLUMNS if facet not in excluding]
+    if unfiltered:
+        _count(queryset, unfiltered, totals)
+    for facet, facet_queryset in excluding.items():
+        _count(facet_queryset, [facet], totals)
+
+    def choices(facet, options):
+        counts = totals[facet]
+        return [(code, label, counts.get(code, 0)) for code, label in options]
+
+    locations = sorted(totals['location'].items(), key=lambda item: (-item[1], item[0]))
+    return {
+        'category': choices('category', JobPost.CATEGORY_CHOICES),
+        'job_type': choices('job_type', JobPost.JOB_TYPE_CHOICES),
+        'currency': choices('currency', JobPost.CURRENCY_CHOICES),
+        'location': [(bucket, bucket.title(), n) for bucket, n in locations[:MAX_LOCATIONS]],
+    }
+
+
+def facet_counts(queryset, filters, excluding=None):
+    """Counts per facet value for ``queryset``.
+
+    ``filters`` must describe everything that shaped ``queryset`` (including
+    who is looking, since visibility differs per user); it is the cache key.
+    ``excluding`` maps each facet that is filtered on to the queryset with
+    every filter but its own; that facet is counted over it instead.
+    Returns ``{facet: [(value, label, count), ...]}``.
+    """
+    key = versioned_key('facets', filter_state_key(filters))
+    result = cache.get(key)
+    if result is None:
+        result = _compute(queryset, excluding or {})
+        cache.set(key, result, CACHE_TIMEOUT)
+    return result
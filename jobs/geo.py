@@ -0,0 +1,160 @@
+"""
+Geospatial helpers for job posts.
+
+Each JobPost with coordinates stores a geohash (``JobPost.geohash``), a
+base-32 string where every extra character narrows the cell, so one
+indexed column doubles as a multi-resolution grid. Radius searches first
+narrow candidates with geohash prefix ranges plus a lat/lon bounding box,
+then compute the exact haversine distance in SQL for the survivors.
+"""
+import math
+
+from django.db.models import ExpressionWrapper, F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Stored precision: 9 characters is roughly a 5 m x 5 m cell.
+GEOHASH_PRECISION = 9
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Sorts after every geohash character, so [prefix, prefix + _PREFIX_END)
+# is exactly the set of hashes starting with ``prefix``.
+_PREFIX_END = '~'
+
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a coordinate pair as a geohash string."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    latitude = float(latitude)
+    longitude = float(longitude)
+    chars = []
+    bit = ch = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            ch = (ch << 1) | 1
+            rng[0] = mid
+        else:
+            ch <<= 1
+            rng[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(_BASE32[ch])
+            bit = ch = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Return (height, width) in degrees of a geohash cell."""
+    bits = 5 * precision
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def _wrap_longitude(longitude):
+    return ((longitude + 180.0) % 360.0) - 180.0
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, max_lat, min_lon, max_lon) enclosing the search circle.
+
+    Longitude bounds are None when the box would cross a pole or the
+    antimeridian; the geohash prefilter still applies in that case.
+    """
+    latitude = float(latitude)
+    longitude = float(longitude)
+    dlat = radius_km / KM_PER_DEGREE
+    min_lat = max(latitude - dlat, -90.0)
+    max_lat = min(latitude + dlat, 90.0)
+    cos_lat = math.cos(math.radians(latitude))
+    if cos_lat <= 1e-9 or min_lat <= -90.0 or max_lat >= 90.0:
+        return min_lat, max_lat, None, None
+    dlon = radius_km / (KM_PER_DEGREE * cos_lat)
+    min_lon = longitude - dlon
+    max_lon = longitude + dlon
+    if min_lon < -180.0 or max_lon > 180.0:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def covering_prefixes(latitude, longitude, radius_km):
+    """Geohash prefixes whose cells together cover the search circle.
+
+    Picks the longest prefix whose cell is at least ``radius_km`` on each
+    side, then returns that cell and its eight neighbours. Returns an
+    empty set when the radius is too large for any useful prefix.
+    """
+    latitude = float(latitude)
+    longitude = float(longitude)
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-9)
+    precision = 0
+    for p in range(1, GEOHASH_PRECISION + 1):
+        height, width = cell_size(p)
+        if height * KM_PER_DEGREE < radius_km or width * KM_PER_DEGREE * cos_lat < radius_km:
+            break
+        precision = p
+    if precision == 0:
+        return set()
+
+    height, width = cell_size(precision)
+    prefixes = set()
+    for dy in (-1, 0, 1):
+        lat = latitude + dy * height
+        if not -90.0 <= lat <= 90.0:
+            continue
+        for dx in (-1, 0, 1):
+            lon = _wrap_longitude(longitude + dx * width)
+            prefixes.add(encode_geohash(lat, lon, precision))
+    return prefixes
+
+
+def haversine_km(latitude, longitude, lat_field='latitude', lon_field='longitude'):
+    """ORM expression for the great-circle distance (km) to a point."""
+    lat = math.radians(float(latitude))
+    lon = math.radians(float(longitude))
+    dlat = Radians(F(lat_field)) - Value(lat)
+    dlon = Radians(F(lon_field)) - Value(lon)
+    a = (Power(Sin(dlat / 2), 2)
+         + Value(math.cos(lat)) * Cos(Radians(F(lat_field))) * Power(Sin(dlon / 2), 2))
+    return ExpressionWrapper(Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(a)),
+                             output_field=FloatField())
+
+
+def prefix_filter(prefixes, field='geohash'):
+    """Q matching rows whose geohash starts with any of ``prefixes``.
+
+    Expressed as string ranges rather than LIKE so SQLite can use the
+    index on the geohash column.
+    """
+    condition = Q()
+    for prefix in sorted(prefixes):
+        condition |= Q(**{f'{field}__gte': prefix, f'{field}__lt': prefix + _PREFIX_END})
+    return condition
+
+
+def filter_within(queryset, latitude, longitude, radius_km):
+    """Restrict ``queryset`` to job posts within ``radius_km`` of a point.
+
+    Annotates ``distance_km``; callers order by it for nearest-first.
+    """
+    queryset = queryset.exclude(geohash='')
+    prefixes = covering_prefixes(latitude, longitude, radius_km)
+    if prefixes:
+        queryset = queryset.filter(prefix_filter(prefixes))
+
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    queryset = queryset.filter(latitude__gte=min_lat, latitude__lte=max_lat)
+    if min_lon is not None:
+        queryset = queryset.filter(longitude__gte=min_lon, longitude__lte=max_lon)
+
+    queryset = queryset.annotate(distance_km=haversine_km(latitude, longitude))
+    return queryset.filter(distance_km__lte=radius_km)
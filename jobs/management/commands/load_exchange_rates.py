@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.salaries import DEFAULT_RATES_FILE, ExchangeRateError, load_rates
+
+
+class Command(BaseCommand):
+    help = ("Load exchange rates (units per USD) from a local JSON file and, if any rate "
+            "changed, re-normalize every job's salary in one batched update.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=str(DEFAULT_RATES_FILE),
+                            help="Rates file to load (default: %(default)s)")
+
+    def handle(self, *args, **options):
+        try:
+            version, updated = load_rates(options['file'])
+        except ExchangeRateError as exc:
+            raise CommandError(str(exc))
+        if version is None:
+            self.stdout.write("Exchange rates unchanged; nothing to do.")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded exchange rate version {version}; re-normalized {updated} job salaries."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from jobs import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for job posts from the JobPost table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of job posts inserted per statement batch.')
+
+    def handle(self, *args, **options):
+        total = search.rebuild_index(batch_size=options['batch_size'])
+        if not search.search_available():
+            self.stdout.write(self.style.WARNING(
+                "Full-text search requires SQLite with FTS5; nothing was indexed."))
+            return
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} job post(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs.stats import recompute_platform_stats
+
+
+class Command(BaseCommand):
+    help = ("Recompute the landing page totals (approved jobs, verified companies, students). "
+            "Run periodically, e.g. from cron, to correct any drift in the incremental updates.")
+
+    def handle(self, *args, **options):
+        stats = recompute_platform_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Platform stats refreshed: {stats.job_count} jobs, "
+            f"{stats.company_count} companies, {stats.student_count} students."))
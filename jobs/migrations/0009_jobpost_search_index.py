@@ -0,0 +1,50 @@
+from django.db import migrations
+
+# As of this migration; later changes to jobs.search do not apply here.
+SEARCH_TABLE = 'jobs_jobpost_search'
+SEARCH_COLUMNS = ('title', 'description', 'requirements', 'location', 'company')
+
+
+def create_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            + ', '.join(SEARCH_COLUMNS)
+            + ", tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+    JobPost = apps.get_model('jobs', 'JobPost')
+    rows = [
+        [job.pk, job.title, job.description, job.requirements, job.location,
+         ' '.join(p for p in [job.company.username, job.company.institution or ''] if p)]
+        for job in JobPost.objects.using(connection.alias).select_related('company')
+    ]
+    if rows:
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                rows)
+
+
+def drop_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_alter_jobpost_deadline'),
+        ('users', '0008_sentemail'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
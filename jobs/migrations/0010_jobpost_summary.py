@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:33
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def fill_summaries(apps, schema_editor):
+    JobPost = apps.get_model('jobs', 'JobPost')
+    jobs = list(JobPost.objects.only('id', 'description'))
+    for job in jobs:
+        job.summary = Truncator(job.description or '').words(30)
+    JobPost.objects.bulk_update(jobs, ['summary'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_jobpost_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobpost',
+            name='summary',
+            field=models.TextField(blank=True, editable=False, help_text='First words of the description, shown on listing cards'),
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:37
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+def fill_stats(apps, schema_editor):
+    PlatformStats = apps.get_model('jobs', 'PlatformStats')
+    JobPost = apps.get_model('jobs', 'JobPost')
+    CustomUser = apps.get_model('users', 'CustomUser')
+
+    totals = CustomUser.objects.aggregate(
+        company_count=Count('pk', filter=Q(is_company=True, verification_status='V')),
+        student_count=Count('pk', filter=Q(is_company=False)),
+    )
+    totals['job_count'] = JobPost.objects.filter(is_approved=True).count()
+    totals['refreshed_at'] = timezone.now()
+    PlatformStats.objects.update_or_create(pk=1, defaults=totals)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_jobpost_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_count', models.PositiveIntegerField(default=0, help_text='Approved job posts')),
+                ('company_count', models.PositiveIntegerField(default=0, help_text='Verified company accounts')),
+                ('student_count', models.PositiveIntegerField(default=0, help_text='Student (non-company) accounts')),
+                ('refreshed_at', models.DateTimeField(blank=True, help_text='When the totals were last fully recomputed', null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'platform stats',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_platformstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(condition=models.Q(('company_unread', True)), fields=['job'], name='application_company_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(condition=models.Q(('applicant_unread', True)), fields=['applicant'], name='application_appl_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobpost',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['-date_posted', '-id'], name='jobpost_approved_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobpost',
+            index=models.Index(fields=['company', '-date_posted', '-id'], name='jobpost_company_recent_idx'),
+        ),
+    ]
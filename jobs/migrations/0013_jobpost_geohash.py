@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:40
+
+from django.db import migrations, models
+
+GEOHASH_PRECISION = 9
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode_geohash(latitude, longitude):
+    """Geohash of a coordinate pair, as ``jobs.geo`` encoded it at this
+    migration."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    latitude = float(latitude)
+    longitude = float(longitude)
+    chars = []
+    bit = ch = 0
+    even = True
+    while len(chars) < GEOHASH_PRECISION:
+        rng, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            ch = (ch << 1) | 1
+            rng[0] = mid
+        else:
+            ch <<= 1
+            rng[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(_BASE32[ch])
+            bit = ch = 0
+    return ''.join(chars)
+
+
+def fill_geohashes(apps, schema_editor):
+    JobPost = apps.get_model('jobs', 'JobPost')
+    jobs = list(JobPost.objects.filter(latitude__isnull=False, longitude__isnull=False)
+                .only('id', 'latitude', 'longitude'))
+    for job in jobs:
+        job.geohash = encode_geohash(job.latitude, job.longitude)
+    JobPost.objects.bulk_update(jobs, ['geohash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobpost',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Geohash of latitude/longitude, used for proximity search', max_length=12),
+        ),
+        migrations.RunPython(fill_geohashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:45
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, DecimalField, F, Value, When
+from django.db.models.functions import Round
+
+# jobs/data/exchange_rates.json as shipped with this migration; later
+# files are loaded with ``manage.py load_exchange_rates``.
+BUNDLED_VERSION = '2026-10-01'
+BUNDLED_RATES = {
+    'USD': Decimal('1'),
+    'GHS': Decimal('12.40'),
+    'EUR': Decimal('0.92'),
+    'GBP': Decimal('0.79'),
+    'NGN': Decimal('1540.00'),
+    'KES': Decimal('129.20'),
+    'ZAR': Decimal('18.10'),
+    'CAD': Decimal('1.37'),
+    'AUD': Decimal('1.51'),
+}
+
+
+def load_bundled_rates(apps, schema_editor):
+    ExchangeRate = apps.get_model('jobs', 'ExchangeRate')
+    JobPost = apps.get_model('jobs', 'JobPost')
+    ExchangeRate.objects.bulk_create([
+        ExchangeRate(version=1, currency=currency, rate=rate, source=BUNDLED_VERSION)
+        for currency, rate in sorted(BUNDLED_RATES.items())
+    ])
+    output = DecimalField(max_digits=14, decimal_places=2)
+    JobPost.objects.update(salary_normalized=Case(
+        *[When(currency=currency,
+               then=Round(F('salary') / Value(rate), 2, output_field=output))
+          for currency, rate in sorted(BUNDLED_RATES.items())],
+        default=Value(None),
+        output_field=output,
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0013_jobpost_geohash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('currency', models.CharField(choices=[('USD', 'USD - US Dollar'), ('GHS', 'GHS - Ghanaian Cedi'), ('EUR', 'EUR - Euro'), ('GBP', 'GBP - British Pound'), ('NGN', 'NGN - Nigerian Naira'), ('KES', 'KES - Kenyan Shilling'), ('ZAR', 'ZAR - South African Rand'), ('CAD', 'CAD - Canadian Dollar'), ('AUD', 'AUD - Australian Dollar')], max_length=3)),
+                ('rate', models.DecimalField(decimal_places=8, help_text='Units of this currency per 1 USD', max_digits=18)),
+                ('source', models.CharField(blank=True, help_text='Version label from the rates file', max_length=100)),
+                ('loaded_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-version', 'currency'],
+            },
+        ),
+        migrations.AddField(
+            model_name='jobpost',
+            name='salary_normalized',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, help_text='Salary converted to USD at the current exchange rates', max_digits=14, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='jobpost',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['-salary_normalized', '-id'], name='jobpost_approved_salary_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='exchangerate',
+            unique_together={('version', 'currency')},
+        ),
+        migrations.RunPython(load_bundled_rates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:24
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+TICK = timedelta(microseconds=1)
+
+
+def fill_watermarks(apps, schema_editor):
+    """Turn the unread flags into status-change times and "seen" watermarks."""
+    Application = apps.get_model('jobs', 'Application')
+    UnreadCounter = apps.get_model('notifications', 'UnreadCounter')
+    now = timezone.now()
+
+    # Unread updates happened "now", just after the applicant's watermark
+    Application.objects.filter(applicant_unread=True).update(status_changed_at=now)
+    Application.objects.filter(applicant_unread=False).exclude(status='P').update(
+        status_changed_at=F('date_applied'))
+
+    user_ids = (set(Application.objects.values_list('job__company', flat=True).distinct())
+                | set(Application.objects.values_list('applicant', flat=True).distinct()))
+    UnreadCounter.objects.bulk_create([UnreadCounter(user_id=pk) for pk in user_ids],
+                                      ignore_conflicts=True, batch_size=500)
+    UnreadCounter.objects.update(company_applications_seen_at=now,
+                                 applicant_updates_seen_at=now - TICK)
+    # A company has seen everything before its oldest unread application
+    oldest_unread = (Application.objects.filter(company_unread=True)
+                     .values('job__company').annotate(oldest=Min('date_applied')))
+    for row in oldest_unread:
+        UnreadCounter.objects.filter(pk=row['job__company']).update(
+            company_applications_seen_at=row['oldest'] - TICK)
+    # ...so applications read after it are unread again; recount them
+    newer = (Application.objects
+             .filter(date_applied__gt=F('job__company__unread_counter__company_applications_seen_at'))
+             .values('job__company').annotate(n=Count('pk')))
+    UnreadCounter.objects.update(company_applications=0)
+    for row in newer:
+        UnreadCounter.objects.filter(pk=row['job__company']).update(company_applications=row['n'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_salary_normalization'),
+        ('notifications', '0007_read_watermarks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='status_changed_at',
+            field=models.DateTimeField(blank=True, help_text='When the company last changed the status', null=True),
+        ),
+        migrations.RunPython(fill_watermarks, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='application',
+            name='application_company_unread_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='application',
+            name='application_appl_unread_idx',
+        ),
+        migrations.RemoveField(
+            model_name='application',
+            name='applicant_unread',
+        ),
+        migrations.RemoveField(
+            model_name='application',
+            name='company_unread',
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['job', 'date_applied'], name='application_job_applied_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['applicant', 'status_changed_at'], name='application_appl_updates_idx'),
+        ),
+    ]
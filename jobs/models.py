@@ -1,6 +1,10 @@
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
+from django.utils.text import Truncator
+
+from .geo import encode_geohash
+from .salaries import normalize as normalize_salary
 
 
 class JobPost(models.Model):
@@ -72,6 +76,10 @@ class JobPost(models.Model):
                                 limit_choices_to={'is_company': True},
                                 related_name='job_posts')
     description = models.TextField(help_text="Detailed job description")
+    summary = models.TextField(
+        blank=True,
+        editable=False,
+        help_text="First words of the description, shown on listing cards")
     requirements = models.TextField(
         help_text="Required qualifications and skills")
     location = models.CharField(max_length=200)
@@ -89,6 +97,12 @@ class JobPost(models.Model):
         blank=True,
         help_text="Longitude for live location (optional, requires user permission)"
     )
+    geohash = models.CharField(
+        max_length=12,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text="Geohash of latitude/longitude, used for proximity search")
     category = models.CharField(max_length=3,
                                 choices=CATEGORY_CHOICES,
                                 default=IT)
@@ -106,6 +120,13 @@ class JobPost(models.Model):
                                 choices=CURRENCY_CHOICES,
                                 default='USD',
                                 help_text="Currency for salary")
+    salary_normalized = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Salary converted to USD at the current exchange rates")
     image = models.ImageField(
         upload_to='job_images/',
         null=True,
@@ -120,11 +141,51 @@ class JobPost(models.Model):
             models.Index(fields=['-date_posted']),
             models.Index(fields=['category']),
             models.Index(fields=['job_type']),
+            # Public listing: is_approved=True ORDER BY -date_posted, -id
+            models.Index(fields=['-date_posted', '-id'],
+                         condition=models.Q(is_approved=True),
+                         name='jobpost_approved_recent_idx'),
+            # Company views: company=... ORDER BY -date_posted, -id
+            models.Index(fields=['company', '-date_posted', '-id'],
+                         name='jobpost_company_recent_idx'),
+            # Pay filters and the highest-salary-first sort
+            models.Index(fields=['-salary_normalized', '-id'],
+                         condition=models.Q(is_approved=True),
+                         name='jobpost_approved_salary_idx'),
         ]
 
+    # Number of description words kept in ``summary`` for listing cards.
+    SUMMARY_WORDS = 30
+
     def __str__(self):
         return f"{self.title} - {self.company.username}"
 
+    def save(self, *args, **kwargs):
+        self.summary = self.build_summary(self.description)
+        self.geohash = self.build_geohash(self.latitude, self.longitude)
+        self.salary_normalized = normalize_salary(self.salary, self.currency)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'description' in update_fields:
+                update_fields.add('summary')
+            if {'latitude', 'longitude'} & update_fields:
+                update_fields.add('geohash')
+            if {'salary', 'currency'} & update_fields:
+                update_fields.add('salary_normalized')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def build_summary(cls, description):
+        return Truncator(description or '').words(cls.SUMMARY_WORDS)
+
+    @staticmethod
+    def build_geohash(latitude, longitude):
+        if latitude is None or longitude is None:
+            return ''
+        return encode_geohash(latitude, longitude)
+
 
 class Application(models.Model):
     """
@@ -172,13 +233,12 @@ class Application(models.Model):
     status = models.CharField(max_length=1,
                               choices=STATUS_CHOICES,
                               default=PENDING)
-    # Notification flags
-    company_unread = models.BooleanField(
-        default=True,
-        help_text="Whether the company has an unread notification for this application")
-    applicant_unread = models.BooleanField(
-        default=False,
-        help_text="Whether the applicant has an unread notification for status updates")
+    # Compared with the applicant's "seen" watermark (UnreadCounter) to
+    # tell whether the latest status update is unread
+    status_changed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the company last changed the status")
 
     class Meta:
         ordering = ['-date_applied']
@@ -187,7 +247,63 @@ class Application(models.Model):
         indexes = [
             models.Index(fields=['-date_applied']),
             models.Index(fields=['status']),
+            # Unread applications: job__company=... AND date_applied > watermark
+            models.Index(fields=['job', 'date_applied'],
+                         name='application_job_applied_idx'),
+            # Unread updates: applicant=... AND status_changed_at > watermark
+            models.Index(fields=['applicant', 'status_changed_at'],
+                         name='application_appl_updates_idx'),
         ]
 
     def __str__(self):
         return f"{self.applicant.username} - {self.job.title}"
+
+
+class ExchangeRate(models.Model):
+    """
+    Units of ``currency`` per US dollar in one version of the rate table.
+
+    Rates are loaded from a local file with ``manage.py
+    load_exchange_rates``. Each load that changes anything writes a full
+    new version; the highest version is the one in use.
+    """
+    version = models.PositiveIntegerField()
+    currency = models.CharField(max_length=3, choices=JobPost.CURRENCY_CHOICES)
+    rate = models.DecimalField(max_digits=18, decimal_places=8,
+                               help_text="Units of this currency per 1 USD")
+    source = models.CharField(max_length=100, blank=True,
+                              help_text="Version label from the rates file")
+    loaded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-version', 'currency']
+        unique_together = [['version', 'currency']]
+
+    def __str__(self):
+        return f"{self.currency} {self.rate} (v{self.version})"
+
+
+class PlatformStats(models.Model):
+    """
+    Single-row table holding the public platform totals shown on the
+    landing page. Kept up to date incrementally by signal handlers on
+    JobPost and CustomUser; ``manage.py refresh_platform_stats`` recomputes
+    it from scratch to correct any drift.
+    """
+    SINGLETON_ID = 1
+
+    job_count = models.PositiveIntegerField(
+        default=0, help_text="Approved job posts")
+    company_count = models.PositiveIntegerField(
+        default=0, help_text="Verified company accounts")
+    student_count = models.PositiveIntegerField(
+        default=0, help_text="Student (non-company) accounts")
+    refreshed_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text="When the totals were last fully recomputed")
+
+    class Meta:
+        verbose_name_plural = 'platform stats'
+
+    def __str__(self):
+        return "Platform statistics"
@@ -0,0 +1,260 @@
+"""
+Keyset ("cursor") pagination.
+
+Instead of ``OFFSET n`` plus a ``COUNT(*)`` for the page range, each page is
+fetched with a ``WHERE (key) < (last key seen)`` condition on an indexed
+ordering such as ``(-date_posted, -id)``. Deep pages cost the same as the
+first one and no total count is ever computed.
+
+Cursors are opaque url-safe tokens carrying the ordering values of the row
+at the page boundary plus the direction to read in. The legacy ``?page=N``
+parameter is still honoured so old links and bookmarks keep working.
+"""
+import base64
+import binascii
+import datetime
+import decimal
+import functools
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorPage:
+    """One page of results; quacks enough like ``django.core.paginator.Page``
+    for templates that iterate it and check ``has_next``/``has_previous``."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Paginate ``queryset`` by ``ordering``, which must end in a unique
+    column (normally ``id``) so every row has a distinct key.
+
+    ``ordering`` entries may name model fields or annotations already
+    present on the queryset, with an optional ``-`` prefix for descending.
+    """
+
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, per_page, ordering, cursor_param='cursor',
+                 page_param='page'):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.cursor_param = cursor_param
+        self.page_param = page_param
+
+    # Tokens ---------------------------------------------------------------
+
+    def _field_names(self):
+        return [o.lstrip('-') for o in self.ordering]
+
+    def _key(self, obj):
+        return [getattr(obj, name) for name in self._field_names()]
+
+    def encode_cursor(self, obj, direction):
+        values = [_serialize(v) for v in self._key(obj)]
+        payload = json.dumps([direction, values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, token):
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            direction, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError, binascii.Error):
+            raise InvalidCursor(token)
+        if direction not in (self.NEXT, self.PREVIOUS) or len(values) != len(self.ordering):
+            raise InvalidCursor(token)
+        model = self.queryset.model
+        decoded = []
+        for name, value in zip(self._field_names(), values):
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                decoded.append(value)
+                continue
+            try:
+                decoded.append(None if value is None else field.to_python(value))
+            except ValidationError:
+                raise InvalidCursor(token)
+        return direction, decoded
+
+    # Queries --------------------------------------------------------------
+
+    def _seek(self, values, forward):
+        """Build the keyset condition for rows after (or before) ``values``.
+
+        Nullable columns are supported with NULL sorting below every other
+        value, as SQLite does (NULLs first ascending, last descending).
+        """
+        condition = Q()
+        equal = Q()
+        for order, value in zip(self.ordering, values):
+            name = order.lstrip('-')
+            descending = order.startswith('-')
+            # Reading forward in a descending column means smaller values.
+            smaller = descending == forward
+            if value is None:
+                # Nothing sorts below NULL; everything non-null sorts above.
+                if not smaller:
+                    condition |= equal & Q(**{f'{name}__isnull': False})
+                equal &= Q(**{f'{name}__isnull': True})
+                continue
+            if smaller:
+                step = Q(**{f'{name}__lt': value})
+                if self._nullable(name):
+                    step |= Q(**{f'{name}__isnull': True})
+            else:
+                step = Q(**{f'{name}__gt': value})
+            condition |= equal & step
+            equal &= Q(**{name: value})
+        return condition
+
+    def _nullable(self, name):
+        try:
+            return self.queryset.model._meta.get_field(name).null
+        except FieldDoesNotExist:
+            return False
+
+    def _reversed_ordering(self):
+        return [o[1:] if o.startswith('-') else f'-{o}' for o in self.ordering]
+
+    def paginate(self, cursor=None, page_number=None):
+        """Return a CursorPage for ``cursor`` (or legacy ``page_number``)."""
+        direction, values = self.NEXT, None
+        if cursor:
+            try:
+                direction, values = self.decode_cursor(cursor)
+            except InvalidCursor:
+                direction, values = self.NEXT, None
+
+        if values is None:
+            offset = 0
+            if page_number and not cursor:
+                try:
+                    offset = max(int(page_number) - 1, 0) * self.per_page
+                except (TypeError, ValueError):
+                    offset = 0
+            rows = self._fetch(None, True, offset)
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            return self._page(rows, has_next=has_more, has_previous=offset > 0)
+
+        forward = direction == self.NEXT
+        rows = self._fetch(values, forward)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if forward:
+            return self._page(rows, has_next=has_more, has_previous=True)
+        rows.reverse()
+        return self._page(rows, has_next=True, has_previous=has_more)
+
+    def _fetch(self, values, forward, offset=0):
+        """Up to ``per_page + 1`` rows past ``values`` in reading order."""
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, forward))
+        ordering = self.ordering if forward else self._reversed_ordering()
+        return list(queryset.order_by(*ordering)[offset:offset + self.per_page + 1])
+
+    def get_page(self, request):
+        """Paginate using the cursor/page parameters on ``request.GET``."""
+        return self.paginate(cursor=request.GET.get(self.cursor_param),
+                             page_number=request.GET.get(self.page_param))
+
+    def _page(self, rows, has_next, has_previous):
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_next:
+                next_cursor = self.encode_cursor(rows[-1], self.NEXT)
+            if has_previous:
+                previous_cursor = self.encode_cursor(rows[0], self.PREVIOUS)
+        return CursorPage(rows, next_cursor, previous_cursor)
+
+
+class MergedCursorPaginator(CursorPaginator):
+    """Keyset pagination over several querysets read as one stream.
+
+    Each queryset is fetched with the same keyset condition and limit, and
+    the results are merged in Python, so a page costs one indexed query per
+    source however deep it is. ``ordering`` must name columns or
+    annotations present on every queryset and, taken together, be unique
+    across all of them (e.g. annotate each source with a distinct
+    constant and order by it before ``id``).
+    """
+
+    def __init__(self, querysets, per_page, ordering, **kwargs):
+        self.querysets = list(querysets)
+        super().__init__(self.querysets[0], per_page, ordering, **kwargs)
+
+    def _fetch(self, values, forward, offset=0):
+        ordering = self.ordering if forward else self._reversed_ordering()
+        # With a legacy ?page=N offset, the first offset + per_page + 1 rows
+        # of each source are enough to find the page in the merged order.
+        limit = offset + self.per_page + 1
+        rows = []
+        for queryset in self.querysets:
+            if values is not None:
+                queryset = queryset.filter(self._seek(values, forward))
+            rows.extend(queryset.order_by(*ordering)[:limit])
+        rows.sort(key=functools.cmp_to_key(self._compare), reverse=not forward)
+        return rows[offset:limit]
+
+    def _compare(self, a, b):
+        for order, x, y in zip(self.ordering, self._key(a), self._key(b)):
+            if x == y:
+                continue
+            # NULLs sort lowest, as in _seek
+            if x is None or y is None:
+                result = -1 if x is None else 1
+            else:
+                result = -1 if x < y else 1
+            return -result if order.startswith('-') else result
+        return 0
+
+
+def _serialize(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+def querystring_without(request, *params):
+    """Current query string minus pagination parameters, for building links."""
+    query = request.GET.copy()
+    for param in params:
+        query.pop(param, None)
+    return query.urlencode()
@@ -0,0 +1,163 @@
+"""
+Salary normalization across currencies.
+
+``JobPost.salary`` is stored in the poster's currency, so it cannot be
+compared or sorted directly. Each job also stores ``salary_normalized``,
+the salary converted to US dollars with the current exchange rates, which
+is what the job list filters and sorts on.
+
+Rates live in the ``ExchangeRate`` table, loaded from a local JSON file by
+``manage.py load_exchange_rates`` (no network access). Every load that
+changes a rate writes a complete new version; the highest version is
+current. After a load, ``recompute_normalized_salaries`` refreshes every
+job in a single UPDATE.
+"""
+import json
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.apps import apps as global_apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Max, Value, When
+from django.db.models.functions import Round
+
+from .caching import bump_catalog_version
+
+BASE_CURRENCY = 'USD'
+
+DEFAULT_RATES_FILE = Path(__file__).resolve().parent / 'data' / 'exchange_rates.json'
+
+RATES_CACHE_KEY = 'jobs:exchange-rates'
+
+# ``load_rates`` clears the cached rates only in its own process (the cache
+# is per process), so other workers pick up a new version within this time.
+RATES_CACHE_TIMEOUT = 5 * 60
+
+CENT = Decimal('0.01')
+
+
+class ExchangeRateError(ValueError):
+    pass
+
+
+def _rate_model(apps=global_apps):
+    return apps.get_model('jobs', 'ExchangeRate')
+
+
+def current_version(apps=global_apps):
+    return _rate_model(apps).objects.aggregate(v=Max('version'))['v']
+
+
+def _load_current(apps=global_apps):
+    version = current_version(apps)
+    rates = {}
+    if version is not None:
+        rows = _rate_model(apps).objects.filter(version=version).values_list('currency', 'rate')
+        rates = dict(rows)
+    rates.setdefault(BASE_CURRENCY, Decimal(1))
+    return version, rates
+
+
+def current_rates():
+    """``(version, {currency: units per USD})`` for the current version."""
+    cached = cache.get(RATES_CACHE_KEY)
+    if cached is None:
+        cached = _load_current()
+        cache.set(RATES_CACHE_KEY, cached, RATES_CACHE_TIMEOUT)
+    return cached
+
+
+def normalize(salary, currency, rates=None):
+    """``salary`` in ``currency`` converted to USD, or None if unknown."""
+    if salary is None:
+        return None
+    if rates is None:
+        rates = current_rates()[1]
+    rate = rates.get(currency)
+    if not rate:
+        return None
+    return (Decimal(salary) / Decimal(rate)).quantize(CENT)
+
+
+def read_rates_file(path=DEFAULT_RATES_FILE):
+    """Parse a rates file into ``(label, {currency: Decimal})``.
+
+    The file looks like ``{"version": "2026-10-01", "base": "USD",
+    "rates": {"GHS": "12.50", ...}}`` with rates in units per US dollar.
+    """
+    try:
+        with open(path, encoding='utf-8') as fh:
+            data = json.load(fh)
+    except (OSError, ValueError) as exc:
+        raise ExchangeRateError(f"Cannot read exchange rates from {path}: {exc}")
+    if data.get('base', BASE_CURRENCY) != BASE_CURRENCY:
+        raise ExchangeRateError(f"Exchange rates must be quoted against {BASE_CURRENCY}")
+    rates = {}
+    for currency, value in (data.get('rates') or {}).items():
+        try:
+            rate = Decimal(str(value))
+        except InvalidOperation:
+            raise ExchangeRateError(f"Invalid rate for {currency}: {value!r}")
+        if rate <= 0:
+            raise ExchangeRateError(f"Invalid rate for {currency}: {value!r}")
+        rates[currency.upper()] = rate
+    rates.setdefault(BASE_CURRENCY, Decimal(1))
+    return str(data.get('version', '')), rates
+
+
+def store_rates(label, rates, apps=global_apps):
+    """Save ``rates`` as a new version unless they match the current one.
+
+    Returns the new version number, or None when nothing changed.
+    """
+    ExchangeRate = _rate_model(apps)
+    version, current = _load_current(apps)
+    if version is not None and current == rates:
+        return None
+    new_version = (version or 0) + 1
+    ExchangeRate.objects.bulk_create([
+        ExchangeRate(version=new_version, currency=currency, rate=rate, source=label)
+        for currency, rate in sorted(rates.items())
+    ])
+    return new_version
+
+
+def recompute_normalized_salaries(rates=None, apps=global_apps):
+    """Refresh ``salary_normalized`` on every job in one UPDATE.
+
+    ``rates`` defaults to the current version. Returns the number of rows
+    updated.
+    """
+    JobPost = apps.get_model('jobs', 'JobPost')
+    if rates is None:
+        _, rates = _load_current(apps)
+    output = DecimalField(max_digits=14, decimal_places=2)
+    # Rounded to cents, like normalize()
+    converted = Case(
+        *[When(currency=currency,
+               then=Round(F('salary') / Value(rate), 2, output_field=output))
+          for currency, rate in sorted(rates.items())],
+        default=Value(None),
+        output_field=output,
+    )
+    return JobPost.objects.update(salary_normalized=converted)
+
+
+def load_rates(path=DEFAULT_RATES_FILE, apps=global_apps):
+    """Load a rates file and, if it changed anything, re-normalize all jobs.
+
+    Returns ``(version, updated_jobs)``; version is None if unchanged.
+    """
+    label, rates = read_rates_file(path)
+    with transaction.atomic():
+        version = store_rates(label, rates, apps=apps)
+        updated = 0
+        if version is not None:
+            updated = recompute_normalized_salaries(rates, apps=apps)
+    if apps is global_apps:
+        cache.delete(RATES_CACHE_KEY)
+        if version is not None:
+            # The bulk UPDATE bypasses the save signals
+            bump_catalog_version()
+    return version, updated
@@ -0,0 +1,196 @@
+"""
+Full-text search over job posts backed by an SQLite FTS5 virtual table.
+
+The index lives in ``jobs_jobpost_search`` (created by migration 0009) and
+uses the JobPost primary key as its rowid, so search results can be joined
+straight back onto the JobPost queryset. Rows are kept in sync by the
+signal handlers in ``jobs.signals``; ``manage.py rebuild_search_index``
+repopulates the table from scratch.
+
+On databases other than SQLite (or SQLite builds without FTS5) the helpers
+report the index as unavailable and JobListView falls back to the original
+``icontains`` filtering.
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = 'jobs_jobpost_search'
+
+# Column order matters: bm25() weights below are positional.
+SEARCH_COLUMNS = ('title', 'description', 'requirements', 'location', 'company')
+
+# Field boosts passed to bm25(); a title hit counts far more than a match
+# buried in the description.
+SEARCH_WEIGHTS = (10.0, 2.0, 1.0, 4.0, 5.0)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Databases (by NAME) already known to carry the index table, so the
+# sqlite_master lookup only happens once per database per process.
+_available_on = set()
+
+
+def search_available():
+    """Return True if the FTS5 index table exists on the default database."""
+    if connection.vendor != 'sqlite':
+        return False
+    name = str(connection.settings_dict['NAME'])
+    if name in _available_on:
+        return True
+    if SEARCH_TABLE in connection.introspection.table_names():
+        _available_on.add(name)
+        return True
+    return False
+
+
+def create_search_table(schema_connection=None):
+    """Create the FTS5 virtual table if it does not exist yet."""
+    conn = schema_connection or connection
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            + ', '.join(SEARCH_COLUMNS)
+            + ", tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+
+def drop_search_table(schema_connection=None):
+    conn = schema_connection or connection
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+    _available_on.discard(str(conn.settings_dict['NAME']))
+
+
+def company_search_text(company):
+    """Text indexed for the company column (username plus institution)."""
+    parts = [company.username, getattr(company, 'institution', None) or '']
+    return ' '.join(p for p in parts if p)
+
+
+def _document(job):
+    return (
+        job.title,
+        job.description,
+        job.requirements,
+        job.location,
+        company_search_text(job.company),
+    )
+
+
+def index_job(job):
+    """Insert or replace a single job post in the search index."""
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [job.pk])
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [job.pk, *_document(job)])
+
+
+def remove_job(job_id):
+    """Drop a job post from the search index."""
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [job_id])
+
+
+def reindex_company(company):
+    """Refresh the company column for every job owned by ``company``."""
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {SEARCH_TABLE} SET company = %s WHERE rowid IN "
+            "(SELECT id FROM jobs_jobpost WHERE company_id = %s)",
+            [company_search_text(company), company.pk])
+
+
+def rebuild_index(batch_size=500):
+    """Repopulate the whole index from the JobPost table.
+
+    Returns the number of indexed job posts.
+    """
+    from .models import JobPost
+
+    create_search_table()
+    if not search_available():
+        return 0
+
+    total = 0
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+            jobs = JobPost.objects.select_related('company').order_by('pk')
+            batch = []
+            for job in jobs.iterator(chunk_size=batch_size):
+                batch.append([job.pk, *_document(job)])
+                if len(batch) >= batch_size:
+                    insert_rows(cursor, batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                insert_rows(cursor, batch)
+                total += len(batch)
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+    return total
+
+
+def insert_rows(cursor, rows):
+    """Bulk insert ``[rowid, *columns]`` rows into the index."""
+    cursor.executemany(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        rows)
+
+
+def build_match_expression(query):
+    """Turn free-form user input into a safe FTS5 MATCH expression.
+
+    Every word is quoted (so FTS5 operators typed by users are treated as
+    text) and turned into a prefix query, e.g. ``"soft eng"`` becomes
+    ``"soft"* "eng"*`` which matches "software engineer".
+    """
+    tokens = _TOKEN_RE.findall(query or '')
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _weights():
+    return ', '.join(str(w) for w in SEARCH_WEIGHTS)
+
+
+def apply_search(queryset, query):
+    """Filter ``queryset`` by ``query``.
+
+    Uses the FTS5 index when available: the MATCH is a subquery on the
+    queryset's ids, so any other filters apply in the same query, and the
+    BM25 score is annotated as ``search_rank`` (lower = better) so callers
+    can order by relevance. Otherwise falls back to substring matching on
+    title, description and location.
+    """
+    if not search_available():
+        return queryset.filter(
+            Q(title__icontains=query)
+            | Q(description__icontains=query)
+            | Q(location__icontains=query))
+
+    expression = build_match_expression(query)
+    if not expression:
+        return queryset.none()
+    table = queryset.model._meta.db_table
+    matches = RawSQL(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s",
+                     [expression])
+    rank = RawSQL(
+        f"SELECT bm25({SEARCH_TABLE}, {_weights()}) FROM {SEARCH_TABLE} "
+        f"WHERE {SEARCH_TABLE} MATCH %s AND {SEARCH_TABLE}.rowid = {table}.id",
+        [expression], output_field=FloatField())
+    return queryset.filter(pk__in=matches).annotate(search_rank=rank)
@@ -0,0 +1,127 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import search, stats
+from .caching import bump_catalog_version
+from .models import JobPost
+
+
+@receiver(post_save, sender=JobPost)
+def index_job_post(sender, instance, raw=False, **kwargs):
+    """Keep the full-text search index in sync with saved job posts."""
+    if raw:
+        return
+    search.index_job(instance)
+
+
+@receiver(post_delete, sender=JobPost)
+def unindex_job_post(sender, instance, **kwargs):
+    search.remove_job(instance.pk)
+
+
+# Fields each pre_save/post_save pair below depends on.
+JOB_STATS_FIELDS = {'is_approved'}
+USER_STATS_FIELDS = {'is_company', 'verification_status'}
+COMPANY_SEARCH_FIELDS = {'username', 'institution'}
+# Company details shown on job pages, which are cached per catalog version
+COMPANY_PAGE_FIELDS = COMPANY_SEARCH_FIELDS | {'email', 'phone_number'}
+
+
+def _untouched(update_fields, fields):
+    """True when a save restricted to ``update_fields`` cannot change ``fields``."""
+    return update_fields is not None and not fields.intersection(update_fields)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def reindex_company_jobs(sender, instance, created=False, raw=False, update_fields=None,
+                         **kwargs):
+    """Company renames must show up in search results for their jobs, and
+    name or contact changes on their (cached) job pages."""
+    if raw or created or not getattr(instance, 'is_company', False):
+        return
+    if _untouched(update_fields, COMPANY_PAGE_FIELDS):
+        return
+    before = getattr(instance, '_company_before', None) or {}
+
+    def changed(fields):
+        return any(field not in before or before[field] != getattr(instance, field)
+                   for field in fields)
+
+    if changed(COMPANY_SEARCH_FIELDS):
+        search.reindex_company(instance)
+    if changed(COMPANY_PAGE_FIELDS):
+        bump_catalog_version()
+
+
+@receiver(post_save, sender=JobPost)
+@receiver(post_delete, sender=JobPost)
+def invalidate_catalog_caches(sender, instance, raw=False, **kwargs):
+    """Any change to a job post invalidates caches derived from the catalog."""
+    if raw:
+        return
+    bump_catalog_version()
+
+
+# Landing page totals ------------------------------------------------------
+#
+# pre_save records how the stored row counted towards the totals, post_save
+# applies the difference. Saves are rare compared to landing page views, so
+# one extra primary-key read per save is a good trade. Saves limited by
+# update_fields to columns the totals do not depend on skip both steps.
+
+@receiver(pre_save, sender=JobPost)
+def remember_job_stats(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._stats_before = None
+    if raw or instance.pk is None or _untouched(update_fields, JOB_STATS_FIELDS):
+        return
+    old = JobPost.objects.filter(pk=instance.pk).values('is_approved').first()
+    if old is not None:
+        instance._stats_before = stats.job_contribution(old['is_approved'])
+
+
+@receiver(post_save, sender=JobPost)
+def update_job_stats(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or _untouched(update_fields, JOB_STATS_FIELDS):
+        return
+    stats.apply_platform_delta(getattr(instance, '_stats_before', None),
+                               stats.job_contribution(instance.is_approved))
+
+
+@receiver(post_delete, sender=JobPost)
+def remove_job_stats(sender, instance, **kwargs):
+    stats.apply_platform_delta(stats.job_contribution(instance.is_approved), None)
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def remember_user_stats(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Also remembers the company's page details for ``reindex_company_jobs``,
+    from the same read."""
+    instance._stats_before = None
+    instance._company_before = None
+    if raw or instance.pk is None:
+        return
+    if (_untouched(update_fields, USER_STATS_FIELDS)
+            and _untouched(update_fields, COMPANY_PAGE_FIELDS)):
+        return
+    old = (sender.objects.filter(pk=instance.pk)
+           .values('is_company', 'verification_status', *COMPANY_PAGE_FIELDS).first())
+    if old is not None:
+        instance._stats_before = stats.user_contribution(
+            old['is_company'], old['verification_status'])
+        instance._company_before = {field: old[field] for field in COMPANY_PAGE_FIELDS}
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def update_user_stats(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or _untouched(update_fields, USER_STATS_FIELDS):
+        return
+    stats.apply_platform_delta(
+        getattr(instance, '_stats_before', None),
+        stats.user_contribution(instance.is_company, instance.verification_status))
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def remove_user_stats(sender, instance, **kwargs):
+    stats.apply_platform_delta(
+        stats.user_contribution(instance.is_company, instance.verification_status), None)
@@ -0,0 +1,124 @@
+"""
+Dashboard statistics.
+
+Each function issues one conditional-aggregate query per table
+(``COUNT(*) FILTER (WHERE ...)``) instead of a separate ``count()`` per
+number shown on the dashboard.
+
+The landing page totals are different: they are materialized in the
+``PlatformStats`` row and adjusted by signal handlers as jobs and users
+change, so anonymous visitors never trigger a COUNT at all.
+"""
+from django.apps import apps as global_apps
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from users.models import CustomUser
+from .models import Application, JobPost, PlatformStats
+
+
+def _start_of_today():
+    return timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def admin_dashboard_stats():
+    """Platform-wide totals for the admin dashboard (three queries)."""
+    stats = CustomUser.objects.aggregate(
+        total_users=Count('pk'),
+        total_students=Count('pk', filter=Q(is_company=False)),
+        total_companies=Count('pk', filter=Q(is_company=True)),
+    )
+    stats.update(JobPost.objects.aggregate(
+        total_jobs=Count('pk'),
+        approved_jobs=Count('pk', filter=Q(is_approved=True)),
+        pending_jobs=Count('pk', filter=Q(is_approved=False)),
+    ))
+    stats.update(Application.objects.aggregate(
+        total_applications=Count('pk'),
+        pending_applications=Count('pk', filter=Q(status=Application.PENDING)),
+    ))
+    return stats
+
+
+def company_dashboard_stats(company):
+    """Job and application totals for one company (two queries)."""
+    stats = JobPost.objects.filter(company=company).aggregate(
+        total_jobs=Count('pk'),
+        active_jobs=Count('pk', filter=Q(deadline__gte=_start_of_today())),
+    )
+    stats.update(Application.objects.filter(job__company=company).aggregate(
+        total_applications=Count('pk'),
+        pending_applications=Count('pk', filter=Q(status=Application.PENDING)),
+    ))
+    return stats
+
+
+def student_dashboard_stats(student):
+    """Application totals by status for one student (one query)."""
+    return Application.objects.filter(applicant=student).aggregate(
+        total_applications=Count('pk'),
+        pending=Count('pk', filter=Q(status=Application.PENDING)),
+        accepted=Count('pk', filter=Q(status=Application.ACCEPTED)),
+        rejected=Count('pk', filter=Q(status=Application.REJECTED)),
+    )
+
+
+def job_contribution(is_approved):
+    """How one job post counts towards the platform totals."""
+    return {'job_count': 1 if is_approved else 0}
+
+
+def user_contribution(is_company, verification_status):
+    """How one user account counts towards the platform totals."""
+    return {
+        'company_count': 1 if is_company and verification_status == CustomUser.VERIFIED else 0,
+        'student_count': 0 if is_company else 1,
+    }
+
+
+def apply_platform_delta(old, new):
+    """Shift the materialized totals from contribution ``old`` to ``new``.
+
+    Either side may be None (object created or deleted).
+    """
+    old = old or {}
+    new = new or {}
+    changes = {}
+    for key in set(old) | set(new):
+        delta = new.get(key, 0) - old.get(key, 0)
+        if delta:
+            changes[key] = F(key) + delta
+    if not changes:
+        return
+    if not PlatformStats.objects.filter(pk=PlatformStats.SINGLETON_ID).update(**changes):
+        # No row yet: build it from scratch, which already includes this change.
+        recompute_platform_stats()
+
+
+def recompute_platform_stats(apps=global_apps):
+    """Recompute the landing page totals from the source tables."""
+    Stats = apps.get_model('jobs', 'PlatformStats')
+    Job = apps.get_model('jobs', 'JobPost')
+    User = apps.get_model('users', 'CustomUser')
+
+    totals = User.objects.aggregate(
+        company_count=Count('pk', filter=Q(is_company=True,
+                                           verification_status=CustomUser.VERIFIED)),
+        student_count=Count('pk', filter=Q(is_company=False)),
+    )
+    totals['job_count'] = Job.objects.filter(is_approved=True).count()
+    totals['refreshed_at'] = timezone.now()
+    stats, _ = Stats.objects.update_or_create(pk=PlatformStats.SINGLETON_ID, defaults=totals)
+    return stats
+
+
+def landing_stats():
+    """Landing page totals, read from the materialized row."""
+    row = (PlatformStats.objects.filter(pk=PlatformStats.SINGLETON_ID)
+           .values('job_count', 'company_count', 'student_count').first())
+    if row is None:
+        stats = recompute_platform_stats()
+        row = {'job_count': stats.job_count,
+               'company_count': stats.company_count,
+               'student_count': stats.student_count}
+    return row
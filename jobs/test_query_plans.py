@@ -0,0 +1,76 @@
+"""
+Query plan checks for the hot access paths.
+
+Each test runs ``EXPLAIN QUERY PLAN`` (via ``QuerySet.explain()``) for a
+query the app issues on nearly every request and fails if SQLite would
+answer it with a full table scan, or without the index meant for it.
+
+An ordered ``SCAN ... USING INDEX`` is accepted only for the expected
+index: for a partial index such as ``jobpost_approved_recent_idx`` that
+walks just the matching rows in order and stops at the LIMIT.
+"""
+import re
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from messaging.models import Message
+from notifications.models import Notification
+from .models import Application, JobPost
+
+_SCAN_RE = re.compile(r'\bSCAN \w+.*$', re.MULTILINE)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN checks are SQLite-specific')
+class HotQueryPlanTests(TestCase):
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        message = f"\n{plan}\n\nSQL: {queryset.query}"
+        scans = [line for line in _SCAN_RE.findall(plan)
+                 if not line.endswith(f'INDEX {index_name}')]
+        self.assertEqual(scans, [], f"Full scan in query plan:{message}")
+        self.assertIn(f'INDEX {index_name}', plan, f"{index_name} not used:{message}")
+
+    def test_public_job_listing(self):
+        self.assertUsesIndex(
+            JobPost.objects.filter(is_approved=True).order_by('-date_posted', '-id')[:11],
+            'jobpost_approved_recent_idx')
+
+    def test_company_job_listing(self):
+        self.assertUsesIndex(
+            JobPost.objects.filter(company_id=1).order_by('-date_posted', '-id')[:11],
+            'jobpost_company_recent_idx')
+
+    def test_highest_salary_listing(self):
+        self.assertUsesIndex(
+            JobPost.objects.filter(is_approved=True).order_by('-salary_normalized', '-id')[:11],
+            'jobpost_approved_salary_idx')
+
+    def test_notification_inbox(self):
+        self.assertUsesIndex(
+            Notification.objects.filter(recipient_id=1).order_by('-updated_at', '-id')[:11],
+            'notification_inbox_idx')
+
+    def test_unread_notifications(self):
+        self.assertUsesIndex(
+            Notification.objects.filter(recipient_id=1, is_read=False).order_by('-created_at'),
+            'notification_unread_idx')
+
+    def test_unread_messages_in_conversation(self):
+        self.assertUsesIndex(
+            Message.objects.filter(conversation_id=1, timestamp__gt=timezone.now())
+            .exclude(sender_id=1),
+            'message_history_idx')
+
+    def test_unread_company_applications(self):
+        self.assertUsesIndex(
+            Application.objects.filter(job__company_id=1, date_applied__gt=timezone.now()),
+            'application_job_applied_idx')
+
+    def test_unread_applicant_updates(self):
+        self.assertUsesIndex(
+            Application.objects.filter(applicant_id=1, status_changed_at__gt=timezone.now()),
+            'application_appl_updates_idx')
@@ -1,3 +1,599 @@
+import json
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from users.models import CustomUser
+from .models import Application, JobPost
+from . import caching, clusters, facets, geo, salaries, search
+from . import stats as stats_service
+from .pagination import CursorPaginator
+
+
+def make_company(username='acme', **kwargs):
+    kwargs.setdefault('is_company', True)
+    kwargs.setdefault('verification_status', CustomUser.VERIFIED)
+    return CustomUser.objects.create_user(username=username, password='pw', **kwargs)
+
+
+def make_job(company, **kwargs):
+    kwargs.setdefault('title', 'Software Engineer')
+    kwargs.setdefault('description', 'Build web applications.')
+    kwargs.setdefault('requirements', 'Python, Django')
+    kwargs.setdefault('location', 'Accra')
+    kwargs.setdefault('deadline', timezone.now() + timedelta(days=30))
+    kwargs.setdefault('is_approved', True)
+    return JobPost.objects.create(company=company, **kwargs)
+
+
+class JobSearchTests(TestCase):
+
+    def setUp(self):
+        self.company = make_company(institution='Acme Corporation')
+
+    def matches(self, query):
+        """Ids of all jobs matching ``query``, best match first."""
+        jobs = search.apply_search(JobPost.objects.all(), query)
+        return list(jobs.order_by('search_rank', 'id').values_list('pk', flat=True))
+
+    def test_match_expression_quotes_tokens_as_prefixes(self):
+        self.assertEqual(search.build_match_expression('soft eng'), '"soft"* "eng"*')
+        self.assertEqual(search.build_match_expression('c++ OR "x"'), '"c"* "OR"* "x"*')
+        self.assertEqual(search.build_match_expression('  '), '')
+
+    def test_index_follows_save_and_delete(self):
+        job = make_job(self.company, title='Data Analyst')
+        self.assertEqual(self.matches('analyst'), [job.pk])
+
+        job.title = 'Accountant'
+        job.save()
+        self.assertEqual(self.matches('analyst'), [])
+        self.assertEqual(self.matches('accountant'), [job.pk])
+
+        job.delete()
+        self.assertEqual(self.matches('accountant'), [])
+
+    def test_title_match_outranks_description_match(self):
+        in_description = make_job(self.company, title='Office Manager',
+                                  description='Occasional marketing tasks.')
+        in_title = make_job(self.company, title='Marketing Lead')
+        self.assertEqual(self.matches('marketing'),
+                         [in_title.pk, in_description.pk])
+
+    def test_company_name_is_searchable(self):
+        job = make_job(self.company)
+        self.assertEqual(self.matches('corporation'), [job.pk])
+
+        self.company.institution = 'Globex'
+        self.company.save()
+        self.assertEqual(self.matches('globex'), [job.pk])
+
+    def test_company_saves_that_keep_the_name_leave_caches_alone(self):
+        make_job(self.company)
+        version = caching.catalog_version()
+        with self.assertNumQueries(1):  # the UPDATE of last_login only
+            update_last_login(None, self.company)
+        self.company.first_name = 'Ama'
+        self.company.save()
+        self.assertEqual(caching.catalog_version(), version)
+
+    def test_rebuild_index(self):
+        job = make_job(self.company)
+        search.remove_job(job.pk)
+        self.assertEqual(self.matches('engineer'), [])
+        self.assertEqual(search.rebuild_index(), 1)
+        self.assertEqual(self.matches('engineer'), [job.pk])
+
+    def test_job_list_search_respects_visibility_and_filters(self):
+        visible = make_job(self.company, title='Python Developer', job_type=JobPost.FULL_TIME)
+        make_job(self.company, title='Python Intern', job_type=JobPost.INTERNSHIP)
+        make_job(self.company, title='Python Architect', is_approved=False)
+
+        response = self.client.get(reverse('jobs:job_list'),
+                                   {'search': 'pyth', 'job_type': JobPost.FULL_TIME})
+        self.assertEqual(list(response.context['jobs']), [visible])
+
+    def test_search_ranks_within_the_filtered_jobs_across_pages(self):
+        # Better matches elsewhere must not crowd out the company's own jobs
+        other = make_company('globex')
+        for i in range(5):
+            make_job(other, title=f'Python Python Developer {i}')
+        own = [make_job(self.company, title=f'Python Role {i}',
+                        description='Python ' * (i + 1)) for i in range(12)]
+        self.client.force_login(self.company)
+        url = reverse('jobs:job_list')
+        response = self.client.get(url, {'search': 'python'})
+        first = list(response.context['jobs'])
+        response = self.client.get(url, {'search': 'python',
+                                         'cursor': response.context['page_obj'].next_cursor})
+        seen = first + list(response.context['jobs'])
+        self.assertEqual(sorted(j.pk for j in seen), [j.pk for j in own])
+        # Most mentions first
+        self.assertEqual(seen[0], own[-1])
+        self.assertEqual(sum(n for _, _, n in response.context['facets']['job_type']), 12)
+
+
+class CursorPaginationTests(TestCase):
+
+    def setUp(self):
+        self.company = make_company()
+        now = timezone.now()
+        # Two jobs share a timestamp so the id tie-breaker is exercised.
+        self.jobs = [make_job(self.company, title=f'Job {i}',
+                              date_posted=now - timedelta(hours=i // 2))
+                     for i in range(25)]
+        self.expected = sorted(self.jobs, key=lambda j: (j.date_posted, j.id), reverse=True)
+
+    def paginator(self):
+        return CursorPaginator(JobPost.objects.all(), 10, ('-date_posted', '-id'))
+
+    def test_walks_forward_and_back_without_gaps(self):
+        paginator = self.paginator()
+        seen = []
+        page = paginator.paginate()
+        self.assertFalse(page.has_previous())
+        pages = [page]
+        while page.has_next():
+            page = paginator.paginate(cursor=page.next_cursor)
+            pages.append(page)
+        for page in pages:
+            seen.extend(page)
+        self.assertEqual(seen, self.expected)
+        self.assertEqual([len(p) for p in pages], [10, 10, 5])
+
+        back = paginator.paginate(cursor=pages[2].previous_cursor)
+        self.assertEqual(list(back), list(pages[1]))
+        first = paginator.paginate(cursor=back.previous_cursor)
+        self.assertEqual(list(first), list(pages[0]))
+        self.assertFalse(first.has_previous())
+
+    def test_does_not_count(self):
+        with self.assertNumQueries(1):
+            self.paginator().paginate()
+
+    def test_legacy_page_numbers_and_bad_cursors(self):
+        paginator = self.paginator()
+        page = paginator.paginate(page_number='2')
+        self.assertEqual(list(page), self.expected[10:20])
+        self.assertTrue(page.has_previous())
+        self.assertEqual(list(paginator.paginate(cursor='garbage')), self.expected[:10])
+
+    def test_job_list_accepts_page_and_cursor(self):
+        response = self.client.get(reverse('jobs:job_list'), {'page': 3})
+        self.assertEqual(list(response.context['jobs']), self.expected[20:])
+        cursor = response.context['page_obj'].previous_cursor
+        response = self.client.get(reverse('jobs:job_list'), {'cursor': cursor})
+        self.assertEqual(list(response.context['jobs']), self.expected[10:20])
+
+
+class JobListQueryTests(TestCase):
+
+    def test_summary_is_maintained_on_save(self):
+        job = make_job(make_company(), description=' '.join(['word'] * 40))
+        self.assertEqual(job.summary, ' '.join(['word'] * 30) + '…')
+        job.description = 'Short now.'
+        job.save(update_fields=['description'])
+        job.refresh_from_db()
+        self.assertEqual(job.summary, 'Short now.')
+
+    def test_list_page_query_count_is_constant(self):
+        for i in range(3):
+            make_job(make_company(f'company{i}'))
+        url = reverse('jobs:job_list')
+        # Logged in, so the anonymous page cache does not answer
+        self.client.force_login(CustomUser.objects.create_user('student', password='pw'))
+        self.client.get(url)  # warm up one-off lookups (e.g. search index check)
+        with self.assertNumQueries(3):  # session, user, listing
+            response = self.client.get(url)
+        self.assertContains(response, 'company2')
+        self.assertContains(response, 'Build web applications.')
+
+        deferred = response.context['jobs'][0].get_deferred_fields()
+        self.assertIn('description', deferred)
+        self.assertIn('requirements', deferred)
+
+
+class DashboardStatsTests(TestCase):
+
+    def setUp(self):
+        self.company = make_company()
+        self.student = CustomUser.objects.create_user(
+            'student', password='pw', verification_status=CustomUser.VERIFIED)
+        CustomUser.objects.create_user('admin', password='pw', is_superuser=True, is_staff=True)
+        open_job = make_job(self.company)
+        make_job(self.company, is_approved=False,
+                 deadline=timezone.now() - timedelta(days=2))
+        Application.objects.create(job=open_job, applicant=self.student, cover_letter='Hi',
+                                   status=Application.ACCEPTED)
+
+    def test_admin_stats_one_query_per_table(self):
+        with self.assertNumQueries(3):
+            stats = stats_service.admin_dashboard_stats()
+        self.assertEqual(stats, {
+            'total_users': 3, 'total_students': 2, 'total_companies': 1,
+            'total_jobs': 2, 'approved_jobs': 1, 'pending_jobs': 1,
+            'total_applications': 1, 'pending_applications': 0,
+        })
+
+    def test_company_stats_one_query_per_table(self):
+        with self.assertNumQueries(2):
+            stats = stats_service.company_dashboard_stats(self.company)
+        self.assertEqual(stats, {'total_jobs': 2, 'active_jobs': 1,
+                                 'total_applications': 1, 'pending_applications': 0})
+
+    def test_student_stats_single_query(self):
+        with self.assertNumQueries(1):
+            stats = stats_service.student_dashboard_stats(self.student)
+        self.assertEqual(stats, {'total_applications': 1, 'pending': 0,
+                                 'accepted': 1, 'rejected': 0})
+
+    def test_dashboards_render(self):
+        self.client.force_login(self.company)
+        response = self.client.get(reverse('jobs:company_dashboard'))
+        self.assertEqual(response.context['active_jobs'], 1)
+        self.client.force_login(self.student)
+        response = self.client.get(reverse('jobs:student_dashboard'))
+        self.assertEqual(response.context['accepted'], 1)
+        self.client.force_login(CustomUser.objects.get(username='admin'))
+        response = self.client.get(reverse('jobs:admin_dashboard'))
+        self.assertEqual(response.context['pending_jobs'], 1)
+
+
+class PlatformStatsTests(TestCase):
+
+    def assertStats(self, jobs, companies, students):
+        self.assertEqual(stats_service.landing_stats(), {
+            'job_count': jobs, 'company_count': companies, 'student_count': students})
+
+    def test_signals_keep_totals_current(self):
+        company = make_company(verification_status=CustomUser.PENDING)
+        student = CustomUser.objects.create_user('student', password='pw')
+        self.assertStats(0, 0, 1)
+
+        company.verification_status = CustomUser.VERIFIED
+        company.save()
+        job = make_job(company, is_approved=False)
+        self.assertStats(0, 1, 1)
+
+        job.is_approved = True
+        job.save()
+        job.save()
+        self.assertStats(1, 1, 1)
+
+        student.delete()
+        company.delete()
+        self.assertStats(0, 0, 0)
+
+    def test_landing_page_reads_only_the_stats_row(self):
+        make_job(make_company())
+        stats_service.recompute_platform_stats()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('jobs:landing'))
+        self.assertEqual(response.context['job_count'], 1)
+
+    def test_recompute_corrects_drift(self):
+        make_job(make_company())
+        JobPost.objects.update(is_approved=False)
+        self.assertStats(1, 1, 0)
+        stats_service.recompute_platform_stats()
+        self.assertStats(0, 1, 0)
+
+
+class GeoSearchTests(TestCase):
+
+    def setUp(self):
+        self.company = make_company()
+        # Accra city centre and points roughly 3 km, 20 km and 180 km away.
+        self.centre = make_job(self.company, title='Centre', latitude='5.556000', longitude='-0.196900')
+        self.osu = make_job(self.company, title='Osu', latitude='5.556000', longitude='-0.170000')
+        self.tema = make_job(self.company, title='Tema', latitude='5.669600', longitude='-0.016700')
+        self.kumasi = make_job(self.company, title='Kumasi', latitude='6.688500', longitude='-1.624400')
+        make_job(self.company, title='Remote')
+
+    def test_geohash_is_maintained_on_save(self):
+        self.assertEqual(geo.encode_geohash(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        self.assertEqual(self.centre.geohash, geo.encode_geohash(5.556, -0.1969))
+        self.centre.latitude = None
+        self.centre.save(update_fields=['latitude'])
+        self.centre.refresh_from_db()
+        self.assertEqual(self.centre.geohash, '')
+
+    def test_filter_within_orders_by_distance(self):
+        jobs = list(geo.filter_within(JobPost.objects.all(), 5.556, -0.1969, 25)
+                    .order_by('distance_km'))
+        self.assertEqual(jobs, [self.centre, self.osu, self.tema])
+        self.assertAlmostEqual(jobs[1].distance_km, 2.98, places=1)
+
+        nearby = geo.filter_within(JobPost.objects.all(), 5.556, -0.1969, 5)
+        self.assertEqual(set(nearby), {self.centre, self.osu})
+
+    def test_job_list_near_me(self):
+        response = self.client.get(reverse('jobs:job_list'),
+                                   {'near_lat': '5.556', 'near_lon': '-0.1969', 'radius_km': '500'})
+        self.assertEqual(list(response.context['jobs']),
+                         [self.centre, self.osu, self.tema, self.kumasi])
+        self.assertContains(response, 'km away')
+
+        response = self.client.get(reverse('jobs:job_list'), {
+            'near_lat': '5.556', 'near_lon': '-0.1969', 'radius_km': '25',
+            'min_salary': '100', 'currency': 'GHS', 'sort': 'salary_desc', 'location': 'accra'})
+        self.assertContains(
+            response, 'href="?min_salary=100&amp;currency=GHS&amp;sort=salary_desc&amp;location=accra"')
+
+        response = self.client.get(reverse('jobs:job_list'), {'near_lat': 'x', 'near_lon': '1'})
+        self.assertEqual(len(response.context['jobs']), 5)
+
+
+class MapClusterTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company = make_company()
+        # Three jobs in central Accra, one in Kumasi, one unapproved.
+        self.accra = [make_job(self.company, latitude='5.556000', longitude=lon)
+                      for lon in ('-0.196900', '-0.195000', '-0.190000')]
+        self.kumasi = make_job(self.company, latitude='6.688500', longitude='-1.624400',
+                               job_type=JobPost.INTERNSHIP)
+        make_job(self.company, latitude='5.556000', longitude='-0.196000', is_approved=False)
+        self.url = reverse('jobs:job_clusters')
+        self.ghana = {'south': 4.5, 'west': -3.5, 'north': 11.5, 'east': 1.5}
+
+    def test_tiles_cover_bbox(self):
+        tiles = clusters.tiles_for_bbox(5.0, -1.0, 6.0, 0.5, 2)
+        self.assertIn(geo.encode_geohash(5.556, -0.1969, 2), tiles)
+        self.assertEqual(clusters.tiles_for_bbox(-90, -180, 90, 180, 0), [''])
+        self.assertEqual(len(clusters.tiles_for_bbox(-90, -180, 90, 180, 1)), 32)
+
+    def test_clusters_group_nearby_jobs(self):
+        response = self.client.get(self.url, {**self.ghana, 'zoom': 6})
+        data = response.json()
+        self.assertEqual(data['precision'], 3)
+        counts = sorted(c['count'] for c in data['clusters'])
+        self.assertEqual(counts, [1, 3])
+        single = next(c for c in data['clusters'] if c['count'] == 1)
+        self.assertEqual(single['job_id'], self.kumasi.pk)
+
+        response = self.client.get(self.url, {**self.ghana, 'zoom': 6,
+                                              'job_type': JobPost.INTERNSHIP})
+        self.assertEqual([c['count'] for c in response.json()['clusters']], [1])
+
+    def test_tiles_are_cached_until_catalog_changes(self):
+        params = {**self.ghana, 'zoom': 6}
+        self.client.get(self.url, params)
+        with self.assertNumQueries(0):
+            self.client.get(self.url, params)
+
+        self.accra[0].delete()
+        response = self.client.get(self.url, params)
+        self.assertEqual(sorted(c['count'] for c in response.json()['clusters']), [1, 2])
+
+    def test_bad_bbox(self):
+        response = self.client.get(self.url, {'south': 10, 'north': 5, 'west': 0, 'east': 1})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+
+class SalaryNormalizationTests(TestCase):
+
+    def setUp(self):
+        self.addCleanup(cache.delete, salaries.RATES_CACHE_KEY)
+        cache.delete(salaries.RATES_CACHE_KEY)
+        salaries.store_rates('test', {'USD': Decimal('1'), 'GHS': Decimal('10'),
+                                      'EUR': Decimal('0.5')})
+        cache.delete(salaries.RATES_CACHE_KEY)
+        self.company = make_company()
+        self.usd = make_job(self.company, title='USD', salary=Decimal('1000'), currency='USD')
+        self.ghs = make_job(self.company, title='GHS', salary=Decimal('5000'), currency='GHS')
+        self.eur = make_job(self.company, title='EUR', salary=Decimal('1000'), currency='EUR')
+        self.unpaid = make_job(self.company, title='Unpaid')
+
+    def test_salary_normalized_on_save(self):
+        self.assertEqual(self.ghs.salary_normalized, Decimal('500.00'))
+        self.assertEqual(self.eur.salary_normalized, Decimal('2000.00'))
+        self.assertIsNone(self.unpaid.salary_normalized)
+        self.ghs.currency = 'EUR'
+        self.ghs.save(update_fields=['currency'])
+        self.ghs.refresh_from_db()
+        self.assertEqual(self.ghs.salary_normalized, Decimal('10000.00'))
+
+    def test_rate_change_recomputes_in_one_update(self):
+        path = Path(self.enterContext(tempfile.TemporaryDirectory())) / 'rates.json'
+        path.write_text(json.dumps({'version': 'v2', 'rates': {'GHS': '20', 'EUR': '0.5'}}))
+        with self.assertNumQueries(6):
+            # savepoint, current version + rates, insert, one UPDATE, release
+            version, updated = salaries.load_rates(path)
+        self.assertEqual(updated, 4)
+        self.ghs.refresh_from_db()
+        self.assertEqual(self.ghs.salary_normalized, Decimal('250.00'))
+        self.assertEqual(salaries.load_rates(path), (None, 0))
+
+        # The bulk UPDATE rounds to cents exactly like normalize()
+        path.write_text(json.dumps({'rates': {'GHS': '15.5', 'EUR': '0.5'}}))
+        salaries.load_rates(path)
+        expected = salaries.normalize(Decimal('5000'), 'GHS', {'GHS': Decimal('15.5')})
+        self.assertEqual(expected, Decimal('322.58'))
+        self.assertTrue(JobPost.objects.filter(pk=self.ghs.pk,
+                                               salary_normalized=expected).exists())
+
+        path.write_text(json.dumps({'rates': {'GHS': '-1'}}))
+        with self.assertRaises(salaries.ExchangeRateError):
+            salaries.load_rates(path)
+
+    def test_job_list_salary_filter_and_sort(self):
+        url = reverse('jobs:job_list')
+        response = self.client.get(url, {'sort': 'salary_desc'})
+        self.assertEqual(list(response.context['jobs']),
+                         [self.eur, self.usd, self.ghs, self.unpaid])
+        response = self.client.get(url, {'min_salary': '600', 'max_salary': '1500'})
+        self.assertEqual(list(response.context['jobs']), [self.usd])
+
+    def test_keyset_pagination_over_nullable_salary(self):
+        more = [make_job(self.company, title=f'Unpaid {i}') for i in range(3)]
+        paginator = CursorPaginator(JobPost.objects.all(), 2, ('-salary_normalized', '-id'))
+        page = paginator.paginate()
+        seen = list(page)
+        while page.has_next():
+            page = paginator.paginate(cursor=page.next_cursor)
+            seen.extend(page)
+        unpaid = sorted([self.unpaid, *more], key=lambda j: j.pk, reverse=True)
+        self.assertEqual(seen, [self.eur, self.usd, self.ghs, *unpaid])
+        back = paginator.paginate(cursor=page.previous_cursor)
+        self.assertEqual(list(back), seen[4:6])
+
+
+class FacetCountTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        company = make_company()
+        make_job(company, category=JobPost.IT, job_type=JobPost.FULL_TIME, location='Accra')
+        make_job(company, category=JobPost.IT, job_type=JobPost.INTERNSHIP, location=' accra ',
+                 currency='GHS')
+        make_job(company, category=JobPost.FINANCE, job_type=JobPost.FULL_TIME, location='Kumasi')
+        make_job(company, category=JobPost.LAW, is_approved=False)
+
+    def counts(self, facets, facet):
+        return {value: n for value, _, n in facets[facet] if n}
+
+    def test_all_facets_in_one_grouped_query(self):
+        with self.assertNumQueries(1):
+            result = facets.facet_counts(JobPost.objects.filter(is_approved=True), {'scope': 'x'})
+        self.assertEqual(self.counts(result, 'category'), {JobPost.IT: 2, JobPost.FINANCE: 1})
+        self.assertEqual(self.counts(result, 'job_type'),
+                         {JobPost.FULL_TIME: 2, JobPost.INTERNSHIP: 1})
+        self.assertEqual(self.counts(result, 'currency'), {'USD': 2, 'GHS': 1})
+        self.assertEqual(result['location'], [('accra', 'Accra', 2), ('kumasi', 'Kumasi', 1)])
+
+    def test_cached_per_filter_state_until_catalog_changes(self):
+        url = reverse('jobs:job_list')
+        response = self.client.get(url, {'category': JobPost.IT})
+        self.assertEqual(self.counts(response.context['facets'], 'location'), {'accra': 2})
+        self.assertEqual([j.location for j in response.context['jobs']], [' accra ', 'Accra'])
+
+        self.client.force_login(CustomUser.objects.create_user('student', password='pw'))
+        self.client.get(url, {'category': JobPost.IT})
+        with self.assertNumQueries(3):  # session, user, listing; facets come from cache
+            self.client.get(url, {'category': JobPost.IT})
+
+        make_job(make_company('globex'), category=JobPost.IT, location='Tema')
+        response = self.client.get(url, {'category': JobPost.IT})
+        self.assertEqual(self.counts(response.context['facets'], 'location'),
+                         {'accra': 2, 'tema': 1})
+
+        response = self.client.get(url, {'location': 'ACCRA ', 'job_type': JobPost.INTERNSHIP})
+        self.assertEqual(len(response.context['jobs']), 1)
+
+    def test_selected_facets_are_counted_without_their_own_filter(self):
+        url = reverse('jobs:job_list')
+        with self.assertNumQueries(4):  # listing, other facets, category, location
+            response = self.client.get(url, {'category': JobPost.IT, 'location': 'accra'})
+        result = response.context['facets']
+        self.assertEqual(len(response.context['jobs']), 2)
+        self.assertEqual(self.counts(result, 'category'), {JobPost.IT: 2})
+        self.assertEqual(self.counts(result, 'location'), {'accra': 2})
+        self.assertEqual(self.counts(result, 'job_type'),
+                         {JobPost.FULL_TIME: 1, JobPost.INTERNSHIP: 1})
+
+        response = self.client.get(url, {'category': JobPost.FINANCE})
+        result = response.context['facets']
+        self.assertEqual(self.counts(result, 'category'), {JobPost.IT: 2, JobPost.FINANCE: 1})
+        self.assertEqual(self.counts(result, 'location'), {'kumasi': 1})
+
+
+class AnonymousPageCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.job = make_job(make_company())
+        self.list_url = reverse('jobs:job_list')
+        self.detail_url = reverse('jobs:job_detail', args=[self.job.pk])
+
+    def test_anonymous_pages_are_cached_until_catalog_changes(self):
+        response = self.client.get(self.list_url, {'search': '', 'job_type': 'FT', 'category': 'IT'})
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url, {'category': 'IT', 'job_type': 'FT'})
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertContains(response, 'Software Engineer')
+
+        self.client.get(self.detail_url)
+        with self.assertNumQueries(0):
+            self.client.get(self.detail_url)
+
+        self.job.title = 'Data Engineer'
+        self.job.save()
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertContains(response, 'Data Engineer')
+
+    def test_logged_in_users_bypass_the_cache(self):
+        self.client.get(self.list_url)
+        self.client.force_login(CustomUser.objects.create_user('student', password='pw'))
+        response = self.client.get(self.list_url)
+        self.assertFalse(response.has_header('X-Page-Cache'))
+
+    def test_hit_and_miss_counters(self):
+        caching.reset_page_cache_stats()
+        self.client.get(self.list_url)
+        self.client.get(self.list_url)
+        self.client.get(self.list_url)
+        self.assertEqual(caching.page_cache_stats(),
+                         {'hits': 2, 'misses': 1, 'hit_rate': 0.6667})
+
+        admin = CustomUser.objects.create_user('admin', password='pw', is_superuser=True)
+        self.client.force_login(admin)
+        response = self.client.get(reverse('jobs:page_cache_status'))
+        self.assertEqual(response.json()['hits'], 2)
+
+
+class JobDetailViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.job = make_job(make_company())
+        self.student = CustomUser.objects.create_user(
+            'student', password='pw', verification_status=CustomUser.VERIFIED)
+        self.url = reverse('jobs:job_detail', args=[self.job.pk])
+        self.client.force_login(self.student)
+
+    def test_one_job_fetch_and_one_membership_check(self):
+        self.client.get(self.url)
+        # session, user, job with company, has_applied, navbar badge counts
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        self.assertFalse(response.context['has_applied'])
+        self.assertNotIn('user_applications', response.context)
+        self.assertContains(response, 'Apply for this Job')
+
+        Application.objects.create(job=self.job, applicant=self.student, cover_letter='Hi')
+        response = self.client.get(self.url)
+        self.assertContains(response, 'You have already applied')
+
+    def test_job_body_fragment_follows_edits(self):
+        self.client.get(self.url)
+        self.job.description = 'Now with Rust.'
+        self.job.save()
+        self.assertContains(self.client.get(self.url), 'Now with Rust.')
+
+    def test_company_contact_changes_show_at_once(self):
+        self.client.get(self.url)
+        company = self.job.company
+        company.email = 'jobs@acme.test'
+        company.phone_number = '+233200000000'
+        company.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, 'jobs@acme.test')
+        self.assertContains(response, '+233200000000')
 
-# Create your tests here.
+        self.client.logout()
+        self.client.get(self.url)
+        company.email = 'hr@acme.test'
+        company.save(update_fields=['email'])
+        self.assertContains(self.client.get(self.url), 'hr@acme.test')
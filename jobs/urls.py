@@ -6,12 +6,16 @@ app_name = 'jobs'
 urlpatterns = [
     path('', views.landing_page, name='landing'),
     path('jobs/', views.JobListView.as_view(), name='job_list'),
+    path('jobs/map/clusters/', views.job_clusters, name='job_clusters'),
     path('job/<int:pk>/', views.JobDetailView.as_view(), name='job_detail'),
     path('apply/<int:pk>/', views.apply_job, name='apply_job'),
     path('create/', views.create_job_post, name='create_job'),
     path('my-applications/', views.my_applications, name='my_applications'),
     path('my-jobs/', views.my_jobs, name='my_jobs'),
     path('dashboards/admin/', views.admin_dashboard, name='admin_dashboard'),
+    path('dashboards/admin/page-cache/',
+         views.page_cache_status,
+         name='page_cache_status'),
     path('dashboards/company/',
          views.company_dashboard,
          name='company_dashboard'),
@@ -1,28 +1,48 @@
+from decimal import Decimal, InvalidOperation
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import ListView, DetailView
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.db.models import Q, Count
-from django.http import HttpResponseForbidden
-from django.core.mail import send_mail
-from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.http import HttpResponseForbidden, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_GET
+from django.utils import timezone
 from .models import JobPost, Application
+from .caching import cache_anonymous_page, catalog_version, page_cache_stats
+from .clusters import clusters_for_bbox
+from .facets import facet_counts, location_bucket
 from .forms import JobPostForm, ApplicationForm
+from .geo import filter_within
+from .pagination import CursorPaginator, querystring_without
+from .search import apply_search
+from .stats import (admin_dashboard_stats, company_dashboard_stats,
+                    landing_stats, student_dashboard_stats)
 from users.models import CustomUser
+from notifications import broadcasts, counters
+from notifications.outbox import enqueue_email
 from notifications.utils import create_notification
-from notifications.models import Notification
+from notifications.models import BroadcastNotification, Notification
+
+
+def mark_company_applications_read(request):
+    """Mark every application to the company's jobs as seen."""
+    counters.mark_request_seen(request, counters.COMPANY_APPLICATIONS)
+
+
+def mark_applicant_updates_read(request):
+    """Mark every status update on the applicant's applications as seen."""
+    counters.mark_request_seen(request, counters.APPLICANT_UPDATES)
 
 
 def landing_page(request):
     """Landing page view with platform statistics"""
-    context = {
-        'job_count': JobPost.objects.filter(is_approved=True).count(),
-        'company_count': CustomUser.objects.filter(is_company=True, verification_status=CustomUser.VERIFIED).count(),
-        'student_count': CustomUser.objects.filter(is_company=False).count(),
-    }
-    return render(request, 'jobs/landing.html', context)
+    return render(request, 'jobs/landing.html', landing_stats())
 
 
+@method_decorator(cache_anonymous_page, name='dispatch')
 class JobListView(ListView):
     """
     Class-based view to display all available job posts with search and filtering.
@@ -31,8 +51,25 @@ class JobListView(ListView):
     template_name = 'jobs/job_list.html'
     context_object_name = 'jobs'
     paginate_by = 10
+    # Columns needed to render a listing card; the full description and
+    # requirements are only loaded on the detail page.
+    listing_fields = ('id', 'title', 'summary', 'location', 'category',
+                      'job_type', 'deadline', 'date_posted', 'salary', 'currency',
+                      'salary_normalized', 'company__username')
+    default_radius_km = 10
+    max_radius_km = 500
+    radius_choices = (2, 5, 10, 25, 50, 100)
+
+    # Filters that are also facets: counted without their own filter.
+    facet_params = ('category', 'job_type', 'currency', 'location')
 
     def get_queryset(self):
+        queryset = self.get_filtered_queryset()
+        return queryset.order_by(*self.get_ordering_keys(queryset))
+
+    def get_filtered_queryset(self, without=None):
+        """The jobs this user may see, narrowed by every active filter except
+        the facet named ``without``."""
         user = self.request.user
         # Admin sees all jobs
         if user.is_superuser:
@@ -44,36 +81,175 @@ class JobListView(ListView):
         else:
             queryset = JobPost.objects.filter(is_approved=True)
 
-        # Search functionality
+        queryset = queryset.select_related('company').only(*self.listing_fields)
+
+        # Search functionality (full-text index, ranked by relevance)
         search_query = self.request.GET.get('search')
         if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query)
-                | Q(description__icontains=search_query)
-                | Q(location__icontains=search_query))
+            queryset = apply_search(queryset, search_query)
 
         # Filter by category
         category = self.request.GET.get('category')
-        if category:
+        if category and without != 'category':
             queryset = queryset.filter(category=category)
 
         # Filter by job type
         job_type = self.request.GET.get('job_type')
-        if job_type:
+        if job_type and without != 'job_type':
             queryset = queryset.filter(job_type=job_type)
 
-        return queryset.order_by('-date_posted')
+        # Filter by salary currency
+        currency = self.request.GET.get('currency')
+        if currency and without != 'currency':
+            queryset = queryset.filter(currency=currency)
+
+        # Filter by location, grouped the same way as the location facet
+        location = self.get_location_param()
+        if location and without != 'location':
+            queryset = queryset.alias(location_bucket=location_bucket()).filter(
+                location_bucket=location)
+
+        # Pay range, compared in USD so every currency is comparable
+        min_salary = self.get_salary_param('min_salary')
+        if min_salary is not None:
+            queryset = queryset.filter(salary_normalized__gte=min_salary)
+        max_salary = self.get_salary_param('max_salary')
+        if max_salary is not None:
+            queryset = queryset.filter(salary_normalized__lte=max_salary)
+
+        # Jobs within radius_km of (near_lat, near_lon), nearest first
+        near = self.get_near_point()
+        if near:
+            queryset = filter_within(queryset, *near)
+
+        return queryset
+
+    def get_near_point(self):
+        """Parse the proximity filter as (lat, lon, radius_km), or None."""
+        params = self.request.GET
+        try:
+            lat = float(params['near_lat'])
+            lon = float(params['near_lon'])
+            radius = float(params.get('radius_km') or self.default_radius_km)
+        except (KeyError, ValueError):
+            return None
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180) or radius <= 0:
+            return None
+        return lat, lon, min(radius, self.max_radius_km)
+
+    def get_location_param(self):
+        return ' '.join(self.request.GET.get('location', '').split()).lower()
+
+    def get_filter_state(self):
+        """Normalized description of what shaped the queryset, for caching."""
+        user = self.request.user
+        if user.is_superuser:
+            scope = 'all'
+        elif user.is_authenticated and getattr(user, 'is_company', False):
+            scope = f'company:{user.pk}'
+        else:
+            scope = 'public'
+        params = self.request.GET
+        return {
+            'scope': scope,
+            'search': ' '.join(params.get('search', '').lower().split()),
+            'category': params.get('category', ''),
+            'job_type': params.get('job_type', ''),
+            'currency': params.get('currency', ''),
+            'location': self.get_location_param(),
+            'min_salary': self.get_salary_param('min_salary'),
+            'max_salary': self.get_salary_param('max_salary'),
+            'near': self.get_near_point(),
+        }
+
+    def get_salary_param(self, name):
+        try:
+            value = Decimal(self.request.GET.get(name) or '')
+        except InvalidOperation:
+            return None
+        return value if value.is_finite() and value >= 0 else None
+
+    def get_ordering_keys(self, queryset):
+        """Ordering used for keyset pagination; always ends in the pk."""
+        if self.request.GET.get('sort') == 'salary_desc':
+            # Jobs without a stated salary sort last
+            return ('-salary_normalized', '-id')
+        if 'distance_km' in queryset.query.annotations:
+            return ('distance_km', 'id')
+        if 'search_rank' in queryset.query.annotations:
+            return ('search_rank', 'id')
+        return ('-date_posted', '-id')
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size,
+                                    self.get_ordering_keys(queryset))
+        page = paginator.get_page(self.request)
+        return (paginator, page, page.object_list, page.has_other_pages())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context['pagination_query'] = querystring_without(
+            self.request, 'cursor', 'page')
+        # Every other filter stays when the proximity filter is cleared
+        context['clear_near_query'] = querystring_without(
+            self.request, 'near_lat', 'near_lon', 'radius_km', 'cursor', 'page')
         context['search_query'] = self.request.GET.get('search', '')
         context['category_filter'] = self.request.GET.get('category', '')
         context['job_type_filter'] = self.request.GET.get('job_type', '')
-        context['categories'] = JobPost.CATEGORY_CHOICES
-        context['job_types'] = JobPost.JOB_TYPE_CHOICES
+        near = self.get_near_point()
+        context['near_lat'] = near[0] if near else ''
+        context['near_lon'] = near[1] if near else ''
+        context['radius_km'] = int(near[2]) if near else self.default_radius_km
+        context['radius_choices'] = self.radius_choices
+        context['min_salary'] = self.request.GET.get('min_salary', '')
+        context['max_salary'] = self.request.GET.get('max_salary', '')
+        context['sort'] = self.request.GET.get('sort', '')
+        context['currency_filter'] = self.request.GET.get('currency', '')
+        context['location_filter'] = self.get_location_param()
+        state = self.get_filter_state()
+        context['facets'] = facet_counts(self.object_list, state, {
+            facet: self.get_filtered_queryset(without=facet)
+            for facet in self.facet_params if state[facet]
+        })
         return context
 
 
+@require_GET
+def job_clusters(request):
+    """
+    Clustered map markers for approved jobs in a bounding box.
+
+    Expects ``south``, ``west``, ``north``, ``east`` and ``zoom``; accepts the
+    job list's ``category`` and ``job_type`` filters.
+    """
+    params = request.GET
+    try:
+        south, west, north, east = (float(params[k]) for k in ('south', 'west', 'north', 'east'))
+        zoom = int(params.get('zoom', 0))
+    except (KeyError, ValueError):
+        return JsonResponse({'error': 'south, west, north, east and zoom are required numbers'},
+                            status=400)
+    if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+        return JsonResponse({'error': 'invalid bounding box'}, status=400)
+
+    queryset = JobPost.objects.filter(is_approved=True)
+    category = params.get('category', '')
+    if category in dict(JobPost.CATEGORY_CHOICES):
+        queryset = queryset.filter(category=category)
+    else:
+        category = ''
+    job_type = params.get('job_type', '')
+    if job_type in dict(JobPost.JOB_TYPE_CHOICES):
+        queryset = queryset.filter(job_type=job_type)
+    else:
+        job_type = ''
+
+    precision, clusters = clusters_for_bbox(queryset, south, west, north, east, zoom,
+                                            filter_key=f'{category}-{job_type}')
+    return JsonResponse({'zoom': zoom, 'precision': precision, 'clusters': clusters})
+
+
+@method_decorator(cache_anonymous_page, name='dispatch')
 class JobDetailView(DetailView):
     """
     Class-based view to display job details.
@@ -81,24 +257,24 @@ class JobDetailView(DetailView):
     model = JobPost
     template_name = 'jobs/job_detail.html'
     context_object_name = 'job'
+    queryset = JobPost.objects.select_related('company')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        job = self.get_object()
+        job = self.object
         user = self.request.user
 
         # Check if user has already applied
         if user.is_authenticated and not user.is_company:
             context['has_applied'] = Application.objects.filter(
                 job=job, applicant=user).exists()
-            context['user_applications'] = Application.objects.filter(
-                applicant=user)
         else:
             context['has_applied'] = False
 
-        # Add today's date for deadline comparison
-        from django.utils import timezone
-        context['today'] = timezone.now().date()
+        # The job body is cached per job under the catalog version
+        context['catalog_version'] = catalog_version()
+        # Current time for deadline comparison
+        context['today'] = timezone.now()
 
         return context
 
@@ -133,44 +309,36 @@ def apply_job(request, pk):
                                user=request.user,
                                job=job)
         if form.is_valid():
-            application = form.save()
-            # Ensure company sees this as an unread notification
-            try:
-                application.company_unread = True
-                application.save()
-            except Exception:
-                pass
-
-            # Create notification for company
-            create_notification(
-                recipient=job.company,
-                notification_type=Notification.APPLICATION_SUBMITTED,
-                title=f"New application for {job.title}",
-                message=f"{request.user.username} has applied for the position of {job.title}",
-                related_job=job,
-                related_application=application
-            )
+            with transaction.atomic():
+                # Unread for the company until it next looks at its applications
+                application = form.save()
+                counters.increment(job.company, counters.COMPANY_APPLICATIONS)
 
-            try:
-                send_mail(
+                # Create notification for company
+                create_notification(
+                    recipient=job.company,
+                    notification_type=Notification.APPLICATION_SUBMITTED,
+                    title=f"New application for {job.title}",
+                    message=f"{request.user.username} has applied for the position of {job.title}",
+                    related_job=job,
+                    related_application=application,
+                    thread_key=f'job:{job.pk}',
+                    coalesced_title='{count} new applications for ' + job.title
+                )
+
+                # Emails are sent by the outbox worker once this commits
+                enqueue_email(
                     subject=f'New Application for {job.title}',
                     message=
                     f'You have received a new application from {request.user.username} for the position: {job.title}',
-                    from_email=settings.DEFAULT_FROM_EMAIL,
                     recipient_list=[job.company.email],
-                    fail_silently=True,
                 )
-
-                send_mail(
+                enqueue_email(
                     subject=f'Application Submitted: {job.title}',
                     message=
                     f'Your application for {job.title} at {job.company.username} has been submitted successfully. We will notify you once there is an update.',
-                    from_email=settings.DEFAULT_FROM_EMAIL,
                     recipient_list=[request.user.email],
-                    fail_silently=True,
                 )
-            except Exception:
-                pass
 
             messages.success(
                 request,
@@ -211,12 +379,12 @@ def create_job_post(request):
                 job_post.company = request.user
             # Jobs require admin approval before being visible
             job_post.is_approved = False
-            job_post.save()
+            with transaction.atomic():
+                job_post.save()
 
-            # Create notification for admins
-            for admin in CustomUser.objects.filter(is_superuser=True):
-                create_notification(
-                    recipient=admin,
+                # Notify the admins with one broadcast
+                broadcasts.send(
+                    BroadcastNotification.ADMINS,
                     notification_type=Notification.JOB_POSTED,
                     title=f"New job post: {job_post.title}",
                     message=f"Company {request.user.username} has posted a new job: {job_post.title}. Please review for approval.",
@@ -246,9 +414,7 @@ def my_applications(request):
             'applicant', 'job')
         # Mark company notifications as read when viewing applications
         try:
-            Application.objects.filter(job__company=request.user,
-                                       company_unread=True).update(
-                company_unread=False)
+            mark_company_applications_read(request)
         except Exception:
             pass
     else:
@@ -257,14 +423,13 @@ def my_applications(request):
             applicant=request.user).select_related('job')
         # Mark applicant notifications as read when viewing their applications
         try:
-            Application.objects.filter(applicant=request.user,
-                                       applicant_unread=True).update(
-                applicant_unread=False)
+            mark_applicant_updates_read(request)
         except Exception:
             pass
 
+    paginator = CursorPaginator(applications, 10, ('-date_applied', '-id'))
     return render(request, 'jobs/my_applications.html',
-                  {'applications': applications})
+                  {'applications': paginator.get_page(request)})
 
 
 @login_required
@@ -290,15 +455,6 @@ def admin_dashboard(request):
     """
     Admin dashboard with statistics and job approval.
     """
-    total_users = CustomUser.objects.count()
-    total_students = CustomUser.objects.filter(is_company=False).count()
-    total_companies = CustomUser.objects.filter(is_company=True).count()
-    total_jobs = JobPost.objects.count()
-    approved_jobs = JobPost.objects.filter(is_approved=True).count()
-    pending_jobs = JobPost.objects.filter(is_approved=False).count()
-    total_applications = Application.objects.count()
-    pending_applications = Application.objects.filter(status='P').count()
-
     unapproved_jobs = JobPost.objects.filter(
         is_approved=False).select_related('company')
 
@@ -306,14 +462,7 @@ def admin_dashboard(request):
     unverified_users = CustomUser.objects.exclude(verification_status__in=[CustomUser.VERIFIED, CustomUser.REJECTED])
 
     context = {
-        'total_users': total_users,
-        'total_students': total_students,
-        'total_companies': total_companies,
-        'total_jobs': total_jobs,
-        'approved_jobs': approved_jobs,
-        'pending_jobs': pending_jobs,
-        'total_applications': total_applications,
-        'pending_applications': pending_applications,
+        **admin_dashboard_stats(),
         'unapproved_jobs': unapproved_jobs,
         'unverified_users': unverified_users,
     }
@@ -321,6 +470,15 @@ def admin_dashboard(request):
     return render(request, 'jobs/admin_dashboard.html', context)
 
 
+@login_required
+@user_passes_test(lambda u: u.is_superuser)
+def page_cache_status(request):
+    """
+    Hit/miss counters of the anonymous page cache, for monitoring (admin only).
+    """
+    return JsonResponse(page_cache_stats())
+
+
 @login_required
 def company_dashboard(request):
     """
@@ -330,34 +488,21 @@ def company_dashboard(request):
         messages.warning(request, "Only companies can access this page.")
         return redirect('jobs:job_list')
 
-    from django.utils import timezone
     jobs = JobPost.objects.filter(company=request.user).annotate(
         application_count=Count('applications'))
 
-    total_jobs = jobs.count()
-    active_jobs = jobs.filter(deadline__gte=timezone.now().date()).count()
-    total_applications = Application.objects.filter(
-        job__company=request.user).count()
-    pending_applications = Application.objects.filter(
-        job__company=request.user, status='P').count()
-
     recent_applications = Application.objects.filter(
         job__company=request.user).select_related(
             'applicant', 'job').order_by('-date_applied')[:5]
 
     # Mark company notifications as read when visiting the company dashboard
     try:
-        Application.objects.filter(job__company=request.user,
-                                   company_unread=True).update(
-            company_unread=False)
+        mark_company_applications_read(request)
     except Exception:
         pass
 
     context = {
-        'total_jobs': total_jobs,
-        'active_jobs': active_jobs,
-        'total_applications': total_applications,
-        'pending_applications': pending_applications,
+        **company_dashboard_stats(request.user),
         'jobs': jobs[:5],
         'recent_applications': recent_applications,
     }
@@ -377,28 +522,18 @@ def student_dashboard(request):
     applications = Application.objects.filter(
         applicant=request.user).select_related('job').order_by('-date_applied')
 
-    total_applications = applications.count()
-    pending = applications.filter(status='P').count()
-    accepted = applications.filter(status='A').count()
-    rejected = applications.filter(status='R').count()
-
     recent_jobs = JobPost.objects.filter(
         is_approved=True).order_by('-date_posted')[:5]
 
     context = {
+        **student_dashboard_stats(request.user),
         'applications': applications[:5],
-        'total_applications': total_applications,
-        'pending': pending,
-        'accepted': accepted,
-        'rejected': rejected,
         'recent_jobs': recent_jobs,
     }
 
     # Mark applicant notifications as read when visiting student dashboard
     try:
-        Application.objects.filter(applicant=request.user,
-                                   applicant_unread=True).update(
-            applicant_unread=False)
+        mark_applicant_updates_read(request)
     except Exception:
         pass
 
@@ -422,24 +557,8 @@ def update_application_status(request, pk, status):
         if request.method == 'POST':
             custom_message = request.POST.get('message', '').strip()
 
-        application.status = status
-        # When company updates status, set applicant_unread so applicant sees notification
-        application.applicant_unread = True
-        application.save()
-
         status_text = 'Accepted' if status == 'A' else 'Rejected'
 
-        # Create notification for applicant
-        create_notification(
-            recipient=application.applicant,
-            notification_type=Notification.APPLICATION_STATUS_CHANGED,
-            title=f"Application {status_text}: {application.job.title}",
-            message=f"Your application for {application.job.title} has been {status_text}." +
-                    (f"\n\nMessage from {request.user.username}:\n{custom_message}" if custom_message else ""),
-            related_job=application.job,
-            related_application=application
-        )
-
         # Build the email body; include custom message if provided
         if custom_message:
             email_body = (
@@ -455,16 +574,33 @@ def update_application_status(request, pk, status):
                 'Regards,\nCampus Job Board'
             )
 
-        try:
-            send_mail(
+        with transaction.atomic():
+            # An update the applicant has not seen yet is already counted
+            seen_at = counters.seen_at(application.applicant_id, counters.APPLICANT_UPDATES)
+            already_unread = application.status_changed_at is not None and (
+                seen_at is None or application.status_changed_at > seen_at)
+            application.status = status
+            application.status_changed_at = timezone.now()
+            if not already_unread:
+                counters.increment(application.applicant_id, counters.APPLICANT_UPDATES)
+            application.save()
+
+            # Create notification for applicant
+            create_notification(
+                recipient=application.applicant,
+                notification_type=Notification.APPLICATION_STATUS_CHANGED,
+                title=f"Application {status_text}: {application.job.title}",
+                message=f"Your application for {application.job.title} has been {status_text}." +
+                        (f"\n\nMessage from {request.user.username}:\n{custom_message}" if custom_message else ""),
+                related_job=application.job,
+                related_application=application
+            )
+
+            enqueue_email(
                 subject=f'Application Update: {application.job.title}',
                 message=email_body,
-                from_email=settings.DEFAULT_FROM_EMAIL,
                 recipient_list=[application.applicant.email],
-                fail_silently=True,
             )
-        except Exception:
-            pass
 
         messages.success(request,
                          f'Application {status_text.lower()} successfully!')
@@ -474,29 +610,13 @@ def update_application_status(request, pk, status):
 
 @login_required
 def view_application_and_mark(request, pk):
-    """Mark a single application as read for the current user and redirect to job detail."""
-    application = get_object_or_404(Application, pk=pk)
+    """Redirect to the job detail page of an application.
 
-    user = request.user
-    # If company viewing an application for their job, mark company_unread False
-    if user.is_authenticated and user.is_company and application.job.company == user:
-        try:
-            if application.company_unread:
-                application.company_unread = False
-                application.save()
-        except Exception:
-            pass
-
-    # If applicant viewing their own application, mark applicant_unread False
-    if user.is_authenticated and not user.is_company and application.applicant == user:
-        try:
-            if application.applicant_unread:
-                application.applicant_unread = False
-                application.save()
-        except Exception:
-            pass
-
-    return redirect('jobs:job_detail', pk=application.job.pk)
+    Read state is a per-user watermark moved by the pages linking here,
+    so there is nothing left to mark for a single application.
+    """
+    application = get_object_or_404(Application.objects.only('job_id'), pk=pk)
+    return redirect('jobs:job_detail', pk=application.job_id)
 
 
 @login_required
@@ -550,29 +670,25 @@ def approve_job(request, pk):
     Approve a job post (admin only).
     """
     job = get_object_or_404(JobPost, pk=pk)
-    job.is_approved = True
-    job.save()
-
-    # Create notification for company
-    create_notification(
-        recipient=job.company,
-        notification_type=Notification.JOB_APPROVED,
-        title=f"Job Approved: {job.title}",
-        message=f"Your job post for {job.title} has been approved and is now visible to applicants.",
-        related_job=job
-    )
+    with transaction.atomic():
+        job.is_approved = True
+        job.save()
 
-    try:
-        send_mail(
+        # Create notification for company
+        create_notification(
+            recipient=job.company,
+            notification_type=Notification.JOB_APPROVED,
+            title=f"Job Approved: {job.title}",
+            message=f"Your job post for {job.title} has been approved and is now visible to applicants.",
+            related_job=job
+        )
+
+        enqueue_email(
             subject=f'Job Post Approved: {job.title}',
             message=
             f'Your job post "{job.title}" has been approved and is now visible to applicants.',
-            from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[job.company.email],
-            fail_silently=True,
         )
-    except Exception:
-        pass
 
     messages.success(request, f'Job "{job.title}" approved!')
     return redirect('jobs:admin_dashboard')
@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.db import transaction
+from . import live, membership
 from .models import ChatRequest, Conversation, Message
 
 
@@ -18,13 +20,25 @@ class ConversationAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
     actions = ['deactivate_conversations', 'activate_conversations']
     
+    def _set_active(self, queryset, is_active):
+        # update() sends no signals; drop the cached membership here, and
+        # end open chat streams of deactivated conversations. Both happen
+        # on commit, so nothing re-caches the old state in between.
+        with transaction.atomic():
+            conversations = list(queryset.only('application', 'participant_1', 'participant_2'))
+            queryset.update(is_active=is_active)
+            for conversation in conversations:
+                membership.forget(conversation)
+                if not is_active:
+                    live.conversation_closed(conversation)
+
     def deactivate_conversations(self, request, queryset):
-        queryset.update(is_active=False)
+        self._set_active(queryset, False)
         self.message_user(request, f"{queryset.count()} conversation(s) deactivated.")
     deactivate_conversations.short_description = "Deactivate selected conversations"
     
     def activate_conversations(self, request, queryset):
-        queryset.update(is_active=True)
+        self._set_active(queryset, True)
         self.message_user(request, f"{queryset.count()} conversation(s) activated.")
     activate_conversations.short_description = "Activate selected conversations"
 
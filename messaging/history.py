@@ -0,0 +1,59 @@
+"""
+Windowed message history.
+
+A conversation page only ever loads a window of messages, keyed on
+``(timestamp, id)`` and served by ``message_history_idx``: the newest
+``PAGE_SIZE`` by default, older pages before the oldest message shown,
+and whatever arrived after the newest one. Every window is a single
+indexed query with a LIMIT, so its cost does not depend on how long the
+conversation is.
+"""
+from django.db.models import Q, Subquery
+
+from .models import Message
+
+PAGE_SIZE = 30
+
+# Upper bound on a client-requested window.
+MAX_PAGE_SIZE = 100
+
+
+def _messages(conversation):
+    return Message.objects.filter(conversation=conversation).select_related('sender')
+
+
+def _anchor(conversation, message_id):
+    return Subquery(Message.objects.filter(pk=message_id, conversation=conversation)
+                    .values('timestamp')[:1])
+
+
+def _window(queryset, ordering, limit):
+    rows = list(queryset.order_by(*ordering)[:limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def latest(conversation, limit=PAGE_SIZE):
+    """The newest ``limit`` messages, oldest first, and whether older exist."""
+    rows, more = _window(_messages(conversation), ('-timestamp', '-id'), limit)
+    rows.reverse()
+    return rows, more
+
+
+def before(conversation, message_id, limit=PAGE_SIZE):
+    """Up to ``limit`` messages preceding ``message_id``, oldest first,
+    and whether there are more before them."""
+    anchor = _anchor(conversation, message_id)
+    queryset = _messages(conversation).filter(
+        Q(timestamp__lt=anchor) | Q(timestamp=anchor, id__lt=message_id))
+    rows, more = _window(queryset, ('-timestamp', '-id'), limit)
+    rows.reverse()
+    return rows, more
+
+
+def after(conversation, message_id, limit=PAGE_SIZE):
+    """Up to ``limit`` messages following ``message_id``, oldest first,
+    and whether there are more after them."""
+    anchor = _anchor(conversation, message_id)
+    queryset = _messages(conversation).filter(
+        Q(timestamp__gt=anchor) | Q(timestamp=anchor, id__gt=message_id))
+    return _window(queryset, ('timestamp', 'id'), limit)
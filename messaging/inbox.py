@@ -0,0 +1,109 @@
+"""
+Conversation inbox summaries.
+
+Each Conversation row carries its last message (time, preview, sender)
+and, per participant, an unread count and a read watermark.
+``record_message`` updates them with one UPDATE when a message is sent
+and ``mark_read`` zeroes the reader's count and moves their watermark in
+another, so the inbox is listed from conversation rows alone and reading
+never touches the messages. ``rebuild`` recomputes the summaries from the
+messages table.
+"""
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.utils import timezone
+
+PREVIEW_LENGTH = 100
+
+
+def preview(content):
+    """``content`` shortened to fit ``Conversation.last_message_preview``."""
+    content = ' '.join(content.split())
+    if len(content) <= PREVIEW_LENGTH:
+        return content
+    return content[:PREVIEW_LENGTH - 3].rstrip() + '...'
+
+
+def _unread_field(conversation, user_id):
+    if user_id == conversation.participant_1_id:
+        return 'participant_1_unread'
+    return 'participant_2_unread'
+
+
+def record_message(message):
+    """Update the conversation summary for a newly sent ``message``."""
+    conversation = message.conversation
+    recipient_id = (conversation.participant_2_id
+                    if message.sender_id == conversation.participant_1_id
+                    else conversation.participant_1_id)
+    unread = _unread_field(conversation, recipient_id)
+    type(conversation).objects.filter(pk=conversation.pk).update(
+        last_activity_at=message.timestamp,
+        last_message_at=message.timestamp,
+        last_message_preview=preview(message.content),
+        last_sender_id=message.sender_id,
+        **{unread: F(unread) + 1},
+    )
+
+
+def mark_read(conversation, user):
+    """Mark everything sent to ``user`` on ``conversation`` so far as read.
+
+    Returns the number of messages that were unread.
+    """
+    unread = _unread_field(conversation, user.pk)
+    read_at = unread.replace('_unread', '_read_at')
+    count = getattr(conversation, unread)
+    now = timezone.now()
+    type(conversation).objects.filter(pk=conversation.pk).update(**{unread: 0, read_at: now})
+    setattr(conversation, unread, 0)
+    setattr(conversation, read_at, now)
+    return count
+
+
+def inbox_sources(user, queryset):
+    """``queryset`` split by which side ``user`` is on.
+
+    Each half is served by its ``conversation_inbox_p*_idx`` index in
+    ``(-last_activity_at, -id)`` order, for ``MergedCursorPaginator``.
+    """
+    return [queryset.filter(participant_1=user), queryset.filter(participant_2=user)]
+
+
+def _unread_messages(reader):
+    return (~Q(messages__sender=F(reader))
+            & (Q(**{f'{reader}_read_at__isnull': True})
+               | Q(messages__timestamp__gt=F(f'{reader}_read_at'))))
+
+
+def rebuild(apps=global_apps):
+    """Recompute every conversation's summary from its messages.
+
+    Returns the number of conversations updated.
+    """
+    Conversation = apps.get_model('messaging', 'Conversation')
+    Message = apps.get_model('messaging', 'Message')
+    latest = Message.objects.filter(conversation=OuterRef('pk')).order_by('-timestamp', '-id')
+    rows = Conversation.objects.annotate(
+        message_at=Subquery(latest.values('timestamp')[:1]),
+        message_content=Subquery(latest.values('content')[:1]),
+        message_sender=Subquery(latest.values('sender')[:1]),
+        unread_1=Count('messages', filter=_unread_messages('participant_1')),
+        unread_2=Count('messages', filter=_unread_messages('participant_2')),
+    )
+    changed = []
+    for conversation in rows:
+        conversation.last_message_at = conversation.message_at
+        conversation.last_activity_at = conversation.message_at or conversation.created_at
+        conversation.last_message_preview = preview(conversation.message_content or '')
+        conversation.last_sender_id = conversation.message_sender
+        conversation.participant_1_unread = conversation.unread_1
+        conversation.participant_2_unread = conversation.unread_2
+        changed.append(conversation)
+    with transaction.atomic():
+        Conversation.objects.bulk_update(changed, [
+            'last_activity_at', 'last_message_at', 'last_message_preview', 'last_sender',
+            'participant_1_unread', 'participant_2_unread',
+        ], batch_size=500)
+    return len(changed)
@@ -0,0 +1,126 @@
+"""
+Live chat for an open conversation over Server-Sent Events.
+
+Messages and read state are written by the views exactly as before; the
+database stays the source of truth. Once a change commits, an event is
+published to the conversation's channel (``conversation:<id>``):
+
+* ``message`` - a new message, rendered once per participant when sent;
+* ``read`` - a participant has read the other's messages;
+* ``typing`` - a participant is typing (published straight away and
+  never stored);
+* ``closed`` - an admin deactivated the conversation; the stream ends.
+
+Each open conversation page holds one ``conversation_stream`` connection
+relaying these. Chat streams share the pub/sub backend, connection limits
+and heartbeat of the notification stream (``notifications.live``), so an
+idle chat costs one queue and one timer on the event loop. A page that
+misses events because its queue overflowed gets ``resync`` and fetches
+newer messages from ``message_history``.
+"""
+import asyncio
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from notifications import live, pubsub
+
+# Minimum seconds between two typing events from one participant.
+TYPING_INTERVAL = 3
+
+
+def conversation_channel(conversation_id):
+    return f'conversation:{conversation_id}'
+
+
+def message_sent(message):
+    """Push ``message`` to both participants once it commits."""
+    conversation = message.conversation
+    html = {
+        str(user.pk): render_to_string('messaging/_message.html', {'msg': message, 'user': user})
+        for user in (conversation.participant_1, conversation.participant_2)
+    }
+    pubsub.publish_on_commit(conversation_channel(conversation.pk), {
+        'event': 'message',
+        'id': message.pk,
+        'sender_id': message.sender_id,
+        'html': html,
+    })
+
+
+def messages_read(conversation, user):
+    """Tell the other participant that ``user`` has read their messages."""
+    pubsub.publish_on_commit(conversation_channel(conversation.pk),
+                             {'event': 'read', 'user_id': user.pk})
+
+
+def typing(conversation_id, user):
+    """Publish that ``user`` is typing, at most once per ``TYPING_INTERVAL``."""
+    if cache.add(f'messaging:typing:{conversation_id}:{user.pk}', 1, TYPING_INTERVAL):
+        pubsub.publish(conversation_channel(conversation_id),
+                       {'event': 'typing', 'user_id': user.pk, 'username': user.username})
+
+
+def conversation_closed(conversation):
+    pubsub.publish_on_commit(conversation_channel(conversation.pk), {'event': 'closed'})
+
+
+class ChatStream(live.EventStream):
+    """The body of one conversation's SSE response, for one participant."""
+
+    def __init__(self, user, subscription, conversation_id):
+        super().__init__(user, subscription)
+        self.conversation_id = conversation_id
+
+    def _relay(self, message):
+        event = message.get('event')
+        if event == 'message':
+            return live.format_event('message', {
+                'id': message['id'],
+                'sender_id': message['sender_id'],
+                'html': message['html'].get(str(self.user.pk), ''),
+            })
+        if event in ('read', 'typing'):
+            # Only the other participant cares
+            if message['user_id'] == self.user.pk:
+                return None
+            return live.format_event(event, message)
+        if event == 'closed':
+            return live.format_event('closed', {})
+        return None
+
+    async def _events(self):
+        heartbeat = getattr(settings, 'SSE_HEARTBEAT_SECONDS', 20)
+        try:
+            yield f"retry: {getattr(settings, 'SSE_RETRY_MILLISECONDS', 5000)}\n\n"
+            while True:
+                try:
+                    message = await self.subscription.get(timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ': ping\n\n'
+                    continue
+                for message in [message] + self.subscription.drain():
+                    event = self._relay(message)
+                    if event:
+                        yield event
+                    if message.get('event') == 'closed':
+                        return
+                if self.subscription.overflowed:
+                    self.subscription.overflowed = False
+                    yield live.format_event('resync', {})
+        finally:
+            self.close()
+
+
+def open_stream(user, conversation_id):
+    """A ``ChatStream`` of a conversation for ``user``, or None when over
+    a connection limit.
+
+    The caller must have checked that ``user`` takes part in it. Must be
+    called on the event loop that will consume the stream.
+    """
+    subscription = live.subscribe(user, [conversation_channel(conversation_id)])
+    if subscription is None:
+        return None
+    return ChatStream(user, subscription, conversation_id)
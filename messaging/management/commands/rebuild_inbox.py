@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from messaging import inbox
+
+
+class Command(BaseCommand):
+    help = "Recompute each conversation's last message and per-participant unread counts."
+
+    def handle(self, *args, **options):
+        updated = inbox.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {updated} conversation summaries."))
@@ -0,0 +1,58 @@
+"""
+Cached conversation membership.
+
+Chat URLs name a conversation by its application, and every chat request
+(page, history window, read receipt, typing event, live stream) first
+has to establish which conversation that is and whether the user may use
+it. ``conversation_id`` answers both from the cache, keyed on
+``(user_id, application_id)``: the id of the active conversation the user
+takes part in, or None when they are not allowed. On a miss it is one
+indexed query, since a conversation's participants are stored as a
+canonical ordered pair unique per application.
+
+Entries are dropped (see ``signals``) whenever a conversation is created,
+saved or deleted, and by the admin actions that update ``is_active`` in
+bulk, so a deactivated conversation stops being reachable at once.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Conversation
+
+TIMEOUT = 10 * 60
+
+# Cached for users who are not allowed, so repeated probes stay cheap.
+DENIED = 0
+
+
+def _key(user_id, application_id):
+    return f'messaging:member:{user_id}:{application_id}'
+
+
+def conversation_id(user, application_id):
+    """The active conversation about ``application_id`` that ``user`` takes
+    part in, as an id, or None."""
+    user_id = getattr(user, 'pk', user)
+    key = _key(user_id, application_id)
+    cached = cache.get(key)
+    if cached is None:
+        found = list(Conversation.objects
+                     .filter(Q(participant_1=user_id) | Q(participant_2=user_id),
+                             application_id=application_id, is_active=True)
+                     .order_by().values_list('pk', flat=True)[:1])
+        cached = found[0] if found else DENIED
+        cache.set(key, cached, TIMEOUT)
+    return cached or None
+
+
+def forget(conversation):
+    """Drop the cached membership of ``conversation``'s participants.
+
+    Dropped again on commit so an entry cached from a concurrent read of
+    the pre-commit state does not survive.
+    """
+    keys = [_key(user_id, conversation.application_id)
+            for user_id in (conversation.participant_1_id, conversation.participant_2_id)]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,94 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:11
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Q, Subquery
+
+
+def preview(content):
+    content = ' '.join(content.split())
+    if len(content) <= 100:
+        return content
+    return content[:97].rstrip() + '...'
+
+
+def fill_summaries(apps, schema_editor):
+    """Summarize every conversation from its messages and read flags."""
+    Conversation = apps.get_model('messaging', 'Conversation')
+    Message = apps.get_model('messaging', 'Message')
+    latest = Message.objects.filter(conversation=OuterRef('pk')).order_by('-timestamp', '-id')
+    rows = Conversation.objects.annotate(
+        message_at=Subquery(latest.values('timestamp')[:1]),
+        message_content=Subquery(latest.values('content')[:1]),
+        message_sender=Subquery(latest.values('sender')[:1]),
+        unread_1=Count('messages', filter=Q(messages__is_read=False)
+                       & ~Q(messages__sender=F('participant_1'))),
+        unread_2=Count('messages', filter=Q(messages__is_read=False)
+                       & ~Q(messages__sender=F('participant_2'))),
+    )
+    changed = []
+    for conversation in rows:
+        conversation.last_message_at = conversation.message_at
+        conversation.last_activity_at = conversation.message_at or conversation.created_at
+        conversation.last_message_preview = preview(conversation.message_content or '')
+        conversation.last_sender_id = conversation.message_sender
+        conversation.participant_1_unread = conversation.unread_1
+        conversation.participant_2_unread = conversation.unread_2
+        changed.append(conversation)
+    Conversation.objects.bulk_update(changed, [
+        'last_activity_at', 'last_message_at', 'last_message_preview', 'last_sender',
+        'participant_1_unread', 'participant_2_unread',
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_salary_normalization'),
+        ('messaging', '0002_message_unread_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Last message time, or creation time if none'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_preview',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_sender',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='participant_1_unread',
+            field=models.PositiveIntegerField(default=0, help_text='Messages participant 1 has not read'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='participant_2_unread',
+            field=models.PositiveIntegerField(default=0, help_text='Messages participant 2 has not read'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['participant_1', '-last_activity_at', '-id'], name='conversation_inbox_p1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['participant_2', '-last_activity_at', '-id'], name='conversation_inbox_p2_idx'),
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:24
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+
+def fill_read_watermarks(apps, schema_editor):
+    """Each participant has read everything before the oldest message they
+    have not (or everything, if they have read them all)."""
+    Conversation = apps.get_model('messaging', 'Conversation')
+    rows = Conversation.objects.annotate(
+        unread_1=Min('messages__timestamp', filter=Q(messages__is_read=False)
+                     & ~Q(messages__sender=F('participant_1'))),
+        unread_2=Min('messages__timestamp', filter=Q(messages__is_read=False)
+                     & ~Q(messages__sender=F('participant_2'))),
+    )
+    tick = timedelta(microseconds=1)
+    now = timezone.now()
+    changed = []
+    for conversation in rows:
+        conversation.participant_1_read_at = (conversation.unread_1 - tick if conversation.unread_1
+                                              else now)
+        conversation.participant_2_read_at = (conversation.unread_2 - tick if conversation.unread_2
+                                              else now)
+        changed.append(conversation)
+    Conversation.objects.bulk_update(changed, ['participant_1_read_at', 'participant_2_read_at'],
+                                     batch_size=500)
+
+
+def unread_messages(reader):
+    """Messages ``reader`` ('participant_1' or 'participant_2') has not read."""
+    sender = 'participant_2' if reader == 'participant_1' else 'participant_1'
+    read_at = f'{reader}_read_at'
+    return Q(messages__sender=F(sender)) & (Q(**{f'{read_at}__isnull': True})
+                                            | Q(messages__timestamp__gt=F(read_at)))
+
+
+def rebuild_counts(apps, schema_editor):
+    """Recount unread messages against the watermarks, per conversation and
+    in each user's counter."""
+    Conversation = apps.get_model('messaging', 'Conversation')
+    UnreadCounter = apps.get_model('notifications', 'UnreadCounter')
+    rows = Conversation.objects.annotate(
+        unread_1=Count('messages', filter=unread_messages('participant_1')),
+        unread_2=Count('messages', filter=unread_messages('participant_2')),
+    )
+    changed = []
+    totals = {}
+    for conversation in rows:
+        conversation.participant_1_unread = conversation.unread_1
+        conversation.participant_2_unread = conversation.unread_2
+        changed.append(conversation)
+        for user_id, unread in ((conversation.participant_1_id, conversation.unread_1),
+                                (conversation.participant_2_id, conversation.unread_2)):
+            totals[user_id] = totals.get(user_id, 0) + unread
+    Conversation.objects.bulk_update(changed, ['participant_1_unread', 'participant_2_unread'],
+                                     batch_size=500)
+
+    totals = {user_id: n for user_id, n in totals.items() if n}
+    UnreadCounter.objects.update(messages=0)
+    UnreadCounter.objects.bulk_create([UnreadCounter(user_id=pk) for pk in totals],
+                                      ignore_conflicts=True, batch_size=500)
+    UnreadCounter.objects.bulk_update(
+        [UnreadCounter(user_id=pk, messages=n) for pk, n in totals.items()],
+        ['messages'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0005_message_unread_index_order'),
+        ('jobs', '0015_read_watermarks'),
+        ('notifications', '0007_read_watermarks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='participant_1_read_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='participant_2_read_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(fill_read_watermarks, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='message',
+            name='message_unread_idx',
+        ),
+        migrations.RemoveField(
+            model_name='message',
+            name='is_read',
+        ),
+        migrations.RunPython(rebuild_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,125 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:29
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+
+
+def preview(content):
+    content = ' '.join(content.split())
+    if len(content) <= 100:
+        return content
+    return content[:97].rstrip() + '...'
+
+
+def unread_messages(reader):
+    """Messages ``reader`` ('participant_1' or 'participant_2') has not read."""
+    sender = 'participant_2' if reader == 'participant_1' else 'participant_1'
+    read_at = f'{reader}_read_at'
+    return Q(messages__sender=F(sender)) & (Q(**{f'{read_at}__isnull': True})
+                                            | Q(messages__timestamp__gt=F(read_at)))
+
+
+def resummarize(Conversation, Message, pks):
+    """Recompute the inbox summary of the conversations ``pks``."""
+    latest = Message.objects.filter(conversation=OuterRef('pk')).order_by('-timestamp', '-id')
+    rows = Conversation.objects.filter(pk__in=pks).annotate(
+        message_at=Subquery(latest.values('timestamp')[:1]),
+        message_content=Subquery(latest.values('content')[:1]),
+        message_sender=Subquery(latest.values('sender')[:1]),
+        unread_1=Count('messages', filter=unread_messages('participant_1')),
+        unread_2=Count('messages', filter=unread_messages('participant_2')),
+    )
+    changed = []
+    for conversation in rows:
+        conversation.last_message_at = conversation.message_at
+        conversation.last_activity_at = conversation.message_at or conversation.created_at
+        conversation.last_message_preview = preview(conversation.message_content or '')
+        conversation.last_sender_id = conversation.message_sender
+        conversation.participant_1_unread = conversation.unread_1
+        conversation.participant_2_unread = conversation.unread_2
+        changed.append(conversation)
+    Conversation.objects.bulk_update(changed, [
+        'last_activity_at', 'last_message_at', 'last_message_preview', 'last_sender',
+        'participant_1_unread', 'participant_2_unread',
+    ], batch_size=500)
+
+
+def later(a, b):
+    """The later of two read watermarks, either of which may be unset."""
+    return max((t for t in (a, b) if t is not None), default=None)
+
+
+def recount_messages(Conversation, UnreadCounter, user_ids):
+    """Set the unread message counter of ``user_ids`` from their conversations."""
+    for user_id in user_ids:
+        total = (Conversation.objects.filter(participant_1=user_id)
+                 .aggregate(n=Sum('participant_1_unread'))['n'] or 0)
+        total += (Conversation.objects.filter(participant_2=user_id)
+                  .aggregate(n=Sum('participant_2_unread'))['n'] or 0)
+        UnreadCounter.objects.update_or_create(user_id=user_id, defaults={'messages': total})
+
+
+def order_participants(apps, schema_editor):
+    """Store every pair lower id first, merging a pair's two conversations
+    about one application (one per requester) into the older.
+
+    The merged conversation keeps each participant's later read watermark
+    and stays active if either was, and the participants' unread message
+    counters are recounted.
+    """
+    Conversation = apps.get_model('messaging', 'Conversation')
+    Message = apps.get_model('messaging', 'Message')
+    UnreadCounter = apps.get_model('notifications', 'UnreadCounter')
+    merged = []
+    for conversation in Conversation.objects.filter(participant_1__gt=F('participant_2')):
+        twin = Conversation.objects.filter(application_id=conversation.application_id,
+                                           participant_1_id=conversation.participant_2_id,
+                                           participant_2_id=conversation.participant_1_id).first()
+        if twin is not None:
+            keep, drop = sorted([conversation, twin], key=lambda c: (c.created_at, c.pk))
+            # The twin has the same participants the other way round
+            Conversation.objects.filter(pk=keep.pk).update(
+                participant_1_read_at=later(keep.participant_1_read_at, drop.participant_2_read_at),
+                participant_2_read_at=later(keep.participant_2_read_at, drop.participant_1_read_at),
+                is_active=keep.is_active or drop.is_active,
+            )
+            Message.objects.filter(conversation=drop).update(conversation=keep)
+            drop.delete()
+            merged.append(keep.pk)
+    Conversation.objects.filter(participant_1__gt=F('participant_2')).update(
+        participant_1=F('participant_2'), participant_2=F('participant_1'),
+        participant_1_unread=F('participant_2_unread'), participant_2_unread=F('participant_1_unread'),
+        participant_1_read_at=F('participant_2_read_at'), participant_2_read_at=F('participant_1_read_at'),
+    )
+    if merged:
+        resummarize(Conversation, Message, merged)
+        participants = Conversation.objects.filter(pk__in=merged).values_list(
+            'participant_1', 'participant_2')
+        recount_messages(Conversation, UnreadCounter,
+                         {user_id for pair in participants for user_id in pair})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_read_watermarks'),
+        ('messaging', '0006_read_watermarks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(order_participants, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='conversation',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.UniqueConstraint(fields=('application', 'participant_1', 'participant_2'), name='conversation_participants_unique'),
+        ),
+        migrations.AddConstraint(
+            model_name='conversation',
+            constraint=models.CheckConstraint(condition=models.Q(('participant_1__lt', models.F('participant_2'))), name='conversation_participants_ordered'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from jobs.models import Application
 
 
@@ -32,26 +33,76 @@ class ChatRequest(models.Model):
 
 
 class Conversation(models.Model):
-    """A conversation between two users about a specific job application"""
+    """
+    A conversation between two users about a specific job application.
+
+    The participants are stored in canonical order (participant_1 has the
+    lower id), so each pair has one conversation per application.
+    """
     application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='conversations')
     participant_1 = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='conversations_as_p1')
     participant_2 = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='conversations_as_p2')
     created_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True, help_text='Admin can deactivate if conversation violates business conduct')
+
+    # Inbox summary, maintained by messaging.inbox whenever a message is sent
+    # or read, so the inbox never has to look at the messages table.
+    last_activity_at = models.DateTimeField(default=timezone.now, help_text='Last message time, or creation time if none')
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    last_message_preview = models.CharField(max_length=100, blank=True)
+    last_sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    participant_1_unread = models.PositiveIntegerField(default=0, help_text='Messages participant 1 has not read')
+    participant_2_unread = models.PositiveIntegerField(default=0, help_text='Messages participant 2 has not read')
+    # Read watermarks: messages from the other participant sent after these
+    # are unread, so reading a conversation is one update of this row.
+    participant_1_read_at = models.DateTimeField(null=True, blank=True)
+    participant_2_read_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
-        unique_together = ['application', 'participant_1', 'participant_2']
         ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['application', 'participant_1', 'participant_2'],
+                                    name='conversation_participants_unique'),
+            models.CheckConstraint(condition=models.Q(participant_1__lt=models.F('participant_2')),
+                                   name='conversation_participants_ordered'),
+        ]
+        indexes = [
+            # Inbox: participant_N=... ORDER BY -last_activity_at, -id
+            models.Index(fields=['participant_1', '-last_activity_at', '-id'], name='conversation_inbox_p1_idx'),
+            models.Index(fields=['participant_2', '-last_activity_at', '-id'], name='conversation_inbox_p2_idx'),
+        ]
     
     def __str__(self):
         return f"Conversation: {self.participant_1.username} & {self.participant_2.username} about {self.application.job.title}"
     
+    @staticmethod
+    def ordered_pair(user_a, user_b):
+        """``user_a`` and ``user_b`` in canonical participant order"""
+        return (user_a, user_b) if user_a.pk < user_b.pk else (user_b, user_a)
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.participant_1_id > self.participant_2_id:
+            self.participant_1, self.participant_2 = self.participant_2, self.participant_1
+        super().save(*args, **kwargs)
+
     def get_other_participant(self, user):
         """Get the other participant in the conversation"""
         if user == self.participant_1:
             return self.participant_2
         return self.participant_1
 
+    def unread_for(self, user):
+        """Number of messages in this conversation ``user`` has not read"""
+        if getattr(user, 'pk', user) == self.participant_1_id:
+            return self.participant_1_unread
+        return self.participant_2_unread
+
+    def read_at_for(self, user):
+        """When ``user`` last read this conversation, or None if never"""
+        if getattr(user, 'pk', user) == self.participant_1_id:
+            return self.participant_1_read_at
+        return self.participant_2_read_at
+
 
 class Message(models.Model):
     """Individual message in a conversation - strictly business only, admin visible"""
@@ -59,11 +110,16 @@ class Message(models.Model):
     sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sent_messages')
     content = models.TextField(help_text='Keep messages strictly business-related')
     timestamp = models.DateTimeField(auto_now_add=True)
-    is_read = models.BooleanField(default=False)
     flagged_by_admin = models.BooleanField(default=False, help_text='Admin can flag inappropriate messages')
     
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            # History windows: conversation=... ORDER BY timestamp, id;
+            # also unread lookups: timestamp > the reader's watermark
+            models.Index(fields=['conversation', 'timestamp', 'id'],
+                         name='message_history_idx'),
+        ]
     
     def __str__(self):
         return f"Message from {self.sender.username} at {self.timestamp}"
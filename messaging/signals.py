@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import membership
+from .models import Conversation
+
+
+@receiver(post_save, sender=Conversation)
+@receiver(post_delete, sender=Conversation)
+def invalidate_membership(sender, instance, raw=False, **kwargs):
+    """A new, changed or removed conversation changes who may use it."""
+    if raw:
+        return
+    membership.forget(instance)
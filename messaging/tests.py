@@ -0,0 +1,326 @@
+from datetime import timedelta
+from io import StringIO
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.signals import request_finished
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Application, JobPost
+from notifications import counters, pubsub
+from users.models import CustomUser
+from . import live, membership
+from .models import Conversation, Message
+
+
+def make_conversation(company, student, title='Engineer'):
+    job = JobPost.objects.create(
+        company=company, title=title, description='d', requirements='r',
+        location='Accra', is_approved=True, deadline=timezone.now() + timedelta(days=7))
+    application = Application.objects.create(job=job, applicant=student, cover_letter='Hi')
+    return Conversation.objects.create(application=application, participant_1=company,
+                                       participant_2=student)
+
+
+class InboxTests(TestCase):
+
+    def setUp(self):
+        self.company = CustomUser.objects.create_user(
+            'acme', password='pw', is_company=True, verification_status=CustomUser.VERIFIED)
+        self.student = CustomUser.objects.create_user(
+            'student', password='pw', verification_status=CustomUser.VERIFIED)
+        self.first = make_conversation(self.company, self.student, 'Engineer')
+        self.second = make_conversation(self.company, self.student, 'Designer')
+
+    def send(self, sender, conversation, content):
+        self.client.force_login(sender)
+        self.client.post(reverse('messaging:conversation_detail',
+                                 args=[conversation.application_id]), {'content': content})
+
+    def test_sending_and_reading_maintain_the_summary(self):
+        self.send(self.company, self.first, 'Hello there')
+        self.send(self.company, self.first, 'Are you free tomorrow?')
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.last_message_preview, 'Are you free tomorrow?')
+        self.assertEqual(self.first.last_sender, self.company)
+        self.assertEqual(self.first.unread_for(self.student), 2)
+        self.assertEqual(self.first.unread_for(self.company), 0)
+
+        self.client.force_login(self.student)
+        url = reverse('messaging:conversation_detail', args=[self.first.application_id])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        # Reading moves the watermark; the messages themselves are untouched
+        writes = [q['sql'] for q in queries if q['sql'].startswith('UPDATE')]
+        self.assertFalse([sql for sql in writes if 'messaging_message' in sql])
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.unread_for(self.student), 0)
+        self.assertIsNotNone(self.first.read_at_for(self.student))
+        self.assertEqual(counters.reconcile([self.student.pk]), 0)
+
+        self.send(self.company, self.first, 'One more thing')
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.unread_for(self.student), 1)
+        self.assertEqual(counters.compute_counts([self.student.pk])[self.student.pk]['messages'], 1)
+
+    def test_inbox_is_ordered_by_activity_without_per_row_queries(self):
+        self.send(self.company, self.second, 'Second first')
+        self.send(self.student, self.first, 'Then first')
+        for i in range(3):
+            make_conversation(self.company, self.student, f'Extra {i}')
+
+        self.client.force_login(self.student)
+        url = reverse('messaging:conversations')
+        self.client.get(url)
+        # session, user, one inbox query per participant side, badge counts
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        page = list(response.context['conversations'])
+        self.assertEqual([c.application.job.title for c in page],
+                         ['Extra 2', 'Extra 1', 'Extra 0', 'Engineer', 'Designer'])
+        self.assertContains(response, 'Then first')
+        self.assertContains(response, 'Second first')
+        self.assertEqual([c.other_user for c in page], [self.company] * 5)
+
+    def test_rebuild_recomputes_summaries(self):
+        self.send(self.company, self.first, 'Hello')
+        Conversation.objects.update(last_message_preview='', participant_2_unread=0)
+        call_command('rebuild_inbox', stdout=StringIO())
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.last_message_preview, 'Hello')
+        self.assertEqual(self.first.participant_2_unread, 1)
+        self.assertEqual(self.first.last_activity_at,
+                         Message.objects.get(conversation=self.first).timestamp)
+
+
+class MessageHistoryTests(TestCase):
+
+    def setUp(self):
+        self.company = CustomUser.objects.create_user(
+            'acme', password='pw', is_company=True, verification_status=CustomUser.VERIFIED)
+        self.student = CustomUser.objects.create_user(
+            'student', password='pw', verification_status=CustomUser.VERIFIED)
+        self.conversation = make_conversation(self.company, self.student)
+        self.messages = [Message.objects.create(conversation=self.conversation,
+                                                sender=self.company, content=f'Message {i}')
+                         for i in range(35)]
+        self.detail_url = reverse('messaging:conversation_detail',
+                                  args=[self.conversation.application_id])
+        self.history_url = reverse('messaging:message_history',
+                                   args=[self.conversation.application_id])
+        self.client.force_login(self.student)
+
+    def test_page_renders_only_the_newest_window(self):
+        response = self.client.get(self.detail_url)
+        shown = response.context['chat_messages']
+        self.assertEqual(shown, self.messages[-30:])
+        self.assertTrue(response.context['has_older'])
+        self.assertContains(response, 'Load older messages')
+        self.assertNotContains(response, 'Message 4<')
+
+    def test_older_and_newer_windows(self):
+        oldest_shown = self.messages[5]
+        data = self.client.get(self.history_url, {'before': oldest_shown.pk}).json()
+        self.assertEqual((data['first_id'], data['last_id']),
+                         (self.messages[0].pk, self.messages[4].pk))
+        self.assertFalse(data['has_more'])
+        self.assertIn('Message 0', data['html'])
+
+        data = self.client.get(self.history_url, {'before': oldest_shown.pk, 'limit': 2}).json()
+        self.assertEqual(data['first_id'], self.messages[3].pk)
+        self.assertTrue(data['has_more'])
+
+        data = self.client.get(self.history_url, {'after': self.messages[32].pk}).json()
+        self.assertEqual((data['first_id'], data['last_id']),
+                         (self.messages[33].pk, self.messages[34].pk))
+        self.assertFalse(data['has_more'])
+
+    def test_ajax_send_returns_the_new_message(self):
+        response = self.client.post(self.detail_url, {'content': 'Thanks!'},
+                                    HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        message = Message.objects.latest('pk')
+        self.assertEqual(response.json()['id'], message.pk)
+        self.assertIn('Thanks!', response.json()['html'])
+
+        response = self.client.post(self.detail_url, {'content': ' '},
+                                    HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.get(self.history_url).status_code, 400)
+        self.assertEqual(self.client.get(self.history_url, {'before': 'x'}).status_code, 400)
+        outsider = CustomUser.objects.create_user('outsider', password='pw')
+        self.client.force_login(outsider)
+        response = self.client.get(self.history_url, {'before': self.messages[5].pk})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(PUBSUB_BACKEND='notifications.pubsub.LocmemBackend')
+class LiveChatTests(TestCase):
+
+    def setUp(self):
+        pubsub.published.clear()
+        cache.clear()
+        self.company = CustomUser.objects.create_user(
+            'acme', password='pw', is_company=True, verification_status=CustomUser.VERIFIED)
+        self.student = CustomUser.objects.create_user(
+            'student', password='pw', verification_status=CustomUser.VERIFIED)
+        self.conversation = make_conversation(self.company, self.student)
+        self.channel = live.conversation_channel(self.conversation.pk)
+        self.args = [self.conversation.application_id]
+
+    def close(self, response):
+        # What the ASGI server does when the client goes away, minus closing
+        # the test's database connection.
+        request_finished.disconnect(close_old_connections)
+        try:
+            response.close()
+        finally:
+            request_finished.connect(close_old_connections)
+
+    def events(self):
+        return [message for channel, message in pubsub.published if channel == self.channel]
+
+    def test_sending_reading_and_typing_publish_events(self):
+        self.client.force_login(self.company)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('messaging:conversation_detail', args=self.args),
+                             {'content': 'Hello'})
+        message = Message.objects.get()
+        [event] = self.events()
+        self.assertEqual((event['event'], event['id'], event['sender_id']),
+                         ('message', message.pk, self.company.pk))
+        self.assertIn('You', event['html'][str(self.company.pk)])
+        self.assertIn('acme', event['html'][str(self.student.pk)])
+
+        self.client.force_login(self.student)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('messaging:mark_read', args=self.args))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.events()[-1], {'event': 'read', 'user_id': self.student.pk})
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.unread_for(self.student), 0)
+
+        typing_url = reverse('messaging:typing', args=self.args)
+        self.assertEqual(self.client.post(typing_url).status_code, 204)
+        self.client.post(typing_url)
+        typing = [e for e in self.events() if e['event'] == 'typing']
+        self.assertEqual(typing, [{'event': 'typing', 'user_id': self.student.pk,
+                                   'username': 'student'}])
+
+        outsider = CustomUser.objects.create_user('outsider', password='pw')
+        self.client.force_login(outsider)
+        self.assertEqual(self.client.post(typing_url).status_code, 404)
+
+    def test_admin_action_closes_deactivated_conversations(self):
+        self.client.force_login(CustomUser.objects.create_superuser('admin', password='pw'))
+        url = reverse('admin:messaging_conversation_changelist')
+        membership.conversation_id(self.student, self.args[0])
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(url, {'action': 'deactivate_conversations',
+                                   '_selected_action': [self.conversation.pk]})
+        # A page reloading on 'closed' must not re-cache the active conversation
+        for callback in callbacks:
+            callback()
+            self.assertIsNone(membership.conversation_id(self.student, self.args[0]))
+        self.assertEqual(self.events(), [{'event': 'closed'}])
+        self.conversation.refresh_from_db()
+        self.assertFalse(self.conversation.is_active)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {'action': 'activate_conversations',
+                                   '_selected_action': [self.conversation.pk]})
+        self.assertEqual(self.events(), [{'event': 'closed'}])
+
+    def test_stream_is_disabled_under_wsgi(self):
+        self.client.force_login(self.student)
+        url = reverse('messaging:conversation_stream', args=self.args)
+        self.assertEqual(self.client.get(url).status_code, 204)
+
+    async def test_stream_relays_events_for_the_viewer(self):
+        url = reverse('messaging:conversation_stream', args=self.args)
+        outsider = await sync_to_async(CustomUser.objects.create_user)('outsider', password='pw')
+        await self.async_client.aforce_login(outsider)
+        self.assertEqual((await self.async_client.get(url)).status_code, 404)
+
+        await self.async_client.aforce_login(self.student)
+        response = await self.async_client.get(url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = response.streaming_content
+        self.assertEqual(await anext(chunks), b'retry: 5000\n\n')
+
+        pubsub.publish(self.channel, {'event': 'typing', 'user_id': self.student.pk,
+                                      'username': 'student'})
+        pubsub.publish(self.channel, {'event': 'message', 'id': 7, 'sender_id': self.company.pk,
+                                      'html': {str(self.company.pk): 'mine',
+                                               str(self.student.pk): 'theirs'}})
+        # The viewer's own typing is not echoed back
+        self.assertEqual(await anext(chunks),
+                         b'event: message\ndata: {"id":7,"sender_id":%d,"html":"theirs"}\n\n'
+                         % self.company.pk)
+
+        pubsub.publish(self.channel, {'event': 'closed'})
+        self.assertEqual(await anext(chunks), b'event: closed\ndata: {}\n\n')
+        with self.assertRaises(StopAsyncIteration):
+            await anext(chunks)
+        self.assertEqual(pubsub.get_backend().subscriber_count(), 0)
+        self.close(response)
+
+
+class MembershipTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        # Created first, so the student has the lower id
+        self.student = CustomUser.objects.create_user(
+            'student', password='pw', verification_status=CustomUser.VERIFIED)
+        self.company = CustomUser.objects.create_user(
+            'acme', password='pw', is_company=True, verification_status=CustomUser.VERIFIED)
+        self.conversation = make_conversation(self.company, self.student)
+        self.application_id = self.conversation.application_id
+
+    def test_participants_are_stored_in_canonical_order(self):
+        self.assertEqual((self.conversation.participant_1, self.conversation.participant_2),
+                         (self.student, self.company))
+        self.assertEqual(Conversation.ordered_pair(self.company, self.student),
+                         (self.student, self.company))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Conversation.objects.create(application_id=self.application_id,
+                                        participant_1=self.company, participant_2=self.student)
+
+    def test_lookup_is_cached_until_the_conversation_changes(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(membership.conversation_id(self.company, self.application_id),
+                             self.conversation.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(membership.conversation_id(self.company.pk, self.application_id),
+                             self.conversation.pk)
+
+        outsider = CustomUser.objects.create_user('outsider', password='pw')
+        self.assertIsNone(membership.conversation_id(outsider, self.application_id))
+        with self.assertNumQueries(0):
+            self.assertIsNone(membership.conversation_id(outsider, self.application_id))
+
+        admin = CustomUser.objects.create_superuser('admin', password='pw')
+        self.client.force_login(admin)
+        self.client.post(reverse('messaging:admin_deactivate', args=[self.conversation.pk]))
+        self.assertIsNone(membership.conversation_id(self.company, self.application_id))
+
+    def test_chat_requests_need_no_conversation_queries_once_cached(self):
+        self.client.force_login(self.student)
+        url = reverse('messaging:typing', args=[self.application_id])
+        self.client.post(url)
+        cache.delete(f'messaging:typing:{self.conversation.pk}:{self.student.pk}')
+        # session and user only
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.post(url).status_code, 204)
+
+        response = self.client.get(reverse('messaging:conversation_detail',
+                                           args=[self.application_id]))
+        self.assertEqual(response.context['other_user'], self.company)
+        self.assertEqual(response.context['application'].job.title, 'Engineer')
@@ -9,6 +9,10 @@ urlpatterns = [
     path('requests/<int:request_id>/<str:action>/', views.respond_to_chat_request, name='respond_chat_request'),
     path('conversations/', views.conversations, name='conversations'),
     path('conversation/<int:application_id>/', views.conversation_detail, name='conversation_detail'),
+    path('conversation/<int:application_id>/messages/', views.message_history, name='message_history'),
+    path('conversation/<int:application_id>/read/', views.mark_conversation_read, name='mark_read'),
+    path('conversation/<int:application_id>/typing/', views.typing, name='typing'),
+    path('conversation/<int:application_id>/stream/', views.conversation_stream, name='conversation_stream'),
     path('admin/monitor/', views.admin_monitor_conversations, name='admin_monitor'),
     path('admin/deactivate/<int:conversation_id>/', views.admin_deactivate_conversation, name='admin_deactivate'),
     path('admin/flag/<int:message_id>/', views.admin_flag_message, name='admin_flag_message'),
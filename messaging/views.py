@@ -1,11 +1,21 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Q
+from django.http import (HttpResponse, HttpResponseForbidden, HttpResponseNotFound,
+                         JsonResponse, StreamingHttpResponse)
+from django.template.loader import render_to_string
 from django.utils import timezone
+from django.views.decorators.http import require_POST
+from . import history, inbox, live, membership
 from .models import ChatRequest, Conversation, Message
 from jobs.models import Application
-from notifications.utils import create_notification
+from jobs.pagination import MergedCursorPaginator
+from notifications import counters
+from notifications.utils import create_notification, create_notifications_bulk
 from notifications.models import Notification
 
 
@@ -105,10 +115,12 @@ def respond_to_chat_request(request, request_id, action):
         chat_request.save()
         
         # Create conversation
+        participant_1, participant_2 = Conversation.ordered_pair(chat_request.requester,
+                                                                 chat_request.recipient)
         conversation, created = Conversation.objects.get_or_create(
             application=chat_request.application,
-            participant_1=chat_request.requester,
-            participant_2=chat_request.recipient
+            participant_1=participant_1,
+            participant_2=participant_2
         )
         
         # Notify requester
@@ -146,81 +158,203 @@ def respond_to_chat_request(request, request_id, action):
 
 @login_required
 def conversations(request):
-    """List all conversations for the current user"""
-    user_conversations = Conversation.objects.filter(
-        Q(participant_1=request.user) | Q(participant_2=request.user),
-        is_active=True
-    ).select_related('application__job', 'participant_1', 'participant_2').prefetch_related('messages')
+    """List the current user's conversations, most recently active first"""
+    active = Conversation.objects.filter(is_active=True).select_related(
+        'application__job', 'participant_1', 'participant_2')
+    # Keyset pagination on last activity, 20 per page; each half is served
+    # by its own index and merged
+    paginator = MergedCursorPaginator(inbox.inbox_sources(request.user, active), 20,
+                                      ('-last_activity_at', '-id'))
+    page = paginator.get_page(request)
+    for conv in page:
+        conv.other_user = conv.get_other_participant(request.user)
+        conv.unread = conv.unread_for(request.user)
     
     return render(request, 'messaging/conversations.html', {
-        'conversations': user_conversations
+        'conversations': page
     })
 
 
+def _find_conversation(user, application_id, *related):
+    """The active conversation ``user`` has about the application, if any"""
+    conversation_id = membership.conversation_id(user, application_id)
+    if conversation_id is None:
+        return None
+    return Conversation.objects.select_related(*related).filter(pk=conversation_id).first()
+
+
+def _mark_read(conversation, user):
+    """Mark the other participant's messages read, if there are any unread"""
+    if not conversation.unread_for(user):
+        return
+    with transaction.atomic():
+        marked = inbox.mark_read(conversation, user)
+        counters.decrement(user, counters.MESSAGES, marked)
+        live.messages_read(conversation, user)
+
+
+def _render_messages(request, chat_messages):
+    return ''.join(render_to_string('messaging/_message.html', {'msg': msg}, request=request)
+                   for msg in chat_messages)
+
+
+def _is_ajax(request):
+    return request.headers.get('x-requested-with') == 'XMLHttpRequest'
+
+
 @login_required
 def conversation_detail(request, application_id):
     """View and send messages in a conversation"""
-    application = get_object_or_404(Application, pk=application_id)
-    
-    # Find the conversation
-    conversation = Conversation.objects.filter(
-        application=application,
-        is_active=True
-    ).filter(
-        Q(participant_1=request.user, participant_2=application.job.company if request.user == application.applicant else application.applicant) |
-        Q(participant_1=application.job.company if request.user == application.applicant else application.applicant, participant_2=request.user)
-    ).first()
+    # Find the conversation; only participants get one
+    conversation = _find_conversation(request.user, application_id, 'application__job',
+                                      'participant_1', 'participant_2')
     
     if not conversation:
+        application = get_object_or_404(Application.objects.only('job_id'), pk=application_id)
         messages.error(request, "No active conversation found. You may need to request chat first.")
-        return redirect('jobs:job_detail', pk=application.job.pk)
-    
-    # Check user is a participant
-    if request.user not in [conversation.participant_1, conversation.participant_2]:
-        messages.error(request, "You are not part of this conversation.")
-        return redirect('jobs:job_list')
+        return redirect('jobs:job_detail', pk=application.job_id)
+    application = conversation.application
     
     # Handle sending a message
     if request.method == 'POST':
         content = request.POST.get('content', '').strip()
         if content:
-            message = Message.objects.create(
-                conversation=conversation,
-                sender=request.user,
-                content=content
-            )
-            
-            # Notify other participant
             other_user = conversation.get_other_participant(request.user)
-            create_notification(
-                recipient=other_user,
-                notification_type=Notification.EMAIL_VERIFIED,
-                title=f"New message from {request.user.username}",
-                message=f"{request.user.username}: {content[:50]}{'...' if len(content) > 50 else ''}",
-                related_application=application
-            )
-            
+            with transaction.atomic():
+                message = Message.objects.create(
+                    conversation=conversation,
+                    sender=request.user,
+                    content=content
+                )
+                inbox.record_message(message)
+                counters.increment(other_user, counters.MESSAGES)
+                live.message_sent(message)
+
+                # Notify other participant; a burst of messages shares one row
+                create_notification(
+                    recipient=other_user,
+                    notification_type=Notification.NEW_MESSAGE,
+                    title=f"New message from {request.user.username}",
+                    message=f"{request.user.username}: {content[:50]}{'...' if len(content) > 50 else ''}",
+                    related_application=application,
+                    thread_key=f'conversation:{conversation.pk}',
+                    coalesced_title='{count} new messages from ' + request.user.username
+                )
+
+            if _is_ajax(request):
+                # The page appends the message instead of reloading the thread
+                return JsonResponse({'id': message.pk,
+                                     'html': _render_messages(request, [message])})
             return redirect('messaging:conversation_detail', application_id=application_id)
         else:
+            if _is_ajax(request):
+                return JsonResponse({'error': 'Message cannot be empty.'}, status=400)
             messages.error(request, "Message cannot be empty.")
     
-    # Mark messages as read
-    Message.objects.filter(
-        conversation=conversation,
-        is_read=False
-    ).exclude(sender=request.user).update(is_read=True)
+    _mark_read(conversation, request.user)
+    
+    # Only the newest window; older messages are fetched on demand
+    chat_messages, has_older = history.latest(conversation)
     
-    # Get all messages
-    chat_messages = conversation.messages.all().select_related('sender')
+    other_user = conversation.get_other_participant(request.user)
+    other_read_at = conversation.read_at_for(other_user)
     
     return render(request, 'messaging/conversation_detail.html', {
         'conversation': conversation,
         'chat_messages': chat_messages,
+        'has_older': has_older,
         'application': application,
-        'other_user': conversation.get_other_participant(request.user)
+        'other_user': other_user,
+        # Whether the other participant has read the user's latest message
+        'seen': (conversation.last_sender_id == request.user.pk and other_read_at is not None
+                 and other_read_at >= conversation.last_message_at),
     })
 
 
+@login_required
+def message_history(request, application_id):
+    """
+    JSON window of a conversation's messages.
+
+    ``?before=<id>`` returns the page preceding that message, ``?after=<id>``
+    the messages that arrived after it (which also marks them read).
+    """
+    conversation = _find_conversation(request.user, application_id)
+    if not conversation:
+        return JsonResponse({'error': 'No active conversation found.'}, status=404)
+
+    try:
+        limit = min(int(request.GET.get('limit', history.PAGE_SIZE)), history.MAX_PAGE_SIZE)
+        before = request.GET.get('before')
+        after = request.GET.get('after')
+        before = int(before) if before else None
+        after = int(after) if after else None
+    except ValueError:
+        return JsonResponse({'error': 'before, after and limit must be integers'}, status=400)
+    if limit < 1 or (before is None) == (after is None):
+        return JsonResponse({'error': 'exactly one of before or after is required'}, status=400)
+
+    if before is not None:
+        chat_messages, more = history.before(conversation, before, limit)
+    else:
+        chat_messages, more = history.after(conversation, after, limit)
+        if chat_messages:
+            _mark_read(conversation, request.user)
+
+    return JsonResponse({
+        'html': _render_messages(request, chat_messages),
+        'first_id': chat_messages[0].pk if chat_messages else None,
+        'last_id': chat_messages[-1].pk if chat_messages else None,
+        'has_more': more,
+    })
+
+
+@login_required
+@require_POST
+def mark_conversation_read(request, application_id):
+    """Mark the other participant's messages read (sent by the live chat page)"""
+    conversation = _find_conversation(request.user, application_id)
+    if not conversation:
+        return JsonResponse({'error': 'No active conversation found.'}, status=404)
+    _mark_read(conversation, request.user)
+    return HttpResponse(status=204)
+
+
+@login_required
+@require_POST
+def typing(request, application_id):
+    """Let the other participant know the user is typing"""
+    conversation_id = membership.conversation_id(request.user, application_id)
+    if conversation_id is None:
+        return JsonResponse({'error': 'No active conversation found.'}, status=404)
+    live.typing(conversation_id, request.user)
+    return HttpResponse(status=204)
+
+
+async def conversation_stream(request, application_id):
+    """Server-Sent Events stream of a conversation's messages, read receipts and typing"""
+    if not isinstance(request, ASGIRequest):
+        # Streaming would tie up a WSGI worker; 204 tells EventSource to stop.
+        return HttpResponse(status=204)
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponseForbidden()
+    # The same check as conversation_detail: an active conversation the
+    # user takes part in
+    conversation_id = await sync_to_async(membership.conversation_id)(user, application_id)
+    if conversation_id is None:
+        return HttpResponseNotFound()
+    stream = live.open_stream(user, conversation_id)
+    if stream is None:
+        response = HttpResponse("Too many open connections.", status=429)
+        response['Retry-After'] = '30'
+        return response
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @login_required
 @user_passes_test(lambda u: u.is_superuser)
 def admin_monitor_conversations(request):
@@ -252,14 +386,16 @@ def admin_deactivate_conversation(request, conversation_id):
         messages.error(request, "Invalid request method.")
         return redirect('messaging:admin_monitor')
     
-    conversation = get_object_or_404(Conversation, pk=conversation_id)
-    conversation.is_active = False
-    conversation.save()
-    
-    # Notify both participants
-    for participant in [conversation.participant_1, conversation.participant_2]:
-        create_notification(
-            recipient=participant,
+    conversation = get_object_or_404(
+        Conversation.objects.select_related('application__job'), pk=conversation_id)
+    with transaction.atomic():
+        conversation.is_active = False
+        conversation.save()
+        live.conversation_closed(conversation)
+
+        # Notify both participants
+        create_notifications_bulk(
+            [conversation.participant_1_id, conversation.participant_2_id],
             notification_type=Notification.EMAIL_VERIFIED,
             title="Conversation deactivated by admin",
             message=f"Your conversation about {conversation.application.job.title} has been deactivated due to policy violations.",
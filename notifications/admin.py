@@ -1,10 +1,55 @@
 from django.contrib import admin
-from .models import Notification
+from django.utils import timezone
+
+from .models import (BroadcastNotification, BroadcastReceipt, DigestSubscription, Notification,
+                     Outbox)
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ('recipient', 'notification_type', 'title', 'is_read', 'created_at')
+    list_display = ('recipient', 'notification_type', 'title', 'event_count', 'is_read', 'created_at')
     list_filter = ('notification_type', 'is_read', 'created_at')
     search_fields = ('recipient__username', 'title', 'message')
     readonly_fields = ('created_at',)
-    date_hierarchy = 'created_at'
\ No newline at end of file
+    date_hierarchy = 'created_at'
+
+
+@admin.register(BroadcastNotification)
+class BroadcastNotificationAdmin(admin.ModelAdmin):
+    list_display = ('title', 'audience', 'institution', 'notification_type', 'created_at')
+    list_filter = ('audience', 'notification_type', 'created_at')
+    search_fields = ('title', 'message', 'institution')
+    readonly_fields = ('created_at',)
+    raw_id_fields = ('related_job',)
+    date_hierarchy = 'created_at'
+
+
+@admin.register(BroadcastReceipt)
+class BroadcastReceiptAdmin(admin.ModelAdmin):
+    list_display = ('broadcast', 'user', 'read_at', 'dismissed')
+    list_filter = ('dismissed',)
+    search_fields = ('user__username', 'broadcast__title')
+    raw_id_fields = ('broadcast', 'user')
+
+
+@admin.register(DigestSubscription)
+class DigestSubscriptionAdmin(admin.ModelAdmin):
+    list_display = ('user', 'enabled', 'last_sent_at')
+    list_filter = ('enabled',)
+    search_fields = ('user__username', 'user__email')
+    raw_id_fields = ('user',)
+
+
+@admin.register(Outbox)
+class OutboxAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject', 'to')
+    readonly_fields = ('created_at', 'sent_at', 'last_error', 'attempts')
+    actions = ['retry_emails']
+
+    def retry_emails(self, request, queryset):
+        queryset.exclude(status=Outbox.SENT).update(
+            status=Outbox.PENDING, attempts=0, next_attempt_at=timezone.now(),
+            claimed_by='', claimed_until=None)
+
+    retry_emails.short_description = "Retry selected emails now"
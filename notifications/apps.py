@@ -1,5 +1,9 @@
 from django.apps import AppConfig
 
+
 class NotificationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'notifications'
\ No newline at end of file
+    name = 'notifications'
+
+    def ready(self):
+        from . import signals  # noqa: F401
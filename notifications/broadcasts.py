@@ -0,0 +1,153 @@
+"""
+Broadcast notifications: one row read by many users.
+
+A ``BroadcastNotification`` is addressed to an audience (all admins, all
+students, all companies or one institution) and stored once, so sending
+one costs the same whatever the audience size. A user's read state is a
+``BroadcastReceipt`` written only when they read or dismiss it; no
+receipt means unread.
+
+Per-user unread counts are therefore computed rather than stored, and
+cached under a broadcast version that every new or deleted broadcast
+bumps (see ``signals``). Reading or dismissing only drops that user's
+cached count.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q, Value
+
+from . import pubsub
+from .models import BroadcastNotification, BroadcastReceipt
+
+VERSION_KEY = 'notifications:broadcast-version'
+
+UNREAD_TIMEOUT = 60 * 60
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Millisecond clock, so a version lost from the cache is never reused
+        cache.add(VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    """Invalidate every user's cached broadcast unread count."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, int(time.time() * 1000), None)
+
+
+def _unread_key(user):
+    return f'notifications:broadcast-unread:{_version()}:{user.pk}'
+
+
+def audiences(user):
+    """``(audience, institution)`` pairs ``user`` belongs to."""
+    if user.is_superuser:
+        result = [(BroadcastNotification.ADMINS, '')]
+    elif user.is_company:
+        result = [(BroadcastNotification.COMPANIES, '')]
+    else:
+        result = [(BroadcastNotification.STUDENTS, '')]
+    institution = (user.institution or '').strip()
+    if institution:
+        result.append((BroadcastNotification.INSTITUTION, institution))
+    return result
+
+
+def audience_filter(user):
+    """Q selecting the broadcasts addressed to ``user``."""
+    condition = Q()
+    for audience, institution in audiences(user):
+        condition |= Q(audience=audience, institution=institution)
+    return condition
+
+
+def _receipts(user):
+    return BroadcastReceipt.objects.filter(broadcast=OuterRef('pk'), user=user)
+
+
+def visible_to(user):
+    """Broadcasts ``user`` has not dismissed, annotated with ``is_read``."""
+    return (BroadcastNotification.objects
+            .filter(audience_filter(user), created_at__gte=user.date_joined)
+            .exclude(Exists(_receipts(user).filter(dismissed=True)))
+            .annotate(is_read=Exists(_receipts(user))))
+
+
+def unread(user):
+    return (BroadcastNotification.objects
+            .filter(audience_filter(user), created_at__gte=user.date_joined)
+            .exclude(Exists(_receipts(user))))
+
+
+def unread_count(user):
+    """Number of unread broadcasts for ``user``, cached."""
+    key = _unread_key(user)
+    count = cache.get(key)
+    if count is None:
+        count = unread(user).count()
+        cache.set(key, count, UNREAD_TIMEOUT)
+    return count
+
+
+def send(audience, notification_type, title, message, institution='', related_job=None):
+    """Create a broadcast for ``audience``."""
+    return BroadcastNotification.objects.create(
+        audience=audience,
+        institution=institution.strip(),
+        notification_type=notification_type,
+        title=title,
+        message=message,
+        related_job=related_job
+    )
+
+
+def _forget_count(user):
+    key = _unread_key(user)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+    pubsub.publish_on_commit(pubsub.user_channel(user.pk), {'event': 'counts'})
+
+
+def mark_read(user, broadcast_ids):
+    """Record ``user`` as having read the given broadcasts."""
+    BroadcastReceipt.objects.bulk_create(
+        [BroadcastReceipt(broadcast_id=pk, user=user) for pk in broadcast_ids],
+        ignore_conflicts=True, batch_size=500)
+    _forget_count(user)
+
+
+def mark_all_read(user):
+    mark_read(user, list(unread(user).values_list('pk', flat=True)))
+
+
+def dismiss(user, broadcast_id):
+    """Hide a broadcast from ``user``'s list (which also marks it read)."""
+    with transaction.atomic():
+        receipt, created = BroadcastReceipt.objects.get_or_create(
+            broadcast_id=broadcast_id, user=user, defaults={'dismissed': True})
+        if not created and not receipt.dismissed:
+            receipt.dismissed = True
+            receipt.save(update_fields=['dismissed'])
+    _forget_count(user)
+
+
+def feed_sources(user, notifications):
+    """``notifications`` and ``user``'s broadcasts as merge-able querysets.
+
+    Both are annotated with ``activity_at`` (when a notification last took
+    an event, when a broadcast was sent) and a constant ``source``, so that
+    ``('-activity_at', '-source', '-id')`` orders the merged stream uniquely.
+    """
+    return [
+        notifications.annotate(activity_at=F('updated_at'), source=Value(0)),
+        visible_to(user).select_related('related_job')
+        .annotate(activity_at=F('created_at'), source=Value(1)),
+    ]
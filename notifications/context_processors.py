@@ -1,11 +1,9 @@
-from .models import Notification
+from . import counters
 
 def notification_context(request):
-    """Add notification count to the template context."""
-    if request.user.is_authenticated:
-        unread_count = Notification.objects.filter(
-            recipient=request.user,
-            is_read=False
-        ).count()
-        return {'notification_count': unread_count}
-    return {'notification_count': 0}
\ No newline at end of file
+    """Add notification count to the template context.
+
+    The count is lazy: the counter row is only read if a template
+    actually renders ``notification_count``.
+    """
+    return {'notification_count': counters.lazy_count(request, counters.NOTIFICATIONS)}
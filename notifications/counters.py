@@ -0,0 +1,260 @@
+"""
+Helpers for the denormalized per-user unread counters (``UnreadCounter``).
+
+Every code path that changes read state calls one of ``increment``,
+``decrement`` or ``reset`` inside the same transaction as the change, so
+``get_counts`` can serve the navbar badges from a single primary-key
+lookup. ``reconcile`` recomputes the true values from the source tables.
+Each change also tells the user's live connections (``notifications.live``)
+to refresh their badges once it commits.
+
+Application read state is a per-user watermark on the same row:
+``mark_seen`` zeroes a count and moves its watermark to now in one
+update, and anything newer than the watermark is unread.
+"""
+from django.apps import apps as global_apps
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+from . import broadcasts, pubsub
+
+NOTIFICATIONS = 'notifications'
+COMPANY_APPLICATIONS = 'company_applications'
+APPLICANT_UPDATES = 'applicant_updates'
+MESSAGES = 'messages'
+
+FIELDS = (NOTIFICATIONS, COMPANY_APPLICATIONS, APPLICANT_UPDATES, MESSAGES)
+
+EMPTY_COUNTS = dict.fromkeys(FIELDS, 0)
+
+# Published to the user's channel whenever one of their counters changes
+COUNTS_CHANGED = {'event': 'counts'}
+
+# Counts whose read state is a watermark on the counter row
+SEEN_AT = {
+    COMPANY_APPLICATIONS: 'company_applications_seen_at',
+    APPLICANT_UPDATES: 'applicant_updates_seen_at',
+}
+
+
+def _counter_model(apps=global_apps):
+    return apps.get_model('notifications', 'UnreadCounter')
+
+
+def _user_id(user):
+    return getattr(user, 'pk', user)
+
+
+def _update(user, **changes):
+    """Apply ``changes`` to the user's counter row, creating it if needed."""
+    UnreadCounter = _counter_model()
+    user_id = _user_id(user)
+    pubsub.publish_on_commit(pubsub.user_channel(user_id), COUNTS_CHANGED)
+    with transaction.atomic():
+        if UnreadCounter.objects.filter(pk=user_id).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                UnreadCounter.objects.create(user_id=user_id)
+        except IntegrityError:
+            # Created concurrently; fall through to the update.
+            pass
+        UnreadCounter.objects.filter(pk=user_id).update(**changes)
+
+
+def increment(user, field, amount=1):
+    if amount:
+        _update(user, **{field: F(field) + amount})
+
+
+def decrement(user, field, amount=1):
+    if amount:
+        _update(user, **{field: Greatest(F(field) - amount, Value(0))})
+
+
+def increment_many(users, field, amount=1):
+    """Add ``amount`` to ``field`` for every user in ``users`` at once.
+
+    Missing counter rows are created first (ignoring ones that already
+    exist), then all rows are bumped by a single UPDATE, so the cost does not
+    grow with the number of users.
+    """
+    user_ids = {_user_id(user) for user in users}
+    if not amount or not user_ids:
+        return
+    UnreadCounter = _counter_model()
+    with transaction.atomic():
+        UnreadCounter.objects.bulk_create(
+            [UnreadCounter(user_id=user_id) for user_id in user_ids],
+            ignore_conflicts=True, batch_size=500)
+        UnreadCounter.objects.filter(pk__in=user_ids).update(**{field: F(field) + amount})
+    for user_id in user_ids:
+        pubsub.publish_on_commit(pubsub.user_channel(user_id), COUNTS_CHANGED)
+
+
+def reset(user, field):
+    _update(user, **{field: 0})
+
+
+def mark_seen(user, field):
+    """Zero ``field`` and move its watermark to now (one row upsert)."""
+    _update(user, **{field: 0, SEEN_AT[field]: timezone.now()})
+
+
+def seen_at(user, field):
+    """``user``'s watermark for ``field``, or None if never seen."""
+    return (_counter_model().objects.filter(pk=_user_id(user))
+            .values_list(SEEN_AT[field], flat=True).first())
+
+
+def get_counts(user):
+    """Return a dict of all unread counts for ``user`` (one PK lookup)."""
+    row = _counter_model().objects.filter(pk=_user_id(user)).values(*FIELDS).first()
+    return row or dict(EMPTY_COUNTS)
+
+
+def user_counts(user):
+    """``get_counts`` plus unread broadcasts, which are not counted per user."""
+    counts = get_counts(user)
+    counts[NOTIFICATIONS] += broadcasts.unread_count(user)
+    return counts
+
+
+def request_counts(request):
+    """Unread counts for ``request.user``, memoized on the request.
+
+    Context processors share this so the user is resolved and the counter
+    row fetched at most once per request, and only if a template actually
+    uses one of the values. The notifications count includes unread
+    broadcasts.
+    """
+    cached = getattr(request, '_unread_counts', None)
+    if cached is None:
+        cached = dict(EMPTY_COUNTS)
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            try:
+                cached = user_counts(user)
+            except DatabaseError:
+                # Avoid crashing templates if DB not ready
+                pass
+        request._unread_counts = cached
+    return cached
+
+
+def mark_request_seen(request, field):
+    """``mark_seen`` for ``request.user``, skipped when nothing is unread.
+
+    The check reuses the per-request counts the badges need anyway, so a
+    page view with nothing new writes nothing.
+    """
+    counts = request_counts(request)
+    if counts[field]:
+        mark_seen(request.user, field)
+        counts[field] = 0
+
+
+def lazy_count(request, field, condition=None):
+    """A value that looks up ``field`` only when a template renders it.
+
+    ``condition`` is an optional callable taking the user; when it returns
+    False the value is 0 without touching the counter row.
+    """
+    def resolve():
+        if condition is not None:
+            user = getattr(request, 'user', None)
+            if user is None or not user.is_authenticated or not condition(user):
+                return 0
+        return request_counts(request)[field]
+    return SimpleLazyObject(resolve)
+
+
+def compute_counts(user_ids=None, apps=global_apps):
+    """Recompute unread counts from the source tables.
+
+    Returns ``{user_id: {field: count}}`` for users with at least one
+    unread item, optionally restricted to ``user_ids``.
+    """
+    Notification = apps.get_model('notifications', 'Notification')
+    Application = apps.get_model('jobs', 'Application')
+    Message = apps.get_model('messaging', 'Message')
+
+    counts = {}
+
+    def add(user_id, field, value):
+        if user_ids is not None and user_id not in user_ids:
+            return
+        counts.setdefault(user_id, dict(EMPTY_COUNTS))[field] += value
+
+    rows = (Notification.objects.filter(is_read=False)
+            .values('recipient').annotate(n=Count('pk')))
+    for row in rows:
+        add(row['recipient'], NOTIFICATIONS, row['n'])
+
+    # Anything newer than the user's watermark (or everything, without
+    # one) is unread.
+    seen = 'job__company__unread_counter__company_applications_seen_at'
+    rows = (Application.objects
+            .filter(Q(**{f'{seen}__isnull': True}) | Q(date_applied__gt=F(seen)))
+            .values('job__company').annotate(n=Count('pk')))
+    for row in rows:
+        add(row['job__company'], COMPANY_APPLICATIONS, row['n'])
+
+    seen = 'applicant__unread_counter__applicant_updates_seen_at'
+    rows = (Application.objects.filter(status_changed_at__isnull=False)
+            .filter(Q(**{f'{seen}__isnull': True}) | Q(status_changed_at__gt=F(seen)))
+            .values('applicant').annotate(n=Count('pk')))
+    for row in rows:
+        add(row['applicant'], APPLICANT_UPDATES, row['n'])
+
+    # A message is unread for whichever participant did not send it, if
+    # sent after that participant last read the conversation.
+    for reader, sender in (('participant_1', 'participant_2'),
+                           ('participant_2', 'participant_1')):
+        read_at = f'conversation__{reader}_read_at'
+        rows = (Message.objects
+                .filter(sender=F(f'conversation__{sender}'))
+                .filter(Q(**{f'{read_at}__isnull': True}) | Q(timestamp__gt=F(read_at)))
+                .values(f'conversation__{reader}').annotate(n=Count('pk')))
+        for row in rows:
+            add(row[f'conversation__{reader}'], MESSAGES, row['n'])
+
+    return counts
+
+
+def reconcile(user_ids=None, apps=global_apps):
+    """Bring stored counters in line with the source tables.
+
+    Returns the number of counter rows created or corrected.
+    """
+    UnreadCounter = _counter_model(apps)
+    if user_ids is not None:
+        user_ids = set(user_ids)
+    expected = compute_counts(user_ids, apps=apps)
+
+    stored = UnreadCounter.objects.all()
+    if user_ids is not None:
+        stored = stored.filter(pk__in=user_ids)
+
+    changed = []
+    seen = set()
+    for counter in stored:
+        seen.add(counter.pk)
+        want = expected.get(counter.pk, EMPTY_COUNTS)
+        if any(getattr(counter, f) != want[f] for f in FIELDS):
+            for f in FIELDS:
+                setattr(counter, f, want[f])
+            changed.append(counter)
+
+    missing = [UnreadCounter(user_id=user_id, **values)
+               for user_id, values in expected.items() if user_id not in seen]
+
+    with transaction.atomic():
+        if changed:
+            UnreadCounter.objects.bulk_update(changed, FIELDS, batch_size=500)
+        if missing:
+            UnreadCounter.objects.bulk_create(missing, batch_size=500)
+    return len(changed) + len(missing)
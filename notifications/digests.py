@@ -0,0 +1,83 @@
+"""
+Periodic email digests of unread notifications.
+
+Users opt in with a ``DigestSubscription``. ``send_digests`` (run by
+``manage.py send_notification_digests``, e.g. daily from cron) queues one
+email per subscriber listing unread notifications with events since their
+watermark, then moves every processed watermark forward in the same
+transaction. Emails go through the outbox, so a digest is queued exactly
+once per window even if the command is interrupted and re-run.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import DigestSubscription, Notification
+from .outbox import enqueue_email
+
+# Notifications listed in one digest email; the rest are summarized.
+MAX_ITEMS = 20
+
+
+def set_subscribed(user, enabled):
+    """Opt ``user`` in or out of digests, starting from now."""
+    DigestSubscription.objects.update_or_create(
+        user=user, defaults={'enabled': enabled, 'last_sent_at': timezone.now()})
+
+
+def is_subscribed(user):
+    return DigestSubscription.objects.filter(user=user, enabled=True).exists()
+
+
+def render_digest(notifications):
+    """Subject and body of a digest for ``notifications`` (newest first)."""
+    count = len(notifications)
+    subject = f"You have {count} unread notification{'s' if count != 1 else ''}"
+    lines = [f"- {n.title}: {n.message}" for n in notifications[:MAX_ITEMS]]
+    if count > MAX_ITEMS:
+        lines.append(f"...and {count - MAX_ITEMS} more.")
+    body = "Here is what you missed on the Campus Job Board:\n\n" + "\n".join(lines)
+    return subject, body
+
+
+def _send_batch(subscriptions, now):
+    watermarks = {sub.pk: sub.last_sent_at for sub in subscriptions}
+    pending = (Notification.objects
+               .filter(recipient__in=watermarks, is_read=False,
+                       updated_at__gt=min(watermarks.values()), updated_at__lte=now)
+               .only('recipient_id', 'title', 'message', 'updated_at')
+               .order_by('recipient_id', '-updated_at'))
+    grouped = {}
+    for notification in pending:
+        if notification.updated_at > watermarks[notification.recipient_id]:
+            grouped.setdefault(notification.recipient_id, []).append(notification)
+
+    queued = 0
+    with transaction.atomic():
+        for sub in subscriptions:
+            notifications = grouped.get(sub.pk)
+            if notifications:
+                subject, body = render_digest(notifications)
+                if enqueue_email(subject, body, [sub.user.email]):
+                    queued += 1
+        DigestSubscription.objects.filter(pk__in=watermarks).update(last_sent_at=now)
+    return queued
+
+
+def send_digests(batch_size=200, now=None):
+    """Queue a digest for every subscriber with new unread notifications.
+
+    Subscribers are processed ``batch_size`` at a time, with one
+    notification query per batch. Returns the number of emails queued.
+    """
+    now = now or timezone.now()
+    subscriptions = (DigestSubscription.objects.filter(enabled=True, last_sent_at__lt=now)
+                     .select_related('user').order_by('pk'))
+    queued = 0
+    last_pk = None
+    while True:
+        batch = subscriptions if last_pk is None else subscriptions.filter(pk__gt=last_pk)
+        batch = list(batch[:batch_size])
+        if not batch:
+            return queued
+        queued += _send_batch(batch, now)
+        last_pk = batch[-1].pk
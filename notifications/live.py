@@ -0,0 +1,178 @@
+"""
+Live notification and unread-badge updates over Server-Sent Events.
+
+``create_notification``, broadcasts and every unread-counter change publish
+small events through ``notifications.pubsub`` once their transaction
+commits. Each browser tab holds one ``text/event-stream`` connection
+(``notification_stream``) subscribed to the user's channel and their
+broadcast audiences, and gets:
+
+* ``notification`` - a new (or coalesced) notification or broadcast;
+* ``counts`` - the user's current unread counts, sent on connect and after
+  any burst of events, read with one primary-key lookup;
+* a ``: ping`` comment every ``SSE_HEARTBEAT_SECONDS`` so proxies keep the
+  idle connection open.
+
+An idle connection is one queue and one timer on the event loop, so a
+worker can hold thousands of them. ``SSE_MAX_CONNECTIONS`` and
+``SSE_MAX_CONNECTIONS_PER_USER`` cap how many a process accepts.
+Streaming needs an ASGI server; under WSGI the endpoint answers 204 so
+browsers stop retrying and pages fall back to showing counts on load.
+"""
+import asyncio
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import broadcasts, counters, pubsub
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _notification_payload(notification, broadcast=False):
+    return {
+        'event': 'notification',
+        'id': notification.pk,
+        'broadcast': broadcast,
+        'type': notification.notification_type,
+        'title': notification.title,
+        'message': notification.message,
+        'created_at': notification.created_at.isoformat(),
+    }
+
+
+def notification_created(notification):
+    """Push a new or coalesced personal notification to its recipient."""
+    pubsub.publish_on_commit(pubsub.user_channel(notification.recipient_id),
+                             _notification_payload(notification))
+
+
+def broadcast_sent(broadcast):
+    """Push a broadcast to everyone connected in its audience."""
+    pubsub.publish_on_commit(pubsub.audience_channel(broadcast.audience, broadcast.institution),
+                             _notification_payload(broadcast, broadcast=True))
+
+
+def channels_for(user):
+    return [pubsub.user_channel(user.pk)] + [
+        pubsub.audience_channel(audience, institution)
+        for audience, institution in broadcasts.audiences(user)
+    ]
+
+
+class ConnectionLimiter:
+    """Counts open streams per process and per user."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._per_user = {}
+        self.total = 0
+
+    def acquire(self, user_id):
+        with self._lock:
+            if self.total >= _setting('SSE_MAX_CONNECTIONS', 5000):
+                return False
+            if self._per_user.get(user_id, 0) >= _setting('SSE_MAX_CONNECTIONS_PER_USER', 5):
+                return False
+            self._per_user[user_id] = self._per_user.get(user_id, 0) + 1
+            self.total += 1
+            return True
+
+    def release(self, user_id):
+        with self._lock:
+            remaining = self._per_user.get(user_id, 0) - 1
+            if remaining > 0:
+                self._per_user[user_id] = remaining
+            else:
+                self._per_user.pop(user_id, None)
+            self.total = max(self.total - 1, 0)
+
+    def count(self, user_id=None):
+        with self._lock:
+            return self.total if user_id is None else self._per_user.get(user_id, 0)
+
+
+limiter = ConnectionLimiter()
+
+
+def format_event(name, data):
+    """One SSE event named ``name`` carrying ``data`` as JSON."""
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class EventStream:
+    """The body of one SSE response.
+
+    ``close`` (called by the server when the client goes away) releases
+    the subscription and the connection slot; it is safe to call twice.
+    """
+
+    def __init__(self, user, subscription):
+        self.user = user
+        self.subscription = subscription
+        self._closed = False
+
+    def __aiter__(self):
+        return self._events()
+
+    async def _counts(self):
+        return await sync_to_async(counters.user_counts)(self.user)
+
+    async def _events(self):
+        heartbeat = _setting('SSE_HEARTBEAT_SECONDS', 20)
+        try:
+            yield f"retry: {_setting('SSE_RETRY_MILLISECONDS', 5000)}\n\n"
+            yield format_event('counts', await self._counts())
+            while True:
+                try:
+                    message = await self.subscription.get(timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ': ping\n\n'
+                    continue
+                # Relay the whole burst, then refresh the badges once.
+                for message in [message] + self.subscription.drain():
+                    if message.get('event') != 'counts':
+                        yield format_event(message['event'], message)
+                if self.subscription.overflowed:
+                    self.subscription.overflowed = False
+                    yield format_event('resync', {})
+                yield format_event('counts', await self._counts())
+        finally:
+            self.close()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.subscription.close()
+            limiter.release(self.user.pk)
+
+
+def subscribe(user, channels):
+    """A subscription to ``channels`` holding one of ``user``'s connection
+    slots, or None when over a connection limit.
+
+    Must be called on the event loop that will consume it; the stream
+    built on it releases the slot on close.
+    """
+    if not limiter.acquire(user.pk):
+        return None
+    try:
+        return pubsub.get_backend().subscribe(channels, maxsize=_setting('SSE_QUEUE_SIZE', 100))
+    except Exception:
+        limiter.release(user.pk)
+        raise
+
+
+def open_stream(user):
+    """An ``EventStream`` for ``user``, or None when over a connection limit.
+
+    Must be called on the event loop that will consume the stream.
+    """
+    subscription = subscribe(user, channels_for(user))
+    if subscription is None:
+        return None
+    return EventStream(user, subscription)
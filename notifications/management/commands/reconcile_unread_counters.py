@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from notifications import counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-user unread counters from notifications, applications and messages."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='Only reconcile this user id (may be repeated).')
+
+    def handle(self, *args, **options):
+        fixed = counters.reconcile(user_ids=options['user_ids'])
+        if fixed:
+            self.stdout.write(self.style.WARNING(f"Corrected {fixed} unread counter(s)."))
+        else:
+            self.stdout.write(self.style.SUCCESS("All unread counters are in sync."))
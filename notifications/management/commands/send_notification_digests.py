@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from notifications.digests import send_digests
+
+
+class Command(BaseCommand):
+    help = ("Queue an email digest of new unread notifications for every user "
+            "who opted in. Run periodically (e.g. daily from cron).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Subscribers processed per batch (default: %(default)s)')
+
+    def handle(self, *args, **options):
+        queued = send_digests(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Queued {queued} digest email(s)."))
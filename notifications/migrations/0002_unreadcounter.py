@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counters(apps, schema_editor):
+    """Count every user's unread items from the per-row read flags."""
+    UnreadCounter = apps.get_model('notifications', 'UnreadCounter')
+    Notification = apps.get_model('notifications', 'Notification')
+    Application = apps.get_model('jobs', 'Application')
+    Message = apps.get_model('messaging', 'Message')
+
+    counts = {}
+
+    def add(user_id, field, value):
+        values = counts.setdefault(user_id, {})
+        values[field] = values.get(field, 0) + value
+
+    for row in (Notification.objects.filter(is_read=False)
+                .values('recipient').annotate(n=Count('pk'))):
+        add(row['recipient'], 'notifications', row['n'])
+    for row in (Application.objects.filter(company_unread=True)
+                .values('job__company').annotate(n=Count('pk'))):
+        add(row['job__company'], 'company_applications', row['n'])
+    for row in (Application.objects.filter(applicant_unread=True)
+                .values('applicant').annotate(n=Count('pk'))):
+        add(row['applicant'], 'applicant_updates', row['n'])
+    # A message is unread for whichever participant did not send it.
+    for row in (Message.objects.filter(is_read=False)
+                .values('sender', 'conversation__participant_1', 'conversation__participant_2')
+                .annotate(n=Count('pk'))):
+        p1 = row['conversation__participant_1']
+        p2 = row['conversation__participant_2']
+        add(p2 if row['sender'] == p1 else p1, 'messages', row['n'])
+
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=user_id, **values) for user_id, values in counts.items()],
+        batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+        ('users', '0008_sentemail'),
+        ('jobs', '0010_jobpost_summary'),
+        ('messaging', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('notifications', models.PositiveIntegerField(default=0, help_text='Unread notifications')),
+                ('company_applications', models.PositiveIntegerField(default=0, help_text="Unread applications to this company's jobs")),
+                ('applicant_updates', models.PositiveIntegerField(default=0, help_text="Unread status updates on this user's applications")),
+                ('messages', models.PositiveIntegerField(default=0, help_text='Unread chat messages')),
+            ],
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
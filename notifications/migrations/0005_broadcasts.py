@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_salary_normalization'),
+        ('notifications', '0004_outbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BroadcastNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('audience', models.CharField(choices=[('AD', 'All admins'), ('ST', 'All students'), ('CO', 'All companies'), ('IN', 'One institution')], help_text='Who receives this notification', max_length=2)),
+                ('institution', models.CharField(blank=True, help_text='Institution name, for institution broadcasts', max_length=255)),
+                ('notification_type', models.CharField(choices=[('AS', 'Application Submitted'), ('AC', 'Application Status Changed'), ('JP', 'Job Posted'), ('JA', 'Job Approved'), ('JR', 'Job Rejected'), ('IV', 'ID Verified'), ('IR', 'ID Rejected'), ('EV', 'Email Verified')], help_text='Type of notification', max_length=2)),
+                ('title', models.CharField(help_text='Short title for the notification', max_length=200)),
+                ('message', models.TextField(help_text='Detailed notification message')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When this notification was sent')),
+                ('related_job', models.ForeignKey(blank=True, help_text='Related job post if applicable', null=True, on_delete=django.db.models.deletion.SET_NULL, to='jobs.jobpost')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BroadcastReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('read_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('dismissed', models.BooleanField(default=False, help_text="Hidden from the user's notification list")),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='notifications.broadcastnotification')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcast_receipts', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='broadcastnotification',
+            index=models.Index(fields=['audience', 'institution', '-created_at', '-id'], name='broadcast_audience_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='broadcastreceipt',
+            constraint=models.UniqueConstraint(fields=('user', 'broadcast'), name='broadcast_receipt_unique'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:04
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_updated_at(apps, schema_editor):
+    Notification = apps.get_model('notifications', 'Notification')
+    Notification.objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_broadcasts'),
+        ('users', '0009_outboundsms'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DigestSubscription',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='digest_subscription', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('enabled', models.BooleanField(default=True)),
+                ('last_sent_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Events up to this time have been included in a digest')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='event_count',
+            field=models.PositiveIntegerField(default=1, help_text='Number of events coalesced into this notification'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='thread_key',
+            field=models.CharField(blank=True, help_text='Events with the same type and thread are coalesced into one row', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='When the latest event was added'),
+        ),
+        migrations.AlterField(
+            model_name='broadcastnotification',
+            name='notification_type',
+            field=models.CharField(choices=[('AS', 'Application Submitted'), ('AC', 'Application Status Changed'), ('JP', 'Job Posted'), ('JA', 'Job Approved'), ('JR', 'Job Rejected'), ('IV', 'ID Verified'), ('IR', 'ID Rejected'), ('EV', 'Email Verified'), ('NM', 'New Message')], help_text='Type of notification', max_length=2),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('AS', 'Application Submitted'), ('AC', 'Application Status Changed'), ('JP', 'Job Posted'), ('JA', 'Job Approved'), ('JR', 'Job Rejected'), ('IV', 'ID Verified'), ('IR', 'ID Rejected'), ('EV', 'Email Verified'), ('NM', 'New Message')], help_text='Type of notification', max_length=2),
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0006_coalescing_and_digests'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unreadcounter',
+            name='applicant_updates_seen_at',
+            field=models.DateTimeField(blank=True, help_text='Status updates up to this time have been seen', null=True),
+        ),
+        migrations.AddField(
+            model_name='unreadcounter',
+            name='company_applications_seen_at',
+            field=models.DateTimeField(blank=True, help_text='Applications received up to this time have been seen', null=True),
+        ),
+    ]
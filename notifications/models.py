@@ -15,6 +15,7 @@ class Notification(models.Model):
     ID_VERIFIED = 'IV'  # When admin verifies ID
     ID_REJECTED = 'IR'  # When admin rejects ID
     EMAIL_VERIFIED = 'EV'  # When user verifies email
+    NEW_MESSAGE = 'NM'  # When a chat message arrives
 
     NOTIFICATION_TYPE_CHOICES = [
         (APPLICATION_SUBMITTED, 'Application Submitted'),
@@ -25,6 +26,7 @@ class Notification(models.Model):
         (ID_VERIFIED, 'ID Verified'),
         (ID_REJECTED, 'ID Rejected'),
         (EMAIL_VERIFIED, 'Email Verified'),
+        (NEW_MESSAGE, 'New Message'),
     ]
 
     recipient = models.ForeignKey(
@@ -67,14 +69,263 @@ class Notification(models.Model):
         default=timezone.now,
         help_text='When this notification was created'
     )
+    thread_key = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text='Events with the same type and thread are coalesced into one row'
+    )
+    event_count = models.PositiveIntegerField(
+        default=1,
+        help_text='Number of events coalesced into this notification'
+    )
+    updated_at = models.DateTimeField(
+        default=timezone.now,
+        help_text='When the latest event was added'
+    )
 
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['-created_at']),
-            models.Index(fields=['recipient']),
-            models.Index(fields=['is_read']),
+            # Notification list: recipient=... ORDER BY -updated_at, -id
+            models.Index(fields=['recipient', '-updated_at', '-id'],
+                         name='notification_inbox_idx'),
+            # Unread lookups: recipient=... AND NOT is_read ORDER BY -created_at
+            models.Index(fields=['recipient', '-created_at'],
+                         condition=models.Q(is_read=False),
+                         name='notification_unread_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_notification_type_display()} - {self.recipient.username}"
+
+class BroadcastNotification(models.Model):
+    """
+    A notification addressed to a whole audience rather than one user.
+
+    Stored once however many people it reaches; see
+    ``notifications.broadcasts`` for how it is listed, counted and read.
+    Users only see broadcasts sent after they joined.
+    """
+    ADMINS = 'AD'
+    STUDENTS = 'ST'
+    COMPANIES = 'CO'
+    INSTITUTION = 'IN'
+
+    AUDIENCE_CHOICES = [
+        (ADMINS, 'All admins'),
+        (STUDENTS, 'All students'),
+        (COMPANIES, 'All companies'),
+        (INSTITUTION, 'One institution'),
+    ]
+
+    is_broadcast = True
+
+    audience = models.CharField(
+        max_length=2,
+        choices=AUDIENCE_CHOICES,
+        help_text='Who receives this notification'
+    )
+    institution = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text='Institution name, for institution broadcasts'
+    )
+    notification_type = models.CharField(
+        max_length=2,
+        choices=Notification.NOTIFICATION_TYPE_CHOICES,
+        help_text='Type of notification'
+    )
+    title = models.CharField(
+        max_length=200,
+        help_text='Short title for the notification'
+    )
+    message = models.TextField(
+        help_text='Detailed notification message'
+    )
+    related_job = models.ForeignKey(
+        'jobs.JobPost',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        help_text='Related job post if applicable'
+    )
+    created_at = models.DateTimeField(
+        default=timezone.now,
+        help_text='When this notification was sent'
+    )
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # audience=... [AND institution=...] ORDER BY -created_at, -id
+            models.Index(fields=['audience', 'institution', '-created_at', '-id'],
+                         name='broadcast_audience_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_notification_type_display()} - {self.get_audience_display()}"
+
+
+class BroadcastReceipt(models.Model):
+    """
+    One user's read state for a broadcast.
+
+    Only written when the user reads or dismisses the broadcast; no row
+    means unread.
+    """
+    broadcast = models.ForeignKey(
+        BroadcastNotification,
+        on_delete=models.CASCADE,
+        related_name='receipts'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='broadcast_receipts'
+    )
+    read_at = models.DateTimeField(default=timezone.now)
+    dismissed = models.BooleanField(
+        default=False,
+        help_text='Hidden from the user\'s notification list'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'broadcast'],
+                                    name='broadcast_receipt_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} read {self.broadcast_id}"
+
+
+class DigestSubscription(models.Model):
+    """
+    A user's opt-in to a periodic email digest of unread notifications.
+
+    ``last_sent_at`` is the watermark: each digest covers notifications
+    with events after it, so nothing is reported twice.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='digest_subscription'
+    )
+    enabled = models.BooleanField(default=True)
+    last_sent_at = models.DateTimeField(
+        default=timezone.now,
+        help_text='Events up to this time have been included in a digest'
+    )
+
+    def __str__(self):
+        return f"Digest for {self.user_id}"
+
+
+class UnreadCounter(models.Model):
+    """
+    Denormalized per-user unread counts shown in the navbar badges.
+
+    Maintained incrementally by ``notifications.counters`` whenever a
+    notification, application or chat message changes read state, so
+    rendering a page needs a single primary-key lookup instead of COUNT
+    queries. ``manage.py reconcile_unread_counters`` repairs any drift.
+
+    The ``*_seen_at`` watermarks hold application read state: applications
+    (or status changes) newer than the watermark are unread, so marking
+    them all read is one update of this row.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='unread_counter'
+    )
+    notifications = models.PositiveIntegerField(
+        default=0,
+        help_text='Unread notifications'
+    )
+    company_applications = models.PositiveIntegerField(
+        default=0,
+        help_text='Unread applications to this company\'s jobs'
+    )
+    applicant_updates = models.PositiveIntegerField(
+        default=0,
+        help_text='Unread status updates on this user\'s applications'
+    )
+    messages = models.PositiveIntegerField(
+        default=0,
+        help_text='Unread chat messages'
+    )
+    company_applications_seen_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='Applications received up to this time have been seen'
+    )
+    applicant_updates_seen_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='Status updates up to this time have been seen'
+    )
+
+    def __str__(self):
+        return f"Unread counts for {self.user_id}"
+
+
+class Outbox(models.Model):
+    """
+    An email waiting to be sent.
+
+    Views enqueue rows with ``notifications.outbox.enqueue_email`` inside
+    the same transaction as the change they report, so an email exists if
+    and only if that change committed. ``manage.py send_outbox`` delivers
+    them in batches over one SMTP connection, retrying failures with
+    exponential backoff until the row is dead-lettered.
+    """
+    PENDING = 'P'
+    SENT = 'S'
+    DEAD = 'D'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (DEAD, 'Dead-lettered'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(help_text='List of recipient addresses')
+    status = models.CharField(
+        max_length=1,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        help_text='Earliest time the worker may (re)try this email'
+    )
+    claimed_by = models.CharField(
+        max_length=32,
+        blank=True,
+        help_text='Worker batch currently sending this email'
+    )
+    claimed_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'outbox'
+        ordering = ['-created_at']
+        indexes = [
+            # Worker: status=pending AND next_attempt_at <= now ORDER BY next_attempt_at
+            models.Index(fields=['next_attempt_at'],
+                         condition=models.Q(status='P'),
+                         name='outbox_due_idx'),
         ]
 
     def __str__(self):
-        return f"{self.get_notification_type_display()} - {self.recipient.username}"
\ No newline at end of file
+        return f"{self.subject} -> {', '.join(self.to)}"
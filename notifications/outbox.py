@@ -0,0 +1,132 @@
+"""
+Transactional email outbox.
+
+``enqueue_email`` only inserts an ``Outbox`` row, so request handlers
+never wait on SMTP and an email is only sent if the surrounding
+transaction commits. ``deliver_due`` (run by ``manage.py send_outbox``)
+claims due rows in batches, sends them over a single backend connection,
+and reschedules failures with exponential backoff. After
+``OUTBOX_MAX_ATTEMPTS`` failures a row is dead-lettered and left for an
+admin to inspect.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Outbox
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue_email(subject, message, recipient_list, from_email=None):
+    """Queue an email for the outbox worker; returns the row or None.
+
+    Blank addresses are dropped, and nothing is queued if none remain.
+    """
+    recipients = [address for address in recipient_list if address]
+    if not recipients:
+        return None
+    return Outbox.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=recipients,
+    )
+
+
+def retry_delay(attempts):
+    """Backoff after the ``attempts``-th failure: base * 2**(n-1), capped."""
+    base = _setting('OUTBOX_RETRY_BASE_SECONDS', 60)
+    cap = _setting('OUTBOX_RETRY_MAX_SECONDS', 60 * 60)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), cap))
+
+
+def claim_batch(batch_size, now=None, model=Outbox):
+    """Claim up to ``batch_size`` due rows of ``model`` for this worker.
+
+    Rows are claimed with a conditional UPDATE, so concurrent workers never
+    send the same message; a claim expires after ``OUTBOX_CLAIM_SECONDS`` in
+    case its worker died mid-batch. ``model`` is any queue model with the
+    same status/attempt/claim fields as ``Outbox``.
+    """
+    now = now or timezone.now()
+    token = uuid.uuid4().hex
+    lease = timedelta(seconds=_setting('OUTBOX_CLAIM_SECONDS', 300))
+    due = (model.objects.filter(status=model.PENDING, next_attempt_at__lte=now)
+           .exclude(claimed_until__gt=now))
+    ids = list(due.order_by('next_attempt_at', 'id').values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+    due.filter(pk__in=ids).update(claimed_by=token, claimed_until=now + lease)
+    return list(model.objects.filter(claimed_by=token).order_by('next_attempt_at', 'id'))
+
+
+def record_results(model, sent, failed, max_attempts):
+    """Mark ``sent`` rows done and reschedule or dead-letter ``failed`` ones.
+
+    Failed rows must carry their error in ``last_error``.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        if sent:
+            model.objects.filter(pk__in=[row.pk for row in sent]).update(
+                status=model.SENT, sent_at=now, attempts=F('attempts') + 1,
+                claimed_by='', claimed_until=None, last_error='')
+        for row in failed:
+            row.attempts += 1
+            row.claimed_by = ''
+            row.claimed_until = None
+            if row.attempts >= max_attempts:
+                row.status = model.DEAD
+            else:
+                row.next_attempt_at = now + retry_delay(row.attempts)
+        if failed:
+            model.objects.bulk_update(
+                failed, ['attempts', 'status', 'next_attempt_at', 'last_error',
+                         'claimed_by', 'claimed_until'])
+
+
+def deliver_due(batch_size=100, connection=None):
+    """Send one batch of due emails. Returns ``(sent, failed)``."""
+    rows = claim_batch(batch_size)
+    if not rows:
+        return 0, 0
+
+    max_attempts = _setting('OUTBOX_MAX_ATTEMPTS', 5)
+    connection = connection or get_connection()
+    sent, failed = [], []
+    try:
+        connection.open()
+    except Exception as exc:
+        # Nothing can be sent; every claimed row takes a failed attempt
+        error = f"{exc.__class__.__name__}: {exc}"
+        for row in rows:
+            row.last_error = error
+        record_results(Outbox, [], rows, max_attempts)
+        return 0, len(rows)
+    try:
+        for row in rows:
+            message = EmailMessage(row.subject, row.body, row.from_email, row.to,
+                                   connection=connection)
+            try:
+                connection.send_messages([message])
+            except Exception as exc:
+                row.last_error = f"{exc.__class__.__name__}: {exc}"
+                failed.append(row)
+            else:
+                sent.append(row)
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    record_results(Outbox, sent, failed, max_attempts)
+    return len(sent), len(failed)
@@ -0,0 +1,180 @@
+"""
+Publish/subscribe for pushing live events to connected browsers.
+
+Views publish small JSON-able dicts to named channels (``user:<id>`` for
+one user, ``audience:<code>`` for broadcast audiences); long-lived async
+responses subscribe to the channels they care about and relay what
+arrives. Publishing is fire-and-forget: nobody listening costs nothing,
+and a slow subscriber drops messages rather than blocking publishers.
+
+The backend is selected with the ``PUBSUB_BACKEND`` setting (a dotted
+path) and instantiated once per process:
+
+* ``notifications.pubsub.InProcessBackend`` - delivers to subscribers in
+  this process only (the default; enough for a single ASGI worker).
+* ``notifications.pubsub.LocmemBackend`` - records published messages in
+  ``notifications.pubsub.published`` for tests.
+
+With several workers, subclass ``InProcessBackend`` so ``publish`` sends
+to a shared bus (e.g. Redis PUBLISH) and a listener in each worker hands
+what it receives to ``deliver_local``.
+
+Use ``publish_on_commit`` from request handlers, so subscribers never
+hear about changes that are rolled back.
+"""
+import asyncio
+import logging
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Messages "published" through LocmemBackend.
+published = []
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def audience_channel(audience, institution=''):
+    return f'audience:{audience}:{institution}' if institution else f'audience:{audience}'
+
+
+class Subscription:
+    """A subscriber's queue of messages from a set of channels.
+
+    Must be created and read on the event loop that consumes it;
+    publishers may run on any thread.
+    """
+
+    def __init__(self, backend, channels, maxsize):
+        self.backend = backend
+        self.channels = tuple(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        # Set when messages had to be dropped because the queue was full
+        self.overflowed = False
+        self.closed = False
+
+    def _put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout=None):
+        """Next message; raises ``asyncio.TimeoutError`` after ``timeout``."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def drain(self):
+        """Messages already waiting, without blocking."""
+        messages = []
+        while not self.queue.empty():
+            messages.append(self.queue.get_nowait())
+        return messages
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.backend.unsubscribe(self)
+
+
+class BaseBackend:
+
+    def publish(self, channel, message):
+        raise NotImplementedError
+
+    def subscribe(self, channels, maxsize=100):
+        """Return a ``Subscription`` to ``channels``; call from a running loop."""
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        pass
+
+
+class InProcessBackend(BaseBackend):
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels, maxsize=100):
+        subscription = Subscription(self, channels, maxsize)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def subscriber_count(self, channel=None):
+        with self._lock:
+            if channel is not None:
+                return len(self._subscribers.get(channel, ()))
+            return len({s for subs in self._subscribers.values() for s in subs})
+
+    def deliver_local(self, channel, message):
+        """Hand ``message`` to this process's subscribers of ``channel``."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, message)
+            except RuntimeError:
+                # Its event loop has shut down
+                subscription.close()
+
+    def publish(self, channel, message):
+        self.deliver_local(channel, message)
+
+
+class LocmemBackend(InProcessBackend):
+
+    def publish(self, channel, message):
+        published.append((channel, message))
+        super().publish(channel, message)
+
+
+_backend = None
+
+
+def get_backend():
+    """The process-wide pub/sub backend instance."""
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'PUBSUB_BACKEND', '') or 'notifications.pubsub.InProcessBackend'
+        _backend = import_string(path)()
+    return _backend
+
+
+@receiver(setting_changed)
+def _reset_backend(setting, **kwargs):
+    global _backend
+    if setting == 'PUBSUB_BACKEND':
+        _backend = None
+
+
+def publish(channel, message):
+    """Publish now; failures are logged, never raised to the caller."""
+    try:
+        get_backend().publish(channel, message)
+    except Exception:
+        logger.exception("Could not publish to %s", channel)
+
+
+def publish_on_commit(channel, message):
+    """Publish once the current transaction commits (immediately if none)."""
+    transaction.on_commit(lambda: publish(channel, message))
@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import broadcasts, live
+from .models import BroadcastNotification
+
+
+@receiver(post_save, sender=BroadcastNotification)
+@receiver(post_delete, sender=BroadcastNotification)
+def invalidate_broadcast_counts(sender, instance, raw=False, **kwargs):
+    """New or removed broadcasts change every audience member's unread count.
+
+    Bumped again on commit so a count cached from a concurrent read of the
+    pre-commit state does not survive.
+    """
+    if raw:
+        return
+    broadcasts.bump_version()
+    transaction.on_commit(broadcasts.bump_version)
+    if kwargs.get('created'):
+        live.broadcast_sent(instance)
@@ -0,0 +1,531 @@
+import smtplib
+from datetime import timedelta
+from io import StringIO
+
+from asgiref.sync import sync_to_async
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.core.signals import request_finished
+from django.db import close_old_connections, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Application, JobPost
+from messaging.models import Conversation
+from users.models import CustomUser
+from . import broadcasts, counters, digests, live, pubsub
+from .models import (BroadcastNotification, BroadcastReceipt, Notification, Outbox,
+                     UnreadCounter)
+from .outbox import claim_batch, deliver_due, enqueue_email
+from .utils import create_notification, create_notifications_bulk
+
+
+class UnreadCounterTests(TestCase):
+
+    def setUp(self):
+        self.company = CustomUser.objects.create_user(
+            'acme', password='pw', is_company=True,
+            verification_status=CustomUser.VERIFIED)
+        self.student = CustomUser.objects.create_user(
+            'student', password='pw', verification_status=CustomUser.VERIFIED)
+        self.job = JobPost.objects.create(
+            company=self.company, title='Engineer', description='d',
+            requirements='r', location='Accra', is_approved=True,
+            deadline=timezone.now() + timedelta(days=7))
+
+    def notify(self, user):
+        return create_notification(user, Notification.JOB_APPROVED, 'Title', 'Body')
+
+    def test_create_and_mark_read_keep_counter_in_sync(self):
+        first = self.notify(self.student)
+        self.notify(self.student)
+        self.assertEqual(counters.get_counts(self.student)['notifications'], 2)
+
+        self.client.force_login(self.student)
+        self.client.get(reverse('notifications:mark_read', args=[first.pk]))
+        self.client.get(reverse('notifications:mark_read', args=[first.pk]))
+        self.assertEqual(counters.get_counts(self.student)['notifications'], 1)
+
+        self.client.get(reverse('notifications:list'), {'mark_all_read': 1})
+        self.assertEqual(counters.get_counts(self.student)['notifications'], 0)
+
+    def test_application_watermarks_update_counters(self):
+        application = Application.objects.create(job=self.job, applicant=self.student,
+                                                 cover_letter='Hi')
+        counters.increment(self.company, counters.COMPANY_APPLICATIONS)
+        self.client.force_login(self.company)
+        url = reverse('jobs:update_application_status', args=[application.pk, 'A'])
+        self.client.post(url)
+        # A second update before the applicant looks is still one unread item
+        self.client.post(url)
+        self.assertEqual(counters.get_counts(self.student)['applicant_updates'], 1)
+        self.assertEqual(counters.reconcile(), 0)
+
+        self.client.get(reverse('jobs:company_dashboard'))
+        self.assertEqual(counters.get_counts(self.company)['company_applications'], 0)
+        self.assertIsNotNone(counters.seen_at(self.company, counters.COMPANY_APPLICATIONS))
+
+        self.client.force_login(self.student)
+        self.client.get(reverse('jobs:my_applications'))
+        self.assertEqual(counters.get_counts(self.student)['applicant_updates'], 0)
+        self.assertEqual(counters.reconcile(), 0)
+
+    def test_viewing_read_pages_writes_only_when_something_is_unread(self):
+        Application.objects.create(job=self.job, applicant=self.student, cover_letter='Hi')
+        counters.increment(self.company, counters.COMPANY_APPLICATIONS)
+        self.client.force_login(self.company)
+        url = reverse('jobs:company_dashboard')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        writes = [q['sql'] for q in queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(writes), 1)
+        self.assertIn('notifications_unreadcounter', writes[0])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertFalse([q for q in queries if q['sql'].startswith(('UPDATE', 'INSERT'))])
+
+    def test_context_processors_read_counter(self):
+        self.notify(self.student)
+        self.client.force_login(self.student)
+        response = self.client.get(reverse('jobs:job_list'))
+        self.assertEqual(response.context['notification_count'], 1)
+
+    def test_reconcile_repairs_drift(self):
+        self.notify(self.student)
+        Application.objects.create(job=self.job, applicant=self.student, cover_letter='Hi')
+        UnreadCounter.objects.filter(pk=self.student.pk).update(notifications=7)
+
+        call_command('reconcile_unread_counters', stdout=StringIO())
+
+        self.assertEqual(counters.get_counts(self.student)['notifications'], 1)
+        self.assertEqual(counters.get_counts(self.company)['company_applications'], 1)
+        self.assertEqual(counters.reconcile(), 0)
+
+
+    def test_bulk_fan_out_uses_constant_queries(self):
+        admins = [CustomUser.objects.create_superuser(f'admin{i}', password='pw')
+                  for i in range(5)]
+        self.notify(admins[0])
+        # Notification INSERT, counter-row INSERT and counter UPDATE, plus
+        # two savepoints (and their releases) for the nested atomic blocks.
+        with self.assertNumQueries(7):
+            created = create_notifications_bulk(
+                admins + [admins[1]], Notification.JOB_POSTED, 'Title', 'Body',
+                related_job=self.job)
+        self.assertEqual(len(created), 5)
+        self.assertEqual(counters.get_counts(admins[0])['notifications'], 2)
+        for admin in admins[1:]:
+            self.assertEqual(counters.get_counts(admin)['notifications'], 1)
+        self.assertEqual(create_notifications_bulk([], Notification.JOB_POSTED, 'T', 'B'), [])
+
+
+
+class LazyContextProcessorTests(TestCase):
+
+    def counter_queries(self, user):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('jobs:job_list'))
+        return response, [q for q in ctx.captured_queries
+                          if 'notifications_unreadcounter' in q['sql']]
+
+    def test_badges_not_rendered_means_no_lookup(self):
+        # Unverified users get a navbar without notification badges.
+        user = CustomUser.objects.create_user('newbie', password='pw')
+        _, queries = self.counter_queries(user)
+        self.assertEqual(queries, [])
+
+    def test_processors_share_a_single_lookup(self):
+        user = CustomUser.objects.create_user(
+            'student', password='pw', verification_status=CustomUser.VERIFIED)
+        create_notification(user, Notification.JOB_APPROVED, 'Title', 'Body')
+        response, queries = self.counter_queries(user)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.context['notification_count'], 1)
+        self.assertEqual(response.context['applicant_unread_count'], 0)
+        self.assertEqual(response.context['company_unread_count'], 0)
+
+
+class BroadcastTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company = CustomUser.objects.create_user(
+            'acme', password='pw', is_company=True,
+            verification_status=CustomUser.VERIFIED)
+        self.student = CustomUser.objects.create_user(
+            'student', password='pw', institution='Ashesi',
+            verification_status=CustomUser.VERIFIED)
+        self.other = CustomUser.objects.create_user(
+            'other', password='pw', institution='Legon',
+            verification_status=CustomUser.VERIFIED)
+        self.admins = [CustomUser.objects.create_superuser(f'admin{i}', password='pw')
+                       for i in range(3)]
+
+    def send(self, audience, title='News', **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return broadcasts.send(audience, Notification.JOB_APPROVED, title, 'Body', **kwargs)
+
+    def unread(self, user):
+        self.client.force_login(user)
+        return self.client.get(reverse('notifications:list')).context['unread_count']
+
+    def test_one_row_reaches_the_whole_audience(self):
+        self.send(BroadcastNotification.STUDENTS)
+        self.send(BroadcastNotification.INSTITUTION, institution='Ashesi')
+        self.assertEqual(BroadcastNotification.objects.count(), 2)
+        self.assertEqual(BroadcastReceipt.objects.count(), 0)
+        self.assertEqual(self.unread(self.student), 2)
+        self.assertEqual(self.unread(self.other), 1)
+        self.assertEqual(self.unread(self.company), 0)
+
+        late = CustomUser.objects.create_user('late', password='pw')
+        self.assertEqual(self.unread(late), 0)
+
+    def test_new_job_post_is_broadcast_to_admins(self):
+        self.client.force_login(self.company)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('jobs:create_job'), {
+                'title': 'Analyst', 'description': 'd', 'requirements': 'r',
+                'location': 'Accra', 'job_type': 'FT', 'category': 'IT', 'currency': 'USD',
+                'deadline': (timezone.now() + timedelta(days=7)).strftime('%Y-%m-%dT%H:%M'),
+            })
+        self.assertEqual(BroadcastNotification.objects.get().audience,
+                         BroadcastNotification.ADMINS)
+        self.assertFalse(Notification.objects.filter(
+            notification_type=Notification.JOB_POSTED).exists())
+        for admin in self.admins:
+            self.assertEqual(self.unread(admin), 1)
+        self.assertEqual(self.unread(self.student), 0)
+
+    def test_read_dismiss_and_mark_all(self):
+        first = self.send(BroadcastNotification.STUDENTS, 'First')
+        second = self.send(BroadcastNotification.STUDENTS, 'Second')
+        create_notification(self.student, Notification.JOB_APPROVED, 'Personal', 'Body')
+        self.assertEqual(self.unread(self.student), 3)
+
+        self.client.get(reverse('notifications:broadcast_read', args=[first.pk]))
+        self.assertEqual(self.unread(self.student), 2)
+        self.assertEqual(self.unread(self.other), 2)
+
+        self.client.force_login(self.student)
+        self.client.get(reverse('notifications:broadcast_dismiss', args=[first.pk]))
+        response = self.client.get(reverse('notifications:list'))
+        titles = [n.title for n in response.context['notifications']]
+        self.assertEqual(titles, ['Personal', 'Second'])
+
+        self.client.get(reverse('notifications:list'), {'mark_all_read': 1})
+        self.assertEqual(self.unread(self.student), 0)
+        self.assertTrue(BroadcastReceipt.objects.filter(broadcast=second, user=self.student).exists())
+        self.assertEqual(BroadcastReceipt.objects.count(), 2)
+
+        # Other audiences cannot touch it
+        self.client.force_login(self.company)
+        response = self.client.get(reverse('notifications:broadcast_dismiss', args=[second.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_pages_through_merged_stream(self):
+        start = timezone.now()
+        for i in range(7):
+            broadcast = self.send(BroadcastNotification.STUDENTS, f'B{i}')
+            BroadcastNotification.objects.filter(pk=broadcast.pk).update(
+                created_at=start + timedelta(minutes=2 * i))
+            note = create_notification(self.student, Notification.JOB_APPROVED, f'N{i}', 'Body')
+            Notification.objects.filter(pk=note.pk).update(
+                created_at=start + timedelta(minutes=2 * i + 1),
+                updated_at=start + timedelta(minutes=2 * i + 1))
+        expected = [f'{kind}{i}' for i in reversed(range(7)) for kind in 'NB']
+
+        self.client.force_login(self.student)
+        url = reverse('notifications:list')
+        first = self.client.get(url).context['notifications']
+        self.assertEqual([n.title for n in first], expected[:10])
+        second = self.client.get(url, {'cursor': first.next_cursor}).context['notifications']
+        self.assertEqual([n.title for n in second], expected[10:])
+        self.assertFalse(second.has_next())
+        back = self.client.get(url, {'cursor': second.previous_cursor}).context['notifications']
+        self.assertEqual([n.title for n in back], expected[:10])
+        legacy = self.client.get(url, {'page': 2}).context['notifications']
+        self.assertEqual([n.title for n in legacy], expected[10:])
+
+
+class CoalescingTests(TestCase):
+
+    def setUp(self):
+        self.company = CustomUser.objects.create_user(
+            'acme', password='pw', is_company=True, email='hr@acme.test',
+            verification_status=CustomUser.VERIFIED)
+        self.student = CustomUser.objects.create_user(
+            'student', password='pw', email='s@uni.test',
+            verification_status=CustomUser.VERIFIED)
+        self.job = JobPost.objects.create(
+            company=self.company, title='Engineer', description='d',
+            requirements='r', location='Accra', is_approved=True,
+            deadline=timezone.now() + timedelta(days=7))
+        self.application = Application.objects.create(
+            job=self.job, applicant=self.student, cover_letter='Hi')
+        self.conversation = Conversation.objects.create(
+            application=self.application, participant_1=self.company,
+            participant_2=self.student)
+
+    def chat(self, sender, content):
+        self.client.force_login(sender)
+        self.client.post(reverse('messaging:conversation_detail', args=[self.application.pk]),
+                         {'content': content})
+
+    def test_message_burst_updates_one_row(self):
+        for text in ('one', 'two', 'three'):
+            self.chat(self.company, text)
+        notification = Notification.objects.get(recipient=self.student)
+        self.assertEqual(notification.notification_type, Notification.NEW_MESSAGE)
+        self.assertEqual(notification.event_count, 3)
+        self.assertEqual(notification.title, '3 new messages from acme')
+        self.assertEqual(notification.message, 'acme: three')
+        self.assertEqual(counters.get_counts(self.student)['notifications'], 1)
+
+        # Once read, the next message starts a new notification
+        Notification.objects.filter(pk=notification.pk).update(is_read=True)
+        counters.reset(self.student, counters.NOTIFICATIONS)
+        self.chat(self.company, 'four')
+        self.assertEqual(Notification.objects.filter(recipient=self.student).count(), 2)
+        self.assertEqual(counters.get_counts(self.student)['notifications'], 1)
+
+    def test_window_and_thread_limit_coalescing(self):
+        def notify(thread):
+            return create_notification(self.company, Notification.APPLICATION_SUBMITTED,
+                                       'New application', 'Body', thread_key=thread,
+                                       coalesced_title='{count} new applications')
+        first = notify('job:1')
+        notify('job:2')
+        self.assertEqual(notify('job:1').pk, first.pk)
+
+        Notification.objects.filter(pk=first.pk).update(
+            updated_at=timezone.now() - timedelta(hours=1))
+        self.assertNotEqual(notify('job:1').pk, first.pk)
+        self.assertEqual(Notification.objects.filter(recipient=self.company).count(), 3)
+        self.assertEqual(counters.get_counts(self.company)['notifications'], 3)
+
+    def test_coalesced_events_move_the_notification_up(self):
+        def notify(title, thread=''):
+            return create_notification(self.student, Notification.JOB_APPROVED, title, 'Body',
+                                       thread_key=thread, coalesced_title='{count} updates')
+        first = notify('Update', thread='job:1')
+        earlier = timezone.now() - timedelta(minutes=5)
+        Notification.objects.filter(pk=first.pk).update(created_at=earlier, updated_at=earlier)
+        notify('Other')
+        notify('Update', thread='job:1')
+
+        self.client.force_login(self.student)
+        response = self.client.get(reverse('notifications:list'))
+        self.assertEqual([n.title for n in response.context['notifications']],
+                         ['2 updates', 'Other'])
+        self.assertContains(response, '0\xa0minutes ago', count=2)
+
+    def test_digest_covers_new_unread_notifications_once(self):
+        digests.set_subscribed(self.student, True)
+        digests.set_subscribed(self.company, False)
+        create_notification(self.student, Notification.JOB_APPROVED, 'Approved', 'Body')
+        create_notification(self.company, Notification.JOB_APPROVED, 'Approved', 'Body')
+
+        self.assertEqual(digests.send_digests(), 1)
+        email = Outbox.objects.get()
+        self.assertEqual(email.to, ['s@uni.test'])
+        self.assertIn('Approved: Body', email.body)
+
+        # Nothing new since the watermark
+        self.assertEqual(digests.send_digests(), 0)
+        create_notification(self.student, Notification.JOB_REJECTED, 'Rejected', 'Later')
+        call_command('send_notification_digests', stdout=StringIO())
+        latest = Outbox.objects.latest('pk')
+        self.assertIn('Rejected: Later', latest.body)
+        self.assertNotIn('Approved', latest.body)
+
+    def test_digest_toggle(self):
+        self.client.force_login(self.student)
+        self.client.post(reverse('notifications:toggle_digest'), {'enabled': '1'})
+        self.assertTrue(digests.is_subscribed(self.student))
+        response = self.client.get(reverse('notifications:list'))
+        self.assertContains(response, 'Stop Digest Emails')
+        self.client.post(reverse('notifications:toggle_digest'), {'enabled': '0'})
+        self.assertFalse(digests.is_subscribed(self.student))
+
+
+@override_settings(PUBSUB_BACKEND='notifications.pubsub.LocmemBackend')
+class LiveNotificationTests(TestCase):
+
+    def setUp(self):
+        pubsub.published.clear()
+        self.student = CustomUser.objects.create_user(
+            'student', password='pw', verification_status=CustomUser.VERIFIED)
+
+    def close(self, response):
+        # What the ASGI server does when the client goes away, minus closing
+        # the test's database connection.
+        request_finished.disconnect(close_old_connections)
+        try:
+            response.close()
+        finally:
+            request_finished.connect(close_old_connections)
+
+    def test_events_are_published_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            notification = create_notification(self.student, Notification.JOB_APPROVED,
+                                               'Approved', 'Body')
+        self.assertEqual(pubsub.published, [])
+        for callback in callbacks:
+            callback()
+        channel = pubsub.user_channel(self.student.pk)
+        self.assertIn((channel, counters.COUNTS_CHANGED), pubsub.published)
+        self.assertIn((channel, {
+            'event': 'notification', 'id': notification.pk, 'broadcast': False,
+            'type': Notification.JOB_APPROVED, 'title': 'Approved', 'message': 'Body',
+            'created_at': notification.created_at.isoformat(),
+        }), pubsub.published)
+
+    def test_stream_is_disabled_under_wsgi(self):
+        self.client.force_login(self.student)
+        self.assertEqual(self.client.get(reverse('notifications:stream')).status_code, 204)
+
+    async def test_stream_relays_events_and_refreshes_counts(self):
+        await self.async_client.aforce_login(self.student)
+        response = await self.async_client.get(reverse('notifications:stream'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = response.streaming_content
+        self.assertEqual(await anext(chunks), b'retry: 5000\n\n')
+        self.assertIn(b'"notifications":0', await anext(chunks))
+
+        await sync_to_async(counters.increment)(self.student, counters.NOTIFICATIONS)
+        pubsub.publish(pubsub.user_channel(self.student.pk),
+                       {'event': 'notification', 'title': 'Hi'})
+        self.assertEqual(await anext(chunks),
+                         b'event: notification\ndata: {"event":"notification","title":"Hi"}\n\n')
+        self.assertIn(b'"notifications":1', await anext(chunks))
+        self.assertEqual(live.limiter.count(self.student.pk), 1)
+
+        self.close(response)
+        self.assertEqual(live.limiter.count(self.student.pk), 0)
+        self.assertEqual(pubsub.get_backend().subscriber_count(), 0)
+
+    @override_settings(SSE_HEARTBEAT_SECONDS=0.01, SSE_MAX_CONNECTIONS_PER_USER=1)
+    async def test_heartbeat_and_connection_limit(self):
+        await self.async_client.aforce_login(self.student)
+        response = await self.async_client.get(reverse('notifications:stream'))
+        chunks = response.streaming_content
+        await anext(chunks)
+        await anext(chunks)
+        self.assertEqual(await anext(chunks), b': ping\n\n')
+
+        second = await self.async_client.get(reverse('notifications:stream'))
+        self.assertEqual(second.status_code, 429)
+        self.close(response)
+        third = await self.async_client.get(reverse('notifications:stream'))
+        self.assertEqual(third.status_code, 200)
+        self.close(third)
+
+
+class FlakyBackend(locmem.EmailBackend):
+    """Rejects mail to addresses starting with 'bounce'."""
+    opened = 0
+
+    def open(self):
+        FlakyBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        for message in messages:
+            if any(address.startswith('bounce') for address in message.to):
+                raise smtplib.SMTPRecipientsRefused({message.to[0]: (550, b'No such user')})
+        return super().send_messages(messages)
+
+
+class DownBackend(locmem.EmailBackend):
+    """Cannot reach the mail server at all."""
+
+    def open(self):
+        raise ConnectionRefusedError('Connection refused')
+
+
+@override_settings(EMAIL_BACKEND='notifications.tests.FlakyBackend',
+                   OUTBOX_MAX_ATTEMPTS=2, OUTBOX_RETRY_BASE_SECONDS=60)
+class OutboxTests(TestCase):
+
+    def test_enqueue_joins_the_callers_transaction(self):
+        try:
+            with transaction.atomic():
+                enqueue_email('Hi', 'Body', ['a@example.com'])
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertFalse(Outbox.objects.exists())
+        self.assertIsNone(enqueue_email('Hi', 'Body', ['']))
+
+    def test_batch_is_sent_over_one_connection(self):
+        for i in range(3):
+            enqueue_email(f'Hi {i}', 'Body', [f'user{i}@example.com'])
+        FlakyBackend.opened = 0
+        self.assertEqual(deliver_due(), (3, 0))
+        self.assertEqual(FlakyBackend.opened, 1)
+        self.assertEqual(sorted(m.subject for m in mail.outbox), ['Hi 0', 'Hi 1', 'Hi 2'])
+        self.assertEqual(Outbox.objects.filter(status=Outbox.SENT, attempts=1).count(), 3)
+        self.assertEqual(deliver_due(), (0, 0))
+
+    def test_failures_back_off_then_dead_letter(self):
+        good = enqueue_email('Good', 'Body', ['ok@example.com'])
+        bad = enqueue_email('Bad', 'Body', ['bounce@example.com'])
+        self.assertEqual(deliver_due(), (1, 1))
+        bad.refresh_from_db()
+        self.assertEqual((bad.status, bad.attempts), (Outbox.PENDING, 1))
+        self.assertIn('SMTPRecipientsRefused', bad.last_error)
+        self.assertGreater(bad.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        self.assertEqual(deliver_due(), (0, 0))  # not due yet
+
+        Outbox.objects.filter(pk=bad.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_due(), (0, 1))
+        bad.refresh_from_db()
+        self.assertEqual(bad.status, Outbox.DEAD)
+        good.refresh_from_db()
+        self.assertEqual(good.status, Outbox.SENT)
+
+    @override_settings(EMAIL_BACKEND='notifications.tests.DownBackend')
+    def test_connection_failure_fails_the_whole_batch(self):
+        for i in range(2):
+            enqueue_email(f'Hi {i}', 'Body', [f'user{i}@example.com'])
+        self.assertEqual(deliver_due(), (0, 2))
+        for row in Outbox.objects.all():
+            self.assertEqual((row.status, row.attempts, row.claimed_by), (Outbox.PENDING, 1, ''))
+            self.assertIn('ConnectionRefusedError', row.last_error)
+
+        Outbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_due(), (0, 2))
+        self.assertEqual(Outbox.objects.filter(status=Outbox.DEAD).count(), 2)
+
+    def test_claimed_rows_are_skipped_by_other_workers(self):
+        enqueue_email('Hi', 'Body', ['a@example.com'])
+        self.assertEqual(len(claim_batch(10)), 1)
+        self.assertEqual(claim_batch(10), [])
+
+    def test_views_queue_instead_of_sending(self):
+        company = CustomUser.objects.create_user(
+            'acme', password='pw', email='hr@acme.test', is_company=True,
+            verification_status=CustomUser.VERIFIED)
+        job = JobPost.objects.create(
+            company=company, title='Engineer', description='d', requirements='r',
+            location='Accra', deadline=timezone.now() + timedelta(days=7))
+        admin = CustomUser.objects.create_user('admin', password='pw', is_superuser=True)
+        self.client.force_login(admin)
+        self.client.get(reverse('jobs:approve_job', args=[job.pk]))
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(list(Outbox.objects.values_list('to', flat=True)), [['hr@acme.test']])
+
+        out = StringIO()
+        call_command('send_outbox', stdout=out)
+        self.assertIn('1 sent', out.getvalue())
+        self.assertEqual(mail.outbox[0].subject, 'Job Post Approved: Engineer')
@@ -6,4 +6,8 @@ app_name = 'notifications'
 urlpatterns = [
     path('', views.notification_list, name='list'),
     path('mark-read/<int:notification_id>/', views.mark_as_read, name='mark_read'),
+    path('broadcasts/<int:broadcast_id>/read/', views.mark_broadcast_read, name='broadcast_read'),
+    path('broadcasts/<int:broadcast_id>/dismiss/', views.dismiss_broadcast, name='broadcast_dismiss'),
+    path('digest/', views.toggle_digest, name='toggle_digest'),
+    path('stream/', views.notification_stream, name='stream'),
 ]
\ No newline at end of file
@@ -1,6 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Cast, Concat
+from django.utils import timezone
+
+from . import counters, live
 from .models import Notification
 
-def create_notification(recipient, notification_type, title, message, related_job=None, related_application=None):
+
+def coalesce_window():
+    """How long an unread notification keeps absorbing events of its thread."""
+    return timedelta(seconds=getattr(settings, 'NOTIFICATION_COALESCE_SECONDS', 600))
+
+
+def _counted_title(template):
+    """``template`` with ``{count}`` replaced by the incremented event count, in SQL."""
+    before, _, after = template.partition('{count}')
+    return Concat(Value(before), Cast(F('event_count') + 1, CharField()), Value(after),
+                  output_field=CharField())
+
+
+def create_notification(recipient, notification_type, title, message, related_job=None, related_application=None,
+                        thread_key='', coalesced_title=None):
     """
     Helper function to create a new notification.
     
@@ -11,12 +34,81 @@ def create_notification(recipient, notification_type, title, message, related_jo
         message: Detailed message
         related_job: Optional JobPost object
         related_application: Optional Application object
+        thread_key: Optional key grouping related events (e.g. one conversation).
+            A new event joins the recipient's unread notification of the same
+            type and thread if it was updated within ``coalesce_window()``,
+            instead of inserting a row.
+        coalesced_title: Title used once events are coalesced, with ``{count}``
+            standing for the number of events (e.g. "{count} new messages")
+
+    Returns the new or updated notification.
+    """
+    with transaction.atomic():
+        if thread_key:
+            now = timezone.now()
+            pending = Notification.objects.filter(
+                recipient=recipient,
+                notification_type=notification_type,
+                thread_key=thread_key,
+                is_read=False,
+                updated_at__gte=now - coalesce_window(),
+            ).order_by('-updated_at').values_list('pk', flat=True).first()
+            # The unread row stays unread, so the counter is left alone.
+            if pending is not None and Notification.objects.filter(pk=pending, is_read=False).update(
+                    title=_counted_title(coalesced_title or title),
+                    message=message,
+                    related_job=related_job,
+                    related_application=related_application,
+                    event_count=F('event_count') + 1,
+                    updated_at=now):
+                notification = Notification.objects.get(pk=pending)
+                live.notification_created(notification)
+                return notification
+        notification = Notification.objects.create(
+            recipient=recipient,
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            related_job=related_job,
+            related_application=related_application,
+            thread_key=thread_key
+        )
+        counters.increment(recipient, counters.NOTIFICATIONS)
+        live.notification_created(notification)
+    return notification
+
+
+def create_notifications_bulk(recipients, notification_type, title, message, related_job=None,
+                              related_application=None, batch_size=500):
+    """
+    Create the same notification for many recipients at once.
+
+    Inserts every row with ``bulk_create`` and bumps all the recipients'
+    unread counters with one UPDATE, instead of one INSERT and counter
+    update per recipient. Duplicate recipients are notified once.
+
+    Args:
+        recipients: Iterable of users (or user ids)
+        Remaining arguments are as for ``create_notification``.
+
+    Returns the list of created notifications.
     """
-    return Notification.objects.create(
-        recipient=recipient,
-        notification_type=notification_type,
-        title=title,
-        message=message,
-        related_job=related_job,
-        related_application=related_application
-    )
\ No newline at end of file
+    recipient_ids = list(dict.fromkeys(getattr(r, 'pk', r) for r in recipients))
+    if not recipient_ids:
+        return []
+    with transaction.atomic():
+        notifications = Notification.objects.bulk_create([
+            Notification(
+                recipient_id=recipient_id,
+                notification_type=notification_type,
+                title=title,
+                message=message,
+                related_job=related_job,
+                related_application=related_application
+            )
+            for recipient_id in recipient_ids
+        ], batch_size=batch_size)
+        counters.increment_many(recipient_ids, counters.NOTIFICATIONS)
+        for notification in notifications:
+            live.notification_created(notification)
+    return notifications
@@ -1,29 +1,39 @@
-from django.shortcuts import render, redirect
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.views.decorators.http import require_POST
+from django.db import transaction
 from django.db.models import Q
+from jobs.pagination import MergedCursorPaginator
+from . import broadcasts, counters, digests, live
 from .models import Notification
 
 @login_required
 def notification_list(request):
-    """View to display user's notifications"""
+    """View to display user's notifications, merged with broadcasts"""
     notifications = Notification.objects.filter(recipient=request.user)
     
     # Mark all as read if requested
     if request.GET.get('mark_all_read'):
-        notifications.update(is_read=True)
+        with transaction.atomic():
+            notifications.filter(is_read=False).update(is_read=True)
+            counters.reset(request.user, counters.NOTIFICATIONS)
+            broadcasts.mark_all_read(request.user)
         return redirect('notifications:list')
         
-    # Paginate notifications
-    paginator = Paginator(notifications, 10)  # Show 10 notifications per page
-    page = request.GET.get('page')
-    notifications = paginator.get_page(page)
+    # Paginate personal notifications and broadcasts as one stream, latest
+    # activity first (keyset on activity_at, 10 per page)
+    paginator = MergedCursorPaginator(broadcasts.feed_sources(request.user, notifications),
+                                      10, ('-activity_at', '-source', '-id'))
+    notifications = paginator.get_page(request)
     
-    unread_count = Notification.objects.filter(recipient=request.user, is_read=False).count()
+    unread_count = counters.request_counts(request)[counters.NOTIFICATIONS]
     
     context = {
         'notifications': notifications,
         'unread_count': unread_count,
+        'digest_enabled': digests.is_subscribed(request.user),
     }
     return render(request, 'notifications/notification_list.html', context)
 
@@ -31,6 +41,49 @@ def notification_list(request):
 def mark_as_read(request, notification_id):
     """Mark a specific notification as read"""
     notification = Notification.objects.get(id=notification_id, recipient=request.user)
-    notification.is_read = True
-    notification.save()
-    return redirect('notifications:list')
\ No newline at end of file
+    if not notification.is_read:
+        with transaction.atomic():
+            notification.is_read = True
+            notification.save()
+            counters.decrement(request.user, counters.NOTIFICATIONS)
+    return redirect('notifications:list')
+
+@login_required
+def mark_broadcast_read(request, broadcast_id):
+    """Mark a broadcast notification as read for the current user"""
+    broadcast = get_object_or_404(broadcasts.unread(request.user), pk=broadcast_id)
+    broadcasts.mark_read(request.user, [broadcast.pk])
+    return redirect('notifications:list')
+
+@login_required
+def dismiss_broadcast(request, broadcast_id):
+    """Hide a broadcast notification from the current user's list"""
+    broadcast = get_object_or_404(broadcasts.visible_to(request.user), pk=broadcast_id)
+    broadcasts.dismiss(request.user, broadcast.pk)
+    return redirect('notifications:list')
+
+@login_required
+@require_POST
+def toggle_digest(request):
+    """Opt in to or out of the periodic notification digest email"""
+    digests.set_subscribed(request.user, request.POST.get('enabled') == '1')
+    return redirect('notifications:list')
+
+async def notification_stream(request):
+    """Server-Sent Events stream of the user's notifications and badge counts"""
+    if not isinstance(request, ASGIRequest):
+        # Streaming would tie up a WSGI worker; 204 tells EventSource to stop.
+        return HttpResponse(status=204)
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponseForbidden()
+    stream = live.open_stream(user)
+    if stream is None:
+        response = HttpResponse("Too many open connections.", status=429)
+        response['Retry-After'] = '30'
+        return response
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser
+from .models import CustomUser, OutboundSMS
 
 
 @admin.register(CustomUser)
@@ -31,3 +31,11 @@ class CustomUserAdmin(UserAdmin):
             'fields': ('id_document', 'verification_status')
         }),
     )
+
+
+@admin.register(OutboundSMS)
+class OutboundSMSAdmin(admin.ModelAdmin):
+    list_display = ('phone', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('phone',)
+    readonly_fields = ('body', 'created_at', 'sent_at', 'last_error', 'attempts')
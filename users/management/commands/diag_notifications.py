@@ -41,18 +41,20 @@ class Command(BaseCommand):
         self.stdout.write(f"TWILIO_ACCOUNT_SID set: {bool(tw_sid)}")
         self.stdout.write(f"TWILIO_FROM_NUMBER: {tw_from if tw_from else 'not set'}")
 
-        # Try Twilio client import/construct (without sending)
+        # Resolve the SMS backend and, for Twilio, build its shared client (without sending)
         try:
-            if tw_sid and tw_token:
-                from twilio.rest import Client
-                _client = Client(tw_sid, tw_token)
+            from users.sms import SMSError, TwilioBackend, get_backend
+            backend = get_backend()
+            self.stdout.write(f"SMS backend: {backend.__class__.__name__}")
+            if isinstance(backend, TwilioBackend):
+                backend.client
                 # Don't perform network calls; construction indicates package available and creds provided
                 self.stdout.write(self.style.SUCCESS("Twilio client import and construction OK"))
-            else:
+            elif not (tw_sid and tw_token):
                 self.stdout.write("Twilio not configured (set TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN to enable).")
-        except ImportError:
-            self.stdout.write(self.style.ERROR("Twilio package not installed. Install with: pip install twilio"))
+        except SMSError as e:
+            self.stdout.write(self.style.ERROR(str(e)))
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f"Twilio client construction failed: {e}"))
+            self.stdout.write(self.style.ERROR(f"SMS backend initialization failed: {e}"))
 
         self.stdout.write(self.style.MIGRATE_LABEL("Done."))
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.sms import deliver_due
+
+
+class Command(BaseCommand):
+    help = ("Send queued text messages through the configured SMS backend, a bounded number at "
+            "a time. Failed sends are retried with backoff and dead-lettered after too many attempts.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Messages claimed per batch (default: %(default)s)')
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help='Messages sent in parallel (default: SMS_MAX_CONCURRENCY)')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling for new messages instead of exiting when idle')
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='Seconds to sleep between polls with --loop (default: %(default)s)')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = deliver_due(batch_size=options['batch_size'],
+                                       concurrency=options['concurrency'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}.")
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f"SMS queue drained: {total_sent} sent, {total_failed} failed."))
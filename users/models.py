@@ -137,3 +137,47 @@ class SentEmail(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+
+
+class OutboundSMS(models.Model):
+    """
+    A text message waiting to be sent.
+
+    Queued by ``users.sms.enqueue_sms`` so verification requests return
+    without waiting on the SMS provider; ``manage.py send_sms_queue``
+    delivers them with bounded concurrency, retrying failures with backoff
+    until the row is dead-lettered.
+    """
+    PENDING = 'P'
+    SENT = 'S'
+    DEAD = 'D'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (DEAD, 'Dead-lettered'),
+    ]
+
+    phone = models.CharField(max_length=20)
+    body = models.TextField()
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=32, blank=True)
+    claimed_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'outbound SMS'
+        verbose_name_plural = 'outbound SMS'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['next_attempt_at'],
+                         condition=models.Q(status='P'),
+                         name='outboundsms_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"SMS to {self.phone}"
@@ -0,0 +1,143 @@
+"""
+SMS delivery.
+
+Backends are selected with the ``SMS_BACKEND`` setting (a dotted path) and
+instantiated once per process, so the Twilio backend builds its REST client
+a single time and reuses its HTTP connections. Available backends:
+
+* ``users.sms.TwilioBackend`` - sends through Twilio (the default when
+  ``TWILIO_ACCOUNT_SID``/``TWILIO_AUTH_TOKEN``/``TWILIO_FROM_NUMBER`` are set).
+* ``users.sms.ConsoleBackend`` - prints messages (development default).
+* ``users.sms.LocmemBackend`` - records messages in ``users.sms.outbox``
+  for tests.
+
+Views call ``enqueue_sms``; ``deliver_due`` (run by ``manage.py
+send_sms_queue``) sends queued messages from a worker.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from notifications.outbox import claim_batch, record_results
+from .models import OutboundSMS
+
+# Messages "sent" by LocmemBackend.
+outbox = []
+
+
+class SMSError(Exception):
+    pass
+
+
+class BaseBackend:
+
+    def send(self, phone, body):
+        """Send one message; raise SMSError (or any exception) on failure."""
+        raise NotImplementedError
+
+
+class ConsoleBackend(BaseBackend):
+
+    def send(self, phone, body):
+        print(f"\n=== Outgoing SMS ===\nTo: {phone}\n{body}\n=== End SMS ===\n")
+
+
+class LocmemBackend(BaseBackend):
+
+    def send(self, phone, body):
+        outbox.append((phone, body))
+
+
+class TwilioBackend(BaseBackend):
+
+    def __init__(self):
+        self.account_sid = getattr(settings, 'TWILIO_ACCOUNT_SID', '')
+        self.auth_token = getattr(settings, 'TWILIO_AUTH_TOKEN', '')
+        self.from_number = getattr(settings, 'TWILIO_FROM_NUMBER', '')
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def configured(self):
+        return bool(self.account_sid and self.auth_token and self.from_number)
+
+    @property
+    def client(self):
+        """The Twilio REST client, created on first use and then reused."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    if not self.configured:
+                        raise SMSError('Twilio credentials not configured (TWILIO_ACCOUNT_SID / '
+                                       'TWILIO_AUTH_TOKEN / TWILIO_FROM_NUMBER).')
+                    try:
+                        from twilio.rest import Client
+                    except ImportError:
+                        raise SMSError('Twilio package not installed. Install with: pip install twilio')
+                    self._client = Client(self.account_sid, self.auth_token)
+        return self._client
+
+    def send(self, phone, body):
+        self.client.messages.create(body=body, from_=self.from_number, to=phone)
+
+
+def _default_backend_path():
+    if (getattr(settings, 'TWILIO_ACCOUNT_SID', '') and getattr(settings, 'TWILIO_AUTH_TOKEN', '')
+            and getattr(settings, 'TWILIO_FROM_NUMBER', '')):
+        return 'users.sms.TwilioBackend'
+    return 'users.sms.ConsoleBackend'
+
+
+_backend = None
+
+
+def get_backend():
+    """The process-wide SMS backend instance."""
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'SMS_BACKEND', '') or _default_backend_path()
+        _backend = import_string(path)()
+    return _backend
+
+
+@receiver(setting_changed)
+def _reset_backend(setting, **kwargs):
+    global _backend
+    if setting in ('SMS_BACKEND', 'TWILIO_ACCOUNT_SID', 'TWILIO_AUTH_TOKEN', 'TWILIO_FROM_NUMBER'):
+        _backend = None
+
+
+def enqueue_sms(phone, body):
+    """Queue a text message for the SMS worker; returns the row."""
+    return OutboundSMS.objects.create(phone=phone, body=body)
+
+
+def _send(backend, row):
+    try:
+        backend.send(row.phone, row.body)
+    except Exception as exc:
+        row.last_error = f"{exc.__class__.__name__}: {exc}"
+        return False
+    return True
+
+
+def deliver_due(batch_size=50, concurrency=None):
+    """Send one batch of due messages, at most ``concurrency`` at a time.
+
+    Returns ``(sent, failed)``.
+    """
+    rows = claim_batch(batch_size, model=OutboundSMS)
+    if not rows:
+        return 0, 0
+    backend = get_backend()
+    concurrency = concurrency or getattr(settings, 'SMS_MAX_CONCURRENCY', 4)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        results = list(pool.map(lambda row: _send(backend, row), rows))
+    sent = [row for row, ok in zip(rows, results) if ok]
+    failed = [row for row, ok in zip(rows, results) if not ok]
+    record_results(OutboundSMS, sent, failed, getattr(settings, 'SMS_MAX_ATTEMPTS', 5))
+    return len(sent), len(failed)
@@ -1,3 +1,58 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from . import sms
+from .models import CustomUser, OutboundSMS, PhoneVerificationCode
+
+
+class FlakyBackend(sms.BaseBackend):
+    def send(self, phone, body):
+        if phone.endswith('0'):
+            raise sms.SMSError('unreachable')
+        sms.outbox.append((phone, body))
+
+
+@override_settings(SMS_BACKEND='users.sms.LocmemBackend')
+class SMSQueueTests(TestCase):
+
+    def setUp(self):
+        sms.outbox.clear()
+
+    def test_backend_is_created_once(self):
+        self.assertIs(sms.get_backend(), sms.get_backend())
+        with override_settings(SMS_BACKEND='users.sms.ConsoleBackend'):
+            self.assertIsInstance(sms.get_backend(), sms.ConsoleBackend)
+
+    def test_twilio_client_is_reused(self):
+        backend = sms.TwilioBackend()
+        backend._client = client = object()
+        self.assertIs(backend.client, client)
+        with self.assertRaises(sms.SMSError):
+            sms.TwilioBackend().client
+
+    def test_phone_verification_returns_without_sending(self):
+        user = CustomUser.objects.create_user('student', password='pw', phone_number='+233200000001')
+        self.client.force_login(user)
+        response = self.client.get(reverse('users:start_phone_verification'))
+        self.assertRedirects(response, reverse('users:verify_phone'), fetch_redirect_response=False)
+        self.assertEqual(sms.outbox, [])
+        code = PhoneVerificationCode.objects.get(phone='+233200000001').code
+
+        out = StringIO()
+        call_command('send_sms_queue', stdout=out)
+        self.assertIn('1 sent', out.getvalue())
+        self.assertEqual(len(sms.outbox), 1)
+        self.assertIn(code, sms.outbox[0][1])
+
+    @override_settings(SMS_BACKEND='users.tests.FlakyBackend', SMS_MAX_ATTEMPTS=1)
+    def test_concurrent_batch_with_failures(self):
+        for i in range(1, 10):
+            sms.enqueue_sms(f'+23320000000{i}', 'Hi')
+        bad = sms.enqueue_sms('+233200000010', 'Hi')
+        self.assertEqual(sms.deliver_due(concurrency=3), (9, 1))
+        self.assertEqual(len(sms.outbox), 9)
+        bad.refresh_from_db()
+        self.assertEqual((bad.status, bad.last_error), (OutboundSMS.DEAD, 'SMSError: unreachable'))
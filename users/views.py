@@ -8,33 +8,20 @@ from django.views.decorators.http import require_http_methods
 from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.contrib.auth.decorators import user_passes_test
-from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction
 from .forms import RegistrationForm, LoginForm
 from .verification_forms import EmailVerificationForm, VerifyCodeForm, ChooseVerificationMethodForm
 from .models import EmailVerificationCode
 from .models import PhoneVerificationCode
+from .sms import enqueue_sms
+from notifications.outbox import enqueue_email
 from django.utils import timezone
 from datetime import timedelta
 import random
 import string
 
 
-def debug_send_mail(subject, message, from_email, recipient_list, fail_silently=False):
-    """Send mail and always print contents to console in development for visibility."""
-    try:
-        # Print to console for developer visibility regardless of backend
-        print("\n=== Outgoing email ===")
-        print(f"To: {recipient_list}")
-        print(f"Subject: {subject}")
-        print("Body:\n" + message)
-        print("=== End email ===\n")
-    except Exception:
-        pass
-    # Call Django's send_mail; it will use the configured backend
-    return send_mail(subject=subject, message=message, from_email=from_email, recipient_list=recipient_list, fail_silently=fail_silently)
-
-
 def generate_verification_code():
     """Generate a random 6-digit verification code"""
     return ''.join(random.choices(string.digits, k=6))
@@ -78,23 +65,17 @@ def start_email_verification(request):
                 data={},  # Will be populated when registering
             )
 
-            # Send verification email
-            try:
-                debug_send_mail(
-                    subject='Your Campus Job Board Verification Code',
-                    message=f'Your verification code is: {code}\n\nThis code will expire in 10 minutes.',
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[email],
-                    fail_silently=False,
-                )
-                
-                # Store email in session for the verification step
-                request.session['pending_email'] = email
-                messages.success(request, "Verification code sent! Please check your email.")
-                return redirect('users:verify_code')
-            except Exception as e:
-                messages.error(request, "Error sending verification email. Please try again.")
-                return redirect('users:verify_email')
+            # Queue the verification email for the outbox worker
+            enqueue_email(
+                subject='Your Campus Job Board Verification Code',
+                message=f'Your verification code is: {code}\n\nThis code will expire in 10 minutes.',
+                recipient_list=[email],
+            )
+
+            # Store email in session for the verification step
+            request.session['pending_email'] = email
+            messages.success(request, "Verification code sent! Please check your email.")
+            return redirect('users:verify_code')
     else:
         form = EmailVerificationForm()
 
@@ -190,55 +171,17 @@ def resend_verification_code(request):
         defaults={'code': code, 'data': {}, 'is_used': False, 'expires_at': timezone.now() + timedelta(minutes=10)}
     )
 
-    # Send email
-    try:
-        debug_send_mail(
-            subject='Your Campus Job Board Verification Code',
-            message=f'Your verification code is: {code}\n\nThis code will expire in 10 minutes.',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[pending_email],
-            fail_silently=False,
-        )
-        messages.success(request, 'A new verification code has been sent to your email.')
-    except Exception:
-        import traceback
-        traceback.print_exc()
-        messages.error(request, 'Failed to send verification email. Please try again later.')
+    # Queue the email for the outbox worker
+    enqueue_email(
+        subject='Your Campus Job Board Verification Code',
+        message=f'Your verification code is: {code}\n\nThis code will expire in 10 minutes.',
+        recipient_list=[pending_email],
+    )
+    messages.success(request, 'A new verification code has been sent to your email.')
 
     return redirect('users:verify_code')
 
 
-def send_sms(phone_number, message):
-    """Send SMS using Twilio."""
-    from django.conf import settings
-    # Ensure credentials are configured
-    if not (getattr(settings, 'TWILIO_ACCOUNT_SID', '') and getattr(settings, 'TWILIO_AUTH_TOKEN', '') and getattr(settings, 'TWILIO_FROM_NUMBER', '')):
-        print('Twilio credentials not configured (TWILIO_ACCOUNT_SID / TWILIO_AUTH_TOKEN / TWILIO_FROM_NUMBER).')
-        return False
-
-    # Import Twilio client
-    try:
-        from twilio.rest import Client
-    except ImportError:
-        print("Twilio package not installed. Install with: pip install twilio")
-        return False
-
-    # Initialize Twilio client
-    client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-
-    # Send message
-    try:
-        client.messages.create(
-            body=message,
-            from_=settings.TWILIO_FROM_NUMBER,
-            to=phone_number
-        )
-        return True
-    except Exception as e:
-        print(f"Failed to send SMS to {phone_number}: {e}")
-        return False
-
-
 def start_phone_verification(request):
     """Generate and send a phone verification code for the current user's phone.
 
@@ -279,21 +222,19 @@ def start_phone_verification(request):
             messages.error(request, 'You have requested verification too many times. Please try again later.')
             return redirect('jobs:job_list')
 
-        # Remove any existing unused codes for this phone
-        PhoneVerificationCode.objects.filter(phone=phone, is_used=False).delete()
+        with transaction.atomic():
+            # Remove any existing unused codes for this phone
+            PhoneVerificationCode.objects.filter(phone=phone, is_used=False).delete()
 
-        # Generate code and save
-        code = generate_verification_code()
-        PhoneVerificationCode.objects.create(phone=phone, code=code)
+            # Generate code and save
+            code = generate_verification_code()
+            PhoneVerificationCode.objects.create(phone=phone, code=code)
 
-        # Send SMS (placeholder)
-        sent = send_sms(phone, f'Your Campus Job Board verification code is: {code}. It expires in 10 minutes.')
+            # Queue the SMS; the send_sms_queue worker delivers it
+            enqueue_sms(phone, f'Your Campus Job Board verification code is: {code}. It expires in 10 minutes.')
 
         from django.contrib import messages
-        if sent:
-            messages.success(request, 'Verification code sent to your phone.')
-        else:
-            messages.warning(request, 'Could not send SMS. Please try email verification or contact support.')
+        messages.success(request, 'Verification code sent to your phone.')
 
         # store pending phone in session for the verification step
         request.session['pending_phone'] = phone
@@ -466,20 +407,17 @@ def choose_verification_method(request):
                 
                 # Generate and send SMS code
                 code = generate_verification_code()
-                PhoneVerificationCode.objects.update_or_create(
-                    phone=user_phone,
-                    defaults={'code': code, 'is_used': False, 'expires_at': timezone.now() + timedelta(minutes=10)}
-                )
-                sent = send_sms(user_phone, f'Your Campus Job Board verification code is: {code}. It expires in 10 minutes.')
-                
-                if sent:
-                    request.session['pending_phone'] = user_phone
-                    request.session['verification_method'] = 'sms'
-                    messages.success(request, f'Verification code sent to {user_phone}')
-                    return redirect('users:verify_phone')
-                else:
-                    messages.error(request, 'Failed to send SMS. Please try email verification instead.')
-                    return redirect('users:choose_verification_method')
+                with transaction.atomic():
+                    PhoneVerificationCode.objects.update_or_create(
+                        phone=user_phone,
+                        defaults={'code': code, 'is_used': False, 'expires_at': timezone.now() + timedelta(minutes=10)}
+                    )
+                    enqueue_sms(user_phone, f'Your Campus Job Board verification code is: {code}. It expires in 10 minutes.')
+
+                request.session['pending_phone'] = user_phone
+                request.session['verification_method'] = 'sms'
+                messages.success(request, f'Verification code sent to {user_phone}')
+                return redirect('users:verify_phone')
             
             else:  # email verification
                 # Generate and send email code
@@ -489,23 +427,15 @@ def choose_verification_method(request):
                     defaults={'code': email_code, 'data': {}, 'is_used': False, 'expires_at': timezone.now() + timedelta(minutes=10)}
                 )
                 
-                try:
-                    debug_send_mail(
-                        subject='Verify your Campus Job Board email',
-                        message=f'Hello {request.user.username},\n\nYour email verification code is: {email_code}\n\nPlease enter this code to verify your email address.',
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=[user_email],
-                        fail_silently=False,
-                    )
-                    request.session['pending_email'] = user_email
-                    request.session['verification_method'] = 'email'
-                    messages.success(request, f'Verification code sent to {user_email}')
-                    return redirect('users:verify_code')
-                except Exception:
-                    import traceback
-                    traceback.print_exc()
-                    messages.error(request, 'Failed to send verification email. Please try again.')
-                    return redirect('users:choose_verification_method')
+                enqueue_email(
+                    subject='Verify your Campus Job Board email',
+                    message=f'Hello {request.user.username},\n\nYour email verification code is: {email_code}\n\nPlease enter this code to verify your email address.',
+                    recipient_list=[user_email],
+                )
+                request.session['pending_email'] = user_email
+                request.session['verification_method'] = 'email'
+                messages.success(request, f'Verification code sent to {user_email}')
+                return redirect('users:verify_code')
     else:
         form = ChooseVerificationMethodForm()
     
@@ -607,35 +537,31 @@ def verify_user(request, user_id, status):
         messages.error(request, "Invalid verification status")
         return redirect('jobs:admin_dashboard')
     
-    user.verification_status = status
-    user.save()
-    
-    # If the user being verified is currently logged in, refresh their session
-    # This ensures the navbar updates immediately without logout/login
-    if hasattr(request, 'session'):
-        # Store updated user info in session
-        request.session.modified = True
-    
-    # Send email notification to user
     status_text = "verified" if status == CustomUser.VERIFIED else "rejected"
-    
-    # Create notification for user
-    create_notification(
-        recipient=user,
-        notification_type=Notification.ID_VERIFIED if status == CustomUser.VERIFIED else Notification.ID_REJECTED,
-        title=f"Account Verification {status_text.capitalize()}",
-        message=f'Your account has been {status_text}. {"You can now post jobs." if status == CustomUser.VERIFIED else "Please contact support for more information."}'
-    )
-    try:
-        debug_send_mail(
+
+    with transaction.atomic():
+        user.verification_status = status
+        user.save()
+
+        # Create notification for user
+        create_notification(
+            recipient=user,
+            notification_type=Notification.ID_VERIFIED if status == CustomUser.VERIFIED else Notification.ID_REJECTED,
+            title=f"Account Verification {status_text.capitalize()}",
+            message=f'Your account has been {status_text}. {"You can now post jobs." if status == CustomUser.VERIFIED else "Please contact support for more information."}'
+        )
+        # Email the user once the change commits
+        enqueue_email(
             subject=f'Account Verification {status_text.capitalize()}',
             message=f'Your account has been {status_text}. {"You can now post jobs." if status == CustomUser.VERIFIED else "Please contact support for more information."}',
-            from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[user.email],
-            fail_silently=True,
         )
-    except Exception:
-        pass
-    
+
+    # If the user being verified is currently logged in, refresh their session
+    # This ensures the navbar updates immediately without logout/login
+    if hasattr(request, 'session'):
+        # Store updated user info in session
+        request.session.modified = True
+
     messages.success(request, f"User {user.username} has been {status_text}.")
     return redirect('jobs:admin_dashboard')